@@ -7,7 +7,7 @@ import io
 import base64
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 
 from fastapi import APIRouter, HTTPException, status, BackgroundTasks
@@ -15,8 +15,9 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
+from app.core.latency import without_budget
 from app.core.logging import logger
-from app.services.ai_service_manager import ai_service_manager
+from app.services.ai_service_manager import IMAGE_PROVIDERS, ai_service_manager
 
 router = APIRouter()
 
@@ -149,6 +150,7 @@ async def generate_image(
     )
 
 
+@without_budget
 async def process_image_generation(task_id: str, request: ImageGenerationRequest):
     """后台处理图像生成"""
     try:
@@ -156,29 +158,32 @@ async def process_image_generation(task_id: str, request: ImageGenerationRequest
         output_dir.mkdir(parents=True, exist_ok=True)
         
         image_urls = []
+
+        # auto：发给当前最快的健康服务商，失败或熔断时转到另一家
+        provider = request.provider
+        auto = provider == "auto"
+        if auto:
+            provider = ai_service_manager.select_provider("image", IMAGE_PROVIDERS)
+        if provider not in IMAGE_PROVIDERS or not ai_service_manager.is_service_available(provider):
+            raise Exception("No image generation service available")
         
-        # 使用 OpenAI DALL-E
-        if request.provider in ["auto", "openai"] and ai_service_manager.is_service_available("openai"):
-            from app.services.openai_service import OpenAIService
-            
-            service = OpenAIService()
-            images = await service.generate_image(
-                prompt=request.prompt,
-                model=request.model,
-                size=request.size,
-                quality=request.quality,
-                style=request.style,
-                n=request.n
-            )
+        async def generate(name: str) -> Tuple[str, List[bytes]]:
+            # 使用 OpenAI DALL-E
+            if name == "openai":
+                from app.services.openai_service import OpenAIService
+                
+                service = OpenAIService()
+                images = await service.generate_image(
+                    prompt=request.prompt,
+                    model=request.model,
+                    size=request.size,
+                    quality=request.quality,
+                    style=request.style,
+                    n=request.n
+                )
+                return name, images
             
-            for i, image_data in enumerate(images):
-                filename = f"{task_id}_{i}.png"
-                filepath = output_dir / filename
-                filepath.write_bytes(image_data)
-                image_urls.append(f"/download/images/{filename}")
-        
-        # 使用 Stability AI
-        elif request.provider in ["auto", "stability"] and ai_service_manager.is_service_available("stability"):
+            # 使用 Stability AI
             from app.services.stability_service import StabilityAI
             
             service = StabilityAI()
@@ -190,21 +195,29 @@ async def process_image_generation(task_id: str, request: ImageGenerationRequest
             elif request.size in ["1792x1024", "1024x1792"]:
                 aspect_ratio = "16:9" if request.size == "1792x1024" else "9:16"
             
-            for i in range(request.n):
-                image_data = await service.generate_image(
-                    prompt=request.prompt,
-                    negative_prompt=request.negative_prompt or "",
-                    aspect_ratio=aspect_ratio,
-                    output_format="png"
+            images = []
+            for _ in range(request.n):
+                images.append(
+                    await service.generate_image(
+                        prompt=request.prompt,
+                        negative_prompt=request.negative_prompt or "",
+                        aspect_ratio=aspect_ratio,
+                        output_format="png"
+                    )
                 )
-                
-                filename = f"{task_id}_{i}.png"
-                filepath = output_dir / filename
-                filepath.write_bytes(image_data)
-                image_urls.append(f"/download/images/{filename}")
+            return name, images
         
-        else:
-            raise Exception("No image generation service available")
+        provider, images = await ai_service_manager.call_with_failover(
+            "image", provider, generate, failover=auto
+        )
+        if auto:
+            generation_tasks[task_id]["provider"] = provider
+        
+        for i, image_data in enumerate(images):
+            filename = f"{task_id}_{i}.png"
+            filepath = output_dir / filename
+            filepath.write_bytes(image_data)
+            image_urls.append(f"/download/images/{filename}")
         
         # 更新任务状态
         generation_tasks[task_id].update({
@@ -5,13 +5,15 @@ AI 视频生成 API
 
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pathlib import Path
 
 from fastapi import APIRouter, HTTPException, status, BackgroundTasks, UploadFile, File
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
+from app.core.http_clients import http_clients
+from app.core.latency import without_budget
 from app.core.logging import logger
 from app.services.ai_service_manager import ai_service_manager
 from app.services.video_generation_service import video_service_manager, VideoProvider
@@ -278,6 +280,7 @@ async def text_to_video(request: TextToVideoRequest, background_tasks: Backgroun
     background_tasks.add_task(process_text_to_video, task_id, request)
 
 
+@without_budget
 async def process_text_to_video(task_id: str, request: TextToVideoRequest):
     """后台处理文生视频"""
     try:
@@ -299,19 +302,19 @@ async def process_text_to_video(task_id: str, request: TextToVideoRequest):
 
         # 如果有视频URL，下载并保存
         if video_url and isinstance(video_url, str):
-            import httpx
-
-            async with httpx.AsyncClient() as client:
-                response = await client.get(video_url, timeout=120.0)
-                if response.status_code == 200:
-                    output_dir = Path("generated/videos")
-                    output_dir.mkdir(parents=True, exist_ok=True)
+            client = http_clients.get("download")
+            response = await client.get(
+                video_url, timeout=http_clients.timeout("download", 120.0)
+            )
+            if response.status_code == 200:
+                output_dir = Path("generated/videos")
+                output_dir.mkdir(parents=True, exist_ok=True)
 
-                    filename = f"{task_id}.mp4"
-                    filepath = output_dir / filename
-                    filepath.write_bytes(response.content)
+                filename = f"{task_id}.mp4"
+                filepath = output_dir / filename
+                filepath.write_bytes(response.content)
 
-                    video_url = f"/download/videos/{filename}"
+                video_url = f"/download/videos/{filename}"
 
         # 更新任务状态
         await _update_video_task(
@@ -397,6 +400,7 @@ async def image_to_video(
     )
 
 
+@without_budget
 async def process_image_to_video(task_id: str, request: ImageToVideoRequest):
     """后台处理图生视频"""
     try:
@@ -416,19 +420,19 @@ async def process_image_to_video(task_id: str, request: ImageToVideoRequest):
 
         # 下载并保存
         if video_url and isinstance(video_url, str):
-            import httpx
-
-            async with httpx.AsyncClient() as client:
-                response = await client.get(video_url, timeout=120.0)
-                if response.status_code == 200:
-                    output_dir = Path("generated/videos")
-                    output_dir.mkdir(parents=True, exist_ok=True)
+            client = http_clients.get("download")
+            response = await client.get(
+                video_url, timeout=http_clients.timeout("download", 120.0)
+            )
+            if response.status_code == 200:
+                output_dir = Path("generated/videos")
+                output_dir.mkdir(parents=True, exist_ok=True)
 
-                    filename = f"{task_id}.mp4"
-                    filepath = output_dir / filename
-                    filepath.write_bytes(response.content)
+                filename = f"{task_id}.mp4"
+                filepath = output_dir / filename
+                filepath.write_bytes(response.content)
 
-                    video_url = f"/download/videos/{filename}"
+                video_url = f"/download/videos/{filename}"
 
         await _update_video_task(
             task_id,
@@ -8,6 +8,8 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 
+from app.core.latency import simulate_latency, without_budget
+
 router = APIRouter(prefix="/batch", tags=["批量生成"])
 
 batch_jobs: Dict[str, Dict[str, Any]] = {}
@@ -70,7 +72,7 @@ async def process_batch_item(
 
 
 async def generate_poster_async(product_data: dict):
-    await asyncio.sleep(2)
+    await simulate_latency("batch.poster")
     return {
         "status": "completed",
         "url": f"/downloads/poster_{uuid.uuid4().hex[:8]}.png",
@@ -79,7 +81,7 @@ async def generate_poster_async(product_data: dict):
 
 
 async def generate_video_async(product_data: dict):
-    await asyncio.sleep(3)
+    await simulate_latency("batch.video")
     return {
         "status": "completed",
         "url": f"/downloads/video_{uuid.uuid4().hex[:8]}.mp4",
@@ -88,7 +90,7 @@ async def generate_video_async(product_data: dict):
 
 
 async def generate_voice_async(product_data: dict):
-    await asyncio.sleep(1)
+    await simulate_latency("batch.voice")
     return {
         "status": "completed",
         "url": f"/downloads/voice_{uuid.uuid4().hex[:8]}.mp3",
@@ -97,7 +99,7 @@ async def generate_voice_async(product_data: dict):
 
 
 async def generate_ip_async(product_data: dict):
-    await asyncio.sleep(2)
+    await simulate_latency("batch.ip")
     return {
         "status": "completed",
         "url": f"/downloads/ip_{uuid.uuid4().hex[:8]}.png",
@@ -133,6 +135,7 @@ async def create_batch_generation(request: BatchGenerateRequest):
     )
 
 
+@without_budget
 async def run_batch_process(batch_id: str, types: List[str], product_data: dict):
     total = len(types)
     for index, item_type in enumerate(types):
@@ -11,13 +11,19 @@ from fastapi import APIRouter, HTTPException, status, BackgroundTasks
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
+from app.core.latency import LatencyBudgetExceeded
 from app.core.logging import logger
 from app.services.ai_service_manager import ai_service_manager
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.rate_limiter import RateLimitExceeded
 from app.services.minimax_service import MinimaxLLM, MinimaxTTS
 from app.services.stepfun_service import StepFunLLM
 
 router = APIRouter()
 
+# auto 模式下的候选服务商（本模块只使用国产服务）
+CHINESE_TEXT_PROVIDERS = ("minimax", "stepfun")
+
 
 # ============== Pydantic 模型 ==============
 
@@ -126,39 +132,42 @@ async def chat_completion(request: TextGenerationRequest):
     国产 AI 对话生成
     
     支持 StepFun 和 Minimax，可指定 provider 或使用 auto 自动选择
+    （auto 模式下可对冲到另一家服务商，失败时故障转移）
     """
     if request.provider == "auto":
-        if ai_service_manager.is_service_available("minimax"):
-            request.provider = "minimax"
-        elif ai_service_manager.is_service_available("stepfun"):
-            request.provider = "stepfun"
-        else:
+        try:
+            ai_service_manager.rank_providers("text", CHINESE_TEXT_PROVIDERS)
+        except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="No Chinese AI service configured"
             )
     
     try:
-        content = await ai_service_manager.generate_text(
+        provider, content = await ai_service_manager.generate_text_with_provider(
             prompt=request.prompt,
             provider=request.provider,
+            candidates=CHINESE_TEXT_PROVIDERS,
             temperature=request.temperature,
             max_tokens=request.max_tokens
         )
         
         model = "unknown"
-        if request.provider == "stepfun":
+        if provider == "stepfun":
             model = settings.STEPFUN_LLM_MODEL
-        elif request.provider == "minimax":
+        elif provider == "minimax":
             model = settings.MINIMAX_LLM_MODEL
         
         return TextGenerationResponse(
-            provider=request.provider,
+            provider=provider,
             content=content,
             model=model,
             timestamp=datetime.utcnow()
         )
         
+    except (CircuitOpenError, RateLimitExceeded, LatencyBudgetExceeded):
+        # 交给全局处理器返回 503 / 504
+        raise
     except Exception as e:
         logger.error(f"Chinese AI chat error: {e}")
         raise HTTPException(
@@ -188,6 +197,8 @@ async def generate_copywriting(request: CopywritingRequest):
             "timestamp": datetime.utcnow().isoformat()
         }
         
+    except (CircuitOpenError, RateLimitExceeded, LatencyBudgetExceeded):
+        raise
     except Exception as e:
         logger.error(f"Copywriting generation error: {e}")
         raise HTTPException(
@@ -203,47 +214,52 @@ async def generate_video_script(request: VideoScriptRequest):
     
     支持 StepFun 和 Minimax
     """
+    async def script(provider: str):
+        service = MinimaxLLM() if provider == "minimax" else StepFunLLM()
+        result = await service.generate_video_script(
+            product_name=request.product_name,
+            product_description=request.product_description,
+            key_features=request.key_features,
+            style=request.style,
+            duration=request.duration,
+            platform=request.platform
+        )
+        return provider, result
+
     try:
-        if request.provider == "auto":
-            if ai_service_manager.is_service_available("minimax"):
-                request.provider = "minimax"
-            elif ai_service_manager.is_service_available("stepfun"):
-                request.provider = "stepfun"
-            else:
+        auto = request.provider == "auto"
+        if auto:
+            try:
+                provider = ai_service_manager.select_provider("text", CHINESE_TEXT_PROVIDERS)
+            except ValueError:
                 raise HTTPException(
                     status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                     detail="No Chinese AI service configured"
                 )
-        
-        if request.provider == "minimax":
-            service = MinimaxLLM()
-            result = await service.generate_video_script(
-                product_name=request.product_name,
-                product_description=request.product_description,
-                key_features=request.key_features,
-                style=request.style,
-                duration=request.duration,
-                platform=request.platform
-            )
-        elif request.provider == "stepfun":
-            service = StepFunLLM()
-            result = await service.generate_video_script(
-                product_name=request.product_name,
-                product_description=request.product_description,
-                key_features=request.key_features,
-                style=request.style,
-                duration=request.duration,
-                platform=request.platform
-            )
+        elif request.provider in CHINESE_TEXT_PROVIDERS:
+            provider = request.provider
         else:
             raise ValueError(f"Provider {request.provider} not supported")
         
+        # auto 模式下失败或熔断时转到另一家国产服务商
+        provider, result = await ai_service_manager.call_with_failover(
+            "text",
+            provider,
+            script,
+            failover=auto,
+            candidates=CHINESE_TEXT_PROVIDERS,
+        )
+        
         return {
-            "provider": request.provider,
+            "provider": provider,
             "script": result,
             "timestamp": datetime.utcnow().isoformat()
         }
         
+    except HTTPException:
+        raise
+    except (CircuitOpenError, RateLimitExceeded, LatencyBudgetExceeded):
+        raise
     except Exception as e:
         logger.error(f"Video script generation error: {e}")
         raise HTTPException(
@@ -334,6 +350,8 @@ async def generate_tts(request: TTSRequest, background_tasks: BackgroundTasks):
             "timestamp": datetime.utcnow().isoformat()
         }
         
+    except (CircuitOpenError, RateLimitExceeded, LatencyBudgetExceeded):
+        raise
     except Exception as e:
         logger.error(f"TTS generation error: {e}")
         raise HTTPException(
@@ -364,5 +382,6 @@ async def health_check():
         "available_providers": [
             p for p in ["stepfun", "minimax"] 
             if ai_service_manager.is_service_available(p)
-        ]
+        ],
+        "routing": ai_service_manager.get_routing_stats(),
     }
@@ -6,14 +6,16 @@
 import os
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pathlib import Path
 
 from fastapi import APIRouter, HTTPException, status, BackgroundTasks
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
+from app.core.latency import without_budget
 from app.core.logging import logger
+from app.services.poster_renderer import poster_renderer
 from app.services.stability_service import StabilityAI
 
 router = APIRouter()
@@ -103,6 +105,7 @@ async def enhance_poster(
     )
 
 
+@without_budget
 async def process_poster_enhancement(task_id: str, request: PosterEnhancementRequest):
     """后台处理海报增强"""
     try:
@@ -197,6 +200,50 @@ async def get_enhancement_styles():
     ]
 
 
+class PosterVariant(BaseModel):
+    template_id: str = Field(default="tech-modern", description="模板ID")
+    bg_colors: Optional[List[str]] = Field(None, description="背景渐变色，如 ['#0ea5e9', '#6366f1']，不传使用模板默认配色")
+
+
+class PosterVariantsRequest(BaseModel):
+    product_name: str = Field(..., min_length=1, max_length=100)
+    description: str = Field(..., min_length=1, max_length=1000)
+    features: List[str] = Field(default_factory=list, max_length=10)
+    variants: Optional[List[PosterVariant]] = Field(None, description="指定变体，不传则按 count 自动选取")
+    count: int = Field(default=8, ge=1, le=settings.POSTER_VARIANTS_MAX, description="自动选取的变体数")
+    formats: Optional[List[str]] = Field(None, description="导出格式: png/jpg/webp/avif")
+    sizes: List[str] = Field(default_factory=list, description="社交媒体尺寸: story/square/thumbnail")
+
+
+@router.post("/variants")
+async def generate_poster_variants(request: PosterVariantsRequest):
+    """
+    批量生成海报变体
+
+    同一产品内容按多个配色/模板渲染，文字排版只做一次、多进程并行渲染，
+    返回每个变体的文件和一张拼好的预览图
+    """
+    variants = None
+    if request.variants is not None:
+        variants = [
+            (variant.template_id, tuple(variant.bg_colors) if variant.bg_colors else None)
+            for variant in request.variants
+        ]
+
+    try:
+        return await poster_renderer.generate_variants(
+            request.product_name,
+            request.description,
+            request.features,
+            variants=variants,
+            count=request.count,
+            formats=request.formats,
+            sizes=request.sizes,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.get("/health")
 async def health_check():
     """海报增强服务健康检查"""
@@ -8,18 +8,26 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Response, status, BackgroundTasks
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
+from app.core.http_clients import http_clients
+from app.core.latency import without_budget
 from app.core.logging import logger
 from app.services.stepfun_service import StepFunLLM
+from app.services.ffmpeg_pool import FFmpegCancelledError, ffmpeg_scheduler
+from app.services.ffmpeg_progress import VideoProgress
+from app.services.media_probe import media_probe
 from app.services.video_composer import video_composer
+from app.services.video_profiles import ladder_rungs, profile_for
 
 router = APIRouter()
 
 # 任务存储
 video_tasks: dict = {}
+# 任务进度（任务ID -> VideoProgress）
+video_progress: Dict[str, VideoProgress] = {}
 
 
 class VideoScriptScene(BaseModel):
@@ -48,6 +56,16 @@ class VideoGenerationRequest(BaseModel):
     target_platform: str = Field(default="youtube", description="目标平台")
     include_subtitles: bool = Field(default=True)
     voice_style: Optional[str] = Field(default="professional", description="语音风格")
+    quality: str = Field(
+        default="final", description="编码质量：preview（快速预览）/ final（按目标平台）/ archival"
+    )
+    renditions: List[str] = Field(
+        default_factory=list, description="额外输出的码率阶梯档位，如 ['720p', '480p']"
+    )
+    hls: bool = Field(default=False, description="同时输出 HLS，渲染开始后即可边编码边播放")
+    motion: bool = Field(
+        default=False, description="动态效果（镜头推拉、文字淡入、转场），逐帧渲染，不能与 hls 同时使用"
+    )
 
 
 class VideoGenerationResponse(BaseModel):
@@ -58,9 +76,18 @@ class VideoGenerationResponse(BaseModel):
     audio_url: Optional[str] = None
     video_url: Optional[str] = None
     thumbnail_url: Optional[str] = None
+    renditions: Optional[Dict[str, str]] = None
+    hls_url: Optional[str] = None
+    duration: Optional[float] = Field(default=None, description="成片实测时长（秒）")
+    media: Optional[Dict[str, Any]] = Field(
+        default=None, description="成片实测信息：分辨率、帧率、码率、编码格式"
+    )
     created_at: datetime
     completed_at: Optional[datetime] = None
     error_message: Optional[str] = None
+    progress: Optional[Dict[str, Any]] = Field(
+        default=None, description="进度：阶段、百分比、fps、速度、预计剩余秒数"
+    )
 
 
 def get_llm_service():
@@ -189,6 +216,13 @@ async def generate_video(
 
     提交视频生成任务，包含脚本生成、语音合成、视频渲染
     """
+    try:
+        ladder_rungs(profile_for(request.quality, request.target_platform), request.renditions)
+        if request.motion and request.hls:
+            raise ValueError("Motion rendering does not support HLS output")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
     task_id = f"video_{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6]}"
 
     logger.info(f"Starting video generation: {task_id}")
@@ -202,10 +236,13 @@ async def generate_video(
         "audio_url": None,
         "video_url": None,
         "thumbnail_url": None,
+        "renditions": None,
+        "hls_url": None,
         "created_at": datetime.utcnow(),
         "completed_at": None,
         "error_message": None,
     }
+    video_progress[task_id] = VideoProgress()
 
     # 后台执行生成
     background_tasks.add_task(process_video_generation, task_id, request)
@@ -218,11 +255,22 @@ async def generate_video(
     )
 
 
+def _task_response(task: Dict[str, Any]) -> VideoGenerationResponse:
+    """任务状态 + 当前进度"""
+    tracker = video_progress.get(task["id"])
+    return VideoGenerationResponse(
+        **task, progress=tracker.snapshot() if tracker else None
+    )
+
+
+@without_budget
 async def process_video_generation(task_id: str, request: VideoGenerationRequest):
     """后台处理视频生成"""
+    progress = video_progress.setdefault(task_id, VideoProgress())
     try:
         # 步骤1: 生成脚本
         logger.info(f"[{task_id}] Step 1: Generating script...")
+        progress.start("script")
 
         llm = get_llm_service()
         if llm:
@@ -251,9 +299,11 @@ async def process_video_generation(task_id: str, request: VideoGenerationRequest
             )
 
         video_tasks[task_id]["script"] = script
+        progress.complete("script")
 
         # 步骤2: 合成旁白语音 (如果配置了语音服务)
         logger.info(f"[{task_id}] Step 2: Generating narration audio...")
+        progress.start("audio")
         audio_path = None
 
         # 尝试生成语音
@@ -287,13 +337,13 @@ async def process_video_generation(task_id: str, request: VideoGenerationRequest
                                 Path("generated/audios") / f"{task_id}_audio.mp3"
                             )
 
-                            import httpx
-
-                            async with httpx.AsyncClient() as client:
-                                response = await client.get(audio_url, timeout=60)
-                                if response.status_code == 200:
-                                    audio_path.parent.mkdir(parents=True, exist_ok=True)
-                                    audio_path.write_bytes(response.content)
+                            client = http_clients.get("download")
+                            response = await client.get(
+                                audio_url, timeout=http_clients.timeout("download", 60)
+                            )
+                            if response.status_code == 200:
+                                audio_path.parent.mkdir(parents=True, exist_ok=True)
+                                audio_path.write_bytes(response.content)
 
                 logger.info(f"[{task_id}] Audio generation completed")
 
@@ -302,7 +352,12 @@ async def process_video_generation(task_id: str, request: VideoGenerationRequest
                     f"[{task_id}] Audio generation failed (continuing without audio): {e}"
                 )
 
+        progress.complete("audio")
+
         # 步骤3: 渲染视频
+        if video_tasks[task_id]["status"] == "cancelled":
+            logger.info(f"[{task_id}] Cancelled before rendering")
+            return
         logger.info(f"[{task_id}] Step 3: Rendering video...")
 
         scenes_data = [
@@ -316,31 +371,29 @@ async def process_video_generation(task_id: str, request: VideoGenerationRequest
             for scene in script.scenes
         ]
 
+        # 拼接、旁白混流和缩略图在同一次 FFmpeg 调用中完成
+        encoding = profile_for(request.quality, request.target_platform)
+        if request.hls:
+            # 播放列表在渲染开始时写出，随场景编码完成不断增长
+            video_tasks[task_id]["hls_url"] = video_composer.hls_url(task_id)
         video_result = await video_composer.create_simple_video(
             task_id=task_id,
             title=request.product_name,
             scenes=scenes_data,
             duration=request.target_duration,
+            priority="preview" if request.quality == "preview" else "final",
+            audio_path=audio_path if audio_path and audio_path.exists() else None,
+            progress=progress,
+            profile=encoding.name,
+            renditions=request.renditions,
+            hls=request.hls,
+            motion=request.motion,
         )
 
-        # 如果有音频，尝试合并
-        if audio_path and audio_path.exists():
-            try:
-                video_path = Path("generated/videos") / f"{task_id}.mp4"
-                output_path = Path("generated/videos") / f"{task_id}_final.mp4"
-
-                success = await video_composer.combine_audio_video(
-                    video_path=video_path,
-                    audio_path=audio_path,
-                    output_path=output_path,
-                )
-
-                if success:
-                    video_result["video_url"] = f"/download/videos/{task_id}_final.mp4"
-                    logger.info(f"[{task_id}] Audio and video combined successfully")
-
-            except Exception as e:
-                logger.warning(f"[{task_id}] Audio-video combination failed: {e}")
+        # 渲染期间被取消（取消可能落在两次 FFmpeg 调用之间）
+        if video_tasks[task_id]["status"] == "cancelled":
+            logger.info(f"Video generation cancelled: {task_id}")
+            return
 
         # 更新完成状态
         video_tasks[task_id].update(
@@ -349,11 +402,21 @@ async def process_video_generation(task_id: str, request: VideoGenerationRequest
                 "completed_at": datetime.utcnow(),
                 "video_url": video_result.get("video_url"),
                 "thumbnail_url": video_result.get("thumbnail_url"),
+                "renditions": video_result.get("renditions") or None,
+                "hls_url": video_result.get("hls_url"),
+                "duration": video_result.get("duration"),
+                "media": video_result.get("media"),
             }
         )
 
         logger.info(f"Video generation completed: {task_id}")
 
+    except FFmpegCancelledError:
+        logger.info(f"Video generation cancelled: {task_id}")
+        video_tasks[task_id].update(
+            {"status": "cancelled", "completed_at": datetime.utcnow()}
+        )
+
     except Exception as e:
         logger.error(f"Video generation failed: {task_id} - {e}")
         video_tasks[task_id].update(
@@ -364,10 +427,17 @@ async def process_video_generation(task_id: str, request: VideoGenerationRequest
             }
         )
 
+    finally:
+        video_composer.finish(task_id)
+
 
 @router.get("/generations/{generation_id}", response_model=VideoGenerationResponse)
-async def get_video_status(generation_id: str):
-    """获取视频生成状态"""
+async def get_video_status(generation_id: str, response: Response):
+    """
+    获取视频生成状态
+
+    处理中的任务返回 Retry-After 头（按预计剩余时间给出的建议轮询间隔）
+    """
     task = video_tasks.get(generation_id)
     if not task:
         raise HTTPException(
@@ -375,7 +445,32 @@ async def get_video_status(generation_id: str):
             detail=f"Video generation task {generation_id} not found",
         )
 
-    return VideoGenerationResponse(**task)
+    result = _task_response(task)
+    if task["status"] == "processing" and result.progress:
+        response.headers["Retry-After"] = str(
+            max(1, round(result.progress["poll_after_seconds"]))
+        )
+    return result
+
+
+@router.post("/generations/{generation_id}/cancel", response_model=VideoGenerationResponse)
+async def cancel_video_generation(generation_id: str):
+    """取消视频生成（结束正在运行和排队中的 FFmpeg 进程）"""
+    task = video_tasks.get(generation_id)
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Video generation task {generation_id} not found",
+        )
+    if task["status"] != "processing":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Video generation task {generation_id} is already {task['status']}",
+        )
+
+    task.update({"status": "cancelled", "completed_at": datetime.utcnow()})
+    video_composer.cancel(generation_id)
+    return _task_response(task)
 
 
 @router.get("/generations", response_model=list[VideoGenerationResponse])
@@ -384,7 +479,7 @@ async def list_video_generations(limit: int = 10, offset: int = 0):
     tasks = list(video_tasks.values())
     tasks.sort(key=lambda x: x["created_at"], reverse=True)
     paginated = tasks[offset : offset + limit]
-    return [VideoGenerationResponse(**task) for task in paginated]
+    return [_task_response(task) for task in paginated]
 
 
 @router.get("/templates")
@@ -426,13 +521,18 @@ async def get_video_templates():
 async def health_check():
     """视频生成服务健康检查"""
     llm = get_llm_service()
+    ffmpeg = await video_composer.capabilities.load()
     return {
-        "available": llm is not None or video_composer.ffmpeg_available,
+        "available": llm is not None or ffmpeg.available,
         "llm_configured": settings.STEPFUN_API_KEY is not None,
-        "ffmpeg_available": video_composer.ffmpeg_available,
+        "ffmpeg_available": ffmpeg.available,
+        "ffmpeg": ffmpeg.to_dict(),
+        "ffmpeg_pool": ffmpeg_scheduler.stats(),
+        "segment_cache": video_composer.segment_cache.stats(),
+        "media_probe": media_probe.stats(),
         "services": {
             "script_generation": llm is not None,
             "voice_synthesis": settings.STEPFUN_API_KEY is not None,
-            "video_rendering": video_composer.ffmpeg_available,
+            "video_rendering": ffmpeg.available,
         },
     }
@@ -12,6 +12,8 @@ from fastapi import APIRouter, HTTPException, status, BackgroundTasks
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
+from app.core.http_clients import http_clients
+from app.core.latency import without_budget
 from app.core.logging import logger
 from app.db.mongodb import db
 
@@ -152,7 +154,11 @@ def get_tts_service() -> Optional[StepFunTTS]:
         return None
 
     try:
-        return StepFunTTS(api_key=api_key, cache_dir="./generated/voice_cache")
+        return StepFunTTS(
+            api_key=api_key,
+            cache_dir="./generated/voice_cache",
+            client=http_clients.get("stepfun"),
+        )
     except Exception as e:
         logger.error(f"Failed to initialize StepFun TTS: {e}")
         return None
@@ -317,6 +323,7 @@ async def generate_voice(
     )
 
 
+@without_budget
 async def process_voice_generation(
     generation_id: str, request: VoiceGenerationRequest, voice_id: str
 ):
@@ -101,9 +101,52 @@ class Settings(BaseSettings):
     AZURE_SPEECH_KEY: Optional[str] = None
     AZURE_SPEECH_REGION: Optional[str] = None
 
+    # 服务商 HTTP 客户端：启用 HTTP/2（需要 h2）、每个服务商的默认连接数上限、
+    # 空闲连接保持时间（秒）、建立连接 / 等待连接池的超时（秒）
+    HTTP_CLIENT_HTTP2: bool = True
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 20
+    HTTP_CLIENT_KEEPALIVE_SECONDS: float = 30.0
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = 5.0
+
+    # AI 服务商路由（auto）：滚动窗口的样本数和时长（秒）、开始按延迟排序前每个服务商的
+    # 最少样本数、视为不健康的错误率、探索流量比例
+    AI_ROUTER_WINDOW_SIZE: int = 200
+    AI_ROUTER_WINDOW_SECONDS: float = 600.0
+    AI_ROUTER_MIN_SAMPLES: int = 5
+    AI_ROUTER_MAX_ERROR_RATE: float = 0.5
+    AI_ROUTER_EXPLORATION: float = 0.1
+
+    # 对冲请求（文本生成和文案生成的 auto 模式，如 /chinese-ai/chat，默认关闭）：主服务商超过
+    # 其延迟分位数（不低于 MIN_DELAY 秒）仍未返回时发给第二个服务商；每个主请求积累
+    # BUDGET_RATIO（最大 1.0，即花费最多翻倍）个对冲额度，最多积累 BUDGET_BURST 个
+    AI_HEDGING_ENABLED: bool = False
+    AI_HEDGING_PERCENTILE: float = 0.9
+    AI_HEDGING_MIN_DELAY: float = 0.5
+    AI_HEDGING_BUDGET_RATIO: float = 0.1
+    AI_HEDGING_BUDGET_BURST: float = 5.0
+
+    # 服务商熔断：连续失败次数阈值、熔断冷却时间（秒）、半开状态放行的探测请求数
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    AI_CIRCUIT_RECOVERY_SECONDS: float = 30.0
+    AI_CIRCUIT_HALF_OPEN_CALLS: int = 1
+
+    # 服务商限流：开关、排队等待上限（秒，另受请求延迟预算限制）、是否通过 Redis 在
+    # 集群内共享配额；AI_RATE_LIMITS_STR 覆盖默认配额，格式 "openai=500/150000/16,
+    # stability=150/0/4"（每分钟请求数/每分钟 token 数/最大并发，0 表示不限制）
+    AI_RATE_LIMIT_ENABLED: bool = True
+    AI_RATE_LIMIT_QUEUE_TIMEOUT: float = 30.0
+    AI_RATE_LIMIT_CLUSTER: bool = False
+    AI_RATE_LIMITS_STR: str = ""
+
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
 
+    # Latency
+    # 模拟延迟配置: off（生产环境）/ demo / slow，仅用于演示
+    SIMULATED_LATENCY_PROFILE: str = "off"
+    # 默认请求延迟预算（毫秒），0 表示不限制；客户端可通过 X-Latency-Budget-Ms 请求头指定
+    DEFAULT_LATENCY_BUDGET_MS: int = 0
+
     # Logging
     LOG_LEVEL: str = "INFO"
 
@@ -133,11 +176,77 @@ class Settings(BaseSettings):
 
     # FFmpeg 路径 (用于视频处理)
     FFMPEG_PATH: str = "ffmpeg"
+    # ffprobe 路径（空字符串表示取 FFMPEG_PATH 同目录下的 ffprobe）
+    FFPROBE_PATH: str = ""
+    # 媒体探测结果的进程内缓存条数；单次 ffprobe 超时（秒）
+    MEDIA_PROBE_CACHE_SIZE: int = 512
+    MEDIA_PROBE_TIMEOUT: float = 30.0
 
     # 视频生成配置
     VIDEO_DEFAULT_RESOLUTION: str = "1080p"  # 720p, 1080p, 4k
     VIDEO_DEFAULT_FPS: int = 30
     VIDEO_MAX_DURATION_SECONDS: int = 300  # 最大5分钟
+    # 视频水印文字（绘制在场景画面上，空字符串表示不加水印）
+    VIDEO_WATERMARK_TEXT: str = ""
+    # 默认编码档位：preview / douyin / xiaohongshu / bilibili / youtube / archival
+    VIDEO_DEFAULT_PROFILE: str = "youtube"
+    # 品牌片头 / 片尾卡片文字（空字符串表示不加）及其时长（秒）
+    VIDEO_INTRO_TEXT: str = ""
+    VIDEO_OUTRO_TEXT: str = ""
+    VIDEO_BRAND_CARD_SECONDS: float = 2.0
+    # 已编码场景片段的磁盘缓存上限（MB），超出后按 LRU 淘汰
+    VIDEO_SEGMENT_CACHE_MAX_MB: int = 2048
+    # HLS 输出：分片时长（秒）；是否每个场景写单个文件并用字节范围引用分片
+    # （需要下载服务支持 Range 请求，如 nginx / CDN）
+    VIDEO_HLS_SEGMENT_SECONDS: float = 2.0
+    VIDEO_HLS_BYTE_RANGES: bool = False
+    # 逐帧渲染：场景交叉淡化时长（秒）；生成线程与 FFmpeg 之间的帧队列长度
+    VIDEO_TRANSITION_SECONDS: float = 0.5
+    VIDEO_FRAME_QUEUE_SIZE: int = 8
+
+    # FFmpeg 任务调度：同时运行的进程数（0 表示按 CPU 核数 / 每任务线程数自动计算）
+    FFMPEG_MAX_JOBS: int = 0
+    # 每个 FFmpeg 任务的编码线程数
+    FFMPEG_THREADS_PER_JOB: int = 2
+    # 单个 FFmpeg 任务的运行超时（秒）
+    FFMPEG_JOB_TIMEOUT: float = 600.0
+
+    # =============================================================================
+    # 海报渲染配置
+    # =============================================================================
+
+    # 渲染进程数，0 表示在线程池中渲染（开发/测试环境）
+    POSTER_RENDER_WORKERS: int = 2
+    # 同时在途（执行中+排队）的渲染任务上限
+    POSTER_RENDER_MAX_PENDING: int = 8
+    # 渲染池已满时等待空闲槽位的超时时间（秒）
+    POSTER_RENDER_QUEUE_TIMEOUT: float = 10.0
+
+    # 确定性渲染：相同输入生成相同海报（渲染缓存的前提）
+    POSTER_DETERMINISTIC: bool = True
+    # 渲染缓存：按内容哈希复用已生成的海报文件
+    POSTER_CACHE_ENABLED: bool = True
+    POSTER_CACHE_MAX_ENTRIES: int = 500
+    POSTER_CACHE_MAX_MB: int = 512
+    # 在 Redis 中共享缓存索引（多实例部署时开启）
+    POSTER_CACHE_REDIS: bool = False
+
+    # 默认导出格式（逗号分隔）: png, jpg, webp, avif
+    POSTER_EXPORT_FORMATS: str = "png,jpg"
+    # 编码线程数
+    POSTER_EXPORT_THREADS: int = 4
+    # 压缩参数
+    POSTER_PNG_COMPRESS_LEVEL: int = 6  # 0-9，越大文件越小、编码越慢
+    POSTER_JPEG_QUALITY: int = 90
+    POSTER_WEBP_QUALITY: int = 85
+
+    # 字体目录（放入 .ttf/.otf/.ttc 即可优先使用，启动时不会联网下载）
+    POSTER_FONT_DIR: str = "fonts"
+    # 额外的字体文件（逗号分隔，优先级最高，按顺序作为回退链）
+    POSTER_FONT_PATHS: str = ""
+
+    # 批量变体渲染（同一内容的多个配色/模板）单次请求的变体数上限
+    POSTER_VARIANTS_MAX: int = 12
 
     class Config:
         # 从后端目录加载 .env 文件
@@ -0,0 +1,163 @@
+"""
+HTTP client registry
+
+每个 AI 服务商共用一个长连接的 httpx.AsyncClient（连接池、keep-alive、可用时启用 HTTP/2），
+请求不再各自建立 TCP / TLS 连接；在应用 lifespan 中打开并在关闭时统一释放
+"""
+
+import asyncio
+import importlib.util
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+@dataclass(frozen=True)
+class ProviderLimits:
+    """服务商的连接池配置（None 表示使用 HTTP_CLIENT_* 全局配置）"""
+
+    max_connections: Optional[int] = None
+    max_keepalive: Optional[int] = None
+    read_timeout: float = 60.0
+    http2: bool = True
+
+
+PROVIDER_LIMITS: Dict[str, ProviderLimits] = {
+    "openai": ProviderLimits(max_connections=20),
+    "stepfun": ProviderLimits(max_connections=20),
+    "minimax": ProviderLimits(max_connections=20),
+    # 图像生成单次请求耗时长、并发低
+    "stability": ProviderLimits(max_connections=8, read_timeout=120.0),
+    "replicate": ProviderLimits(max_connections=8, read_timeout=30.0),
+    "runway": ProviderLimits(max_connections=8, read_timeout=30.0),
+    "github": ProviderLimits(max_connections=10, read_timeout=10.0),
+    # 下载生成结果（CDN 地址，各不相同）
+    "download": ProviderLimits(max_connections=10, read_timeout=120.0),
+}
+
+DEFAULT_LIMITS = ProviderLimits()
+
+
+def http2_supported() -> bool:
+    """httpx 的 HTTP/2 支持需要 h2 包（httpx[http2]）"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def status_error(message: str, response: httpx.Response) -> httpx.HTTPStatusError:
+    """服务商返回错误状态码时抛出的异常（保留状态码，熔断器据此区分服务商故障和请求错误）"""
+    return httpx.HTTPStatusError(message, request=response.request, response=response)
+
+
+class HTTPClientRegistry:
+    """
+    按服务商管理共享的 httpx.AsyncClient
+
+    - get() 按需创建客户端，lifespan 之外（脚本、测试）也可以使用
+    - 客户端绑定创建时的事件循环，在另一个事件循环中使用时重新创建并关闭旧客户端
+    - close() 关闭全部客户端
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, Tuple[httpx.AsyncClient, Any]] = {}
+        self._http2 = settings.HTTP_CLIENT_HTTP2 and http2_supported()
+        if settings.HTTP_CLIENT_HTTP2 and not self._http2:
+            logger.info("h2 not installed, provider HTTP clients use HTTP/1.1")
+
+    @staticmethod
+    def limits_for(provider: str) -> ProviderLimits:
+        return PROVIDER_LIMITS.get(provider, DEFAULT_LIMITS)
+
+    def timeout(self, provider: str, read: Optional[float] = None) -> httpx.Timeout:
+        """
+        单次请求的超时：read 为读取超时（秒），连接和排队等待连接的超时保持较短，
+        服务商不可达时尽快失败
+        """
+        limits = self.limits_for(provider)
+        return httpx.Timeout(
+            read or limits.read_timeout,
+            connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT,
+            pool=settings.HTTP_CLIENT_CONNECT_TIMEOUT,
+        )
+
+    def _create(self, provider: str) -> httpx.AsyncClient:
+        limits = self.limits_for(provider)
+        max_connections = limits.max_connections or settings.HTTP_CLIENT_MAX_CONNECTIONS
+        return httpx.AsyncClient(
+            http2=self._http2 and limits.http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=limits.max_keepalive or max_connections,
+                keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_SECONDS,
+            ),
+            timeout=self.timeout(provider),
+        )
+
+    def get(self, provider: str) -> httpx.AsyncClient:
+        """服务商的共享客户端（不要用 async with 关闭它）"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        entry = self._clients.get(provider)
+        if entry is not None and not entry[0].is_closed and entry[1] is loop:
+            return entry[0]
+        if entry is not None and not entry[0].is_closed:
+            self._discard(*entry, loop)
+
+        client = self._create(provider)
+        self._clients[provider] = (client, loop)
+        return client
+
+    @staticmethod
+    def _discard(client: httpx.AsyncClient, client_loop: Any, loop: Any):
+        """
+        关闭被替换的客户端
+
+        创建它的事件循环仍在运行时交给该循环关闭，否则在当前事件循环中关闭
+        """
+        if client_loop is not None and client_loop.is_running() and client_loop is not loop:
+            asyncio.run_coroutine_threadsafe(client.aclose(), client_loop)
+        elif loop is not None:
+            loop.create_task(HTTPClientRegistry._aclose(client))
+
+    @staticmethod
+    async def _aclose(client: httpx.AsyncClient):
+        try:
+            await client.aclose()
+        except Exception as e:
+            # 原事件循环已关闭时，其连接无法再正常关闭
+            logger.debug(f"Failed to close replaced HTTP client: {e}")
+
+    async def open(self, providers=None):
+        """预先创建客户端（应用启动时调用）"""
+        for provider in providers or PROVIDER_LIMITS:
+            self.get(provider)
+        logger.info(
+            f"HTTP clients ready for {len(self._clients)} providers "
+            f"({'HTTP/2' if self._http2 else 'HTTP/1.1'})"
+        )
+
+    async def close(self):
+        """关闭全部客户端（应用关闭时调用）"""
+        clients, self._clients = self._clients, {}
+        loop = asyncio.get_running_loop()
+        for client, client_loop in clients.values():
+            # 其他事件循环创建的客户端无法在这里关闭，直接丢弃
+            if client_loop is loop and not client.is_closed:
+                await client.aclose()
+        if clients:
+            logger.info("HTTP clients closed")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "http2": self._http2,
+            "providers": sorted(self._clients),
+        }
+
+
+# Global HTTP client registry
+http_clients = HTTPClientRegistry()
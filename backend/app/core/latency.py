@@ -0,0 +1,146 @@
+"""
+Latency utilities
+
+- 模拟延迟：演示环境下为各操作注入固定延迟，生产环境（profile=off）不产生任何等待
+- 延迟预算：为单个请求设置截止时间，沿调用链传递（contextvars），超出后快速失败
+"""
+
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.logging import logger
+
+T = TypeVar("T")
+
+# 各操作的模拟延迟（秒）
+LATENCY_PROFILES: Dict[str, Dict[str, float]] = {
+    "off": {},
+    "demo": {
+        "poster.render": 1.5,
+        "poster.mock": 2.0,
+        "batch.poster": 2.0,
+        "batch.video": 3.0,
+        "batch.voice": 1.0,
+        "batch.ip": 2.0,
+    },
+    "slow": {
+        "poster.render": 3.0,
+        "poster.mock": 4.0,
+        "batch.poster": 4.0,
+        "batch.video": 6.0,
+        "batch.voice": 2.0,
+        "batch.ip": 4.0,
+    },
+}
+
+
+class LatencyBudgetExceeded(Exception):
+    """请求的延迟预算已用完"""
+
+    pass
+
+
+class LatencyBudget:
+    """单个请求的延迟预算"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """剩余时间（秒），不小于 0"""
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+_current_budget: ContextVar[Optional[LatencyBudget]] = ContextVar(
+    "latency_budget", default=None
+)
+
+
+def current_budget() -> Optional[LatencyBudget]:
+    """当前请求的延迟预算（未设置时为 None）"""
+    return _current_budget.get()
+
+
+@contextmanager
+def latency_budget(seconds: Optional[float]) -> Iterator[Optional[LatencyBudget]]:
+    """
+    在上下文中设置延迟预算
+
+    seconds 为 None 或不大于 0 时不限制
+    """
+    budget = LatencyBudget(seconds) if seconds and seconds > 0 else None
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+def without_budget(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """
+    后台任务装饰器：不继承请求的延迟预算
+
+    BackgroundTasks / create_task 会复制请求的上下文，响应返回后预算往往已经用完，
+    后台任务不应因此失败
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        with latency_budget(None):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+async def within_budget(awaitable: Awaitable[T], operation: str = "operation") -> T:
+    """在剩余预算内等待，超时抛出 LatencyBudgetExceeded"""
+    budget = current_budget()
+    if budget is None:
+        return await awaitable
+
+    if budget.expired:
+        # 预算已耗尽，直接放弃（关闭协程避免 "never awaited" 警告）
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise LatencyBudgetExceeded(f"Latency budget exhausted before {operation}")
+
+    try:
+        return await asyncio.wait_for(awaitable, timeout=budget.remaining())
+    except asyncio.TimeoutError:
+        raise LatencyBudgetExceeded(
+            f"{operation} exceeded latency budget of {budget.seconds:.2f}s"
+        )
+
+
+def simulated_delay(operation: str) -> float:
+    """当前模拟延迟配置下某操作的延迟（秒）"""
+    profile = LATENCY_PROFILES.get(settings.SIMULATED_LATENCY_PROFILE, {})
+    return profile.get(operation, 0.0)
+
+
+async def simulate_latency(operation: str):
+    """
+    按模拟延迟配置等待
+
+    模拟延迟放不进剩余预算时直接跳过，演示延迟不应成为请求超时的原因
+    """
+    delay = simulated_delay(operation)
+    if delay <= 0:
+        return
+
+    budget = current_budget()
+    if budget is not None and delay >= budget.remaining():
+        logger.debug(f"Skipping simulated latency for {operation}: budget too small")
+        return
+
+    await asyncio.sleep(delay)
@@ -65,6 +65,9 @@ class MongoDB:
         await self.database.video_generations.create_index("status")
         await self.database.video_generations.create_index("created_at")
 
+        # Media metadata collection (_id 为 路径:大小:修改时间)
+        await self.database.media_metadata.create_index("path")
+
         # Voice generations collection
         await self.database.voice_generations.create_index("user_id")
         await self.database.voice_generations.create_index("status")
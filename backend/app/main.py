@@ -4,16 +4,22 @@ PitchCube API - Main Application
 
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.api.v1 import router as api_v1_router
 from app.core.config import settings
+from app.core.http_clients import http_clients
+from app.core.latency import LatencyBudgetExceeded, latency_budget
 from app.core.logging import logger
 from app.db.mongodb import connect_mongodb, close_mongodb
 from app.db.redis import connect_redis, close_redis
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.ffmpeg_capabilities import ffmpeg_capabilities
+from app.services.poster_executor import RenderPoolSaturatedError, poster_executor
+from app.services.rate_limiter import RateLimitExceeded
 
 
 @asynccontextmanager
@@ -28,6 +34,12 @@ async def lifespan(app: FastAPI):
     except Exception as exc:
         logger.warning(f"MongoDB unavailable, continuing without DB: {exc}")
     await connect_redis()
+
+    # Shared provider HTTP clients (connection pooling / keep-alive)
+    await http_clients.open()
+
+    # Detect FFmpeg encoders / filters in the background
+    ffmpeg_capabilities.start_background()
     
     logger.info("PitchCube API started successfully!")
     
@@ -39,6 +51,12 @@ async def lifespan(app: FastAPI):
     # Close database connections
     await close_mongodb()
     await close_redis()
+
+    # Close provider HTTP clients
+    await http_clients.close()
+
+    # Stop poster render workers
+    poster_executor.shutdown()
     
     logger.info("PitchCube API shutdown complete!")
 
@@ -64,6 +82,44 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Per-request latency budget (X-Latency-Budget-Ms header)
+    @app.middleware("http")
+    async def latency_budget_middleware(request: Request, call_next):
+        budget_ms = settings.DEFAULT_LATENCY_BUDGET_MS
+        header = request.headers.get("X-Latency-Budget-Ms")
+        if header:
+            try:
+                budget_ms = int(header)
+            except ValueError:
+                pass
+
+        with latency_budget(budget_ms / 1000 if budget_ms > 0 else None):
+            return await call_next(request)
+
+    @app.exception_handler(LatencyBudgetExceeded)
+    async def latency_budget_exceeded_handler(request: Request, exc: LatencyBudgetExceeded):
+        return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+    @app.exception_handler(CircuitOpenError)
+    async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(max(1, int(exc.retry_after)))},
+        )
+
+    @app.exception_handler(RateLimitExceeded)
+    async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+        )
+
+    @app.exception_handler(RenderPoolSaturatedError)
+    async def render_pool_saturated_handler(request: Request, exc: RenderPoolSaturatedError):
+        return JSONResponse(status_code=503, content={"detail": str(exc)})
+
     # Include API routers
     app.include_router(api_v1_router, prefix="/api/v1")
 
@@ -3,10 +3,12 @@
 整合所有 AI 服务，提供统一的接口和管理功能
 """
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Awaitable, Callable, Sequence, Tuple, TypeVar
 from enum import Enum
 
 from app.core.config import settings
+from app.core.http_clients import http_clients
+from app.core.latency import LatencyBudgetExceeded
 from app.core.logging import logger
 
 # 导入各个服务
@@ -16,6 +18,10 @@ from app.services.stepfun_service import StepFunLLM
 from app.services.minimax_service import MinimaxLLM, MinimaxTTS, MinimaxService
 from app.services.video_generation_service import video_service_manager, VideoProvider
 from app.services.ai_roleplay_service import ai_roleplay_service
+from app.services.circuit_breaker import circuit_breakers
+from app.services.provider_router import provider_router
+from app.services.rate_limiter import estimate_tokens, rate_limiter
+from app.services.request_hedging import hedge_budget, hedged
 import sys
 from pathlib import Path
 
@@ -28,6 +34,33 @@ except ImportError:
     STEPFUN_TTS_AVAILABLE = False
 
 
+T = TypeVar("T")
+
+# auto 模式下各操作的候选服务商（样本不足时按此顺序试用）
+TEXT_PROVIDERS = ("stepfun", "minimax", "openai")
+COPYWRITING_PROVIDERS = ("openai", "stepfun", "minimax")
+IMAGE_PROVIDERS = ("openai", "stability")
+SPEECH_PROVIDERS = ("stepfun", "minimax")
+
+# 未指定 max_tokens 时按此估算一次对话的输出 token 数（用于 tpm 限流）
+DEFAULT_COMPLETION_TOKENS = 1000
+
+OPERATION_PROVIDERS = {
+    "text": TEXT_PROVIDERS,
+    "copywriting": COPYWRITING_PROVIDERS,
+    "image": IMAGE_PROVIDERS,
+    "speech": SPEECH_PROVIDERS,
+}
+
+# 故障转移时参考的 recommend_service 任务类型
+FALLBACK_TASKS = {
+    "text": "copywriting",
+    "copywriting": "copywriting",
+    "image": "image_generation",
+    "speech": "voice_synthesis",
+}
+
+
 class AIServiceType(Enum):
     """AI 服务类型"""
 
@@ -179,49 +212,225 @@ class AIServiceManager:
             available.append("azure_speech")
         return available
 
+    def _provider_ready(self, operation: str, provider: str) -> bool:
+        """服务商已配置且支持该操作"""
+        if provider == "stepfun" and operation == "speech":
+            return self.status.stepfun and STEPFUN_TTS_AVAILABLE
+        return self.is_service_available(provider)
+
+    def rank_providers(self, operation: str, candidates: Sequence[str]) -> List[str]:
+        """
+        已配置的候选服务商按当前表现排序（延迟感知路由）
+
+        Raises:
+            ValueError: 没有已配置的候选服务商
+        """
+        ready = [p for p in candidates if self._provider_ready(operation, p)]
+        if not ready:
+            raise ValueError(f"No {operation} service available")
+        # 排除熔断中的服务商；全部熔断时保留，由熔断器直接失败
+        closed = [p for p in ready if circuit_breakers.available(p)]
+        return provider_router.rank(operation, closed or ready)
+
+    def select_provider(self, operation: str, candidates: Sequence[str]) -> str:
+        """从候选服务商中选出本次调用使用的服务商"""
+        return self.rank_providers(operation, candidates)[0]
+
+    async def call_provider(
+        self,
+        operation: str,
+        provider: str,
+        factory: Callable[[], Awaitable[T]],
+        tokens: int = 0,
+    ) -> T:
+        """
+        调用服务商并记录延迟和成败
+
+        所有服务商调用都经过这里，路由依据的延迟分布由此得到；服务商熔断时
+        直接抛出 CircuitOpenError，不再等待超时；调用前按服务商配额排队
+        （tokens 为估算的 token 数，计入 tpm）
+        """
+        breaker = circuit_breakers.get(provider)
+        if not breaker.available():
+            # 熔断中直接失败，不占用限流额度
+            breaker.before_call()
+        async with rate_limiter.slot(provider, tokens):
+            return await breaker.call(lambda: provider_router.call(operation, provider, factory))
+
+    async def call_hedged(
+        self,
+        operation: str,
+        provider: str,
+        backup: Optional[str],
+        factory: Callable[[str], Awaitable[T]],
+        tokens: int = 0,
+    ) -> T:
+        """
+        调用 provider，超过其延迟分位数仍未返回时对冲到 backup
+
+        factory 接收服务商名称并返回该服务商的调用；backup 为 None 或 provider
+        的延迟样本不足时不对冲
+        """
+        def attempt(name: str) -> Callable[[], Awaitable[T]]:
+            return lambda: self.call_provider(operation, name, lambda: factory(name), tokens)
+
+        if backup is None:
+            return await attempt(provider)()
+
+        delay = provider_router.latency(operation, provider, settings.AI_HEDGING_PERCENTILE)
+        if delay is not None:
+            delay = max(delay, settings.AI_HEDGING_MIN_DELAY)
+        return await hedged(attempt(provider), attempt(backup), delay, hedge_budget)
+
+    def _fallback_for(
+        self,
+        operation: str,
+        tried: Sequence[Optional[str]],
+        candidates: Optional[Sequence[str]] = None,
+    ) -> Optional[str]:
+        """
+        故障转移的服务商：recommend_service 推荐的 fallback（已经失败的正是它时
+        改用其 primary），需在候选范围内、已配置、支持该操作且未熔断
+        """
+        candidates = OPERATION_PROVIDERS[operation] if candidates is None else candidates
+        recommendation = self.recommend_service(FALLBACK_TASKS[operation])
+        for name in (recommendation["fallback"], recommendation["primary"]):
+            if (
+                name
+                and name not in tried
+                and name in candidates
+                and self._provider_ready(operation, name)
+                and circuit_breakers.available(name)
+            ):
+                return name
+        return None
+
+    async def call_with_failover(
+        self,
+        operation: str,
+        provider: str,
+        factory: Callable[[str], Awaitable[T]],
+        backup: Optional[str] = None,
+        failover: bool = True,
+        tokens: int = 0,
+        candidates: Optional[Sequence[str]] = None,
+    ) -> T:
+        """
+        调用服务商（可对冲），失败或熔断时转到推荐的备选服务商再试一次
+
+        candidates 限定可转移到的服务商（默认为该操作的全部候选）；
+        延迟预算耗尽时不再转移
+        """
+        try:
+            return await self.call_hedged(operation, provider, backup, factory, tokens)
+        except LatencyBudgetExceeded:
+            raise
+        except Exception as e:
+            fallback = (
+                self._fallback_for(operation, (provider, backup), candidates) if failover else None
+            )
+            if fallback is None:
+                raise
+            logger.warning(f"{operation} via {provider} failed ({e}), falling back to {fallback}")
+            return await self.call_provider(
+                operation, fallback, lambda: factory(fallback), tokens
+            )
+
+    def _route(
+        self, operation: str, candidates: Sequence[str], hedge: Optional[bool]
+    ) -> Tuple[str, Optional[str]]:
+        """auto 模式：(主服务商, 对冲服务商)"""
+        ranked = self.rank_providers(operation, candidates)
+        if hedge is None:
+            hedge = settings.AI_HEDGING_ENABLED
+        backup = ranked[1] if hedge and len(ranked) > 1 else None
+        return ranked[0], backup
+
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """各操作、各服务商的延迟分布和错误率，以及对冲和熔断统计"""
+        return {
+            **provider_router.stats(),
+            "hedging": hedge_budget.stats(),
+            "circuits": circuit_breakers.stats(),
+            "rate_limits": rate_limiter.stats(),
+        }
+
     # ============== 文本生成服务 ==============
 
-    async def generate_text(self, prompt: str, provider: str = "auto", **kwargs) -> str:
+    async def generate_text(
+        self, prompt: str, provider: str = "auto", hedge: Optional[bool] = None, **kwargs
+    ) -> str:
         """
         生成文本
 
         Args:
             prompt: 提示词
             provider: 提供商 (openai/stepfun/minimax/auto)
+            hedge: auto 模式下是否对冲到第二个服务商（None 时取 AI_HEDGING_ENABLED）
             **kwargs: 其他参数
 
         Returns:
             生成的文本
         """
-        if provider == "auto":
-            # 优先使用国产服务（StepFun/Minimax），其次 OpenAI
-            if self.status.stepfun:
-                provider = "stepfun"
-            elif self.status.minimax:
-                provider = "minimax"
-            elif self.status.openai:
-                provider = "openai"
-            else:
-                raise ValueError("No text generation service available")
+        _, content = await self.generate_text_with_provider(
+            prompt, provider, hedge=hedge, **kwargs
+        )
+        return content
 
-        if provider == "openai" and self.status.openai:
-            service = self._services["openai"]
-            messages = [{"role": "user", "content": prompt}]
-            return await service.chat_completion(messages, **kwargs)
+    async def generate_text_with_provider(
+        self,
+        prompt: str,
+        provider: str = "auto",
+        candidates: Sequence[str] = TEXT_PROVIDERS,
+        hedge: Optional[bool] = None,
+        **kwargs,
+    ) -> Tuple[str, str]:
+        """
+        生成文本，同时返回实际应答的服务商（auto 模式下可能经过对冲或故障转移）
 
-        elif provider == "stepfun" and self.status.stepfun:
-            service = self._services["stepfun"]
-            messages = [{"role": "user", "content": prompt}]
-            return await service.chat_completion(messages, **kwargs)
+        Args:
+            prompt: 提示词
+            provider: 提供商 (openai/stepfun/minimax/auto)
+            candidates: auto 模式下的候选服务商
+            hedge: auto 模式下是否对冲到第二个服务商（None 时取 AI_HEDGING_ENABLED）
+            **kwargs: 其他参数
 
-        elif provider == "minimax" and self.status.minimax:
-            service = self._services["minimax_llm"]
-            messages = [{"role": "user", "content": prompt}]
-            return await service.chat_completion(messages, **kwargs)
+        Returns:
+            (服务商, 生成的文本)
+        """
+        backup = None
+        auto = provider == "auto"
+        if auto:
+            # 发给当前最快的健康服务商（冷启动时优先国产服务，其次 OpenAI）
+            try:
+                provider, backup = self._route("text", candidates, hedge)
+            except ValueError:
+                raise ValueError("No text generation service available")
 
-        else:
+        if provider not in TEXT_PROVIDERS or not self._provider_ready("text", provider):
             raise ValueError(f"Provider {provider} not available")
 
+        messages = [{"role": "user", "content": prompt}]
+
+        async def chat(name: str) -> Tuple[str, str]:
+            return name, await self._chat(name, messages, **kwargs)
+
+        return await self.call_with_failover(
+            "text",
+            provider,
+            chat,
+            backup=backup,
+            failover=auto,
+            tokens=estimate_tokens(prompt)
+            + kwargs.get("max_tokens", DEFAULT_COMPLETION_TOKENS),
+            candidates=candidates,
+        )
+
+    async def _chat(self, provider: str, messages: List[Dict[str, str]], **kwargs) -> str:
+        """调用服务商的对话接口"""
+        service_key = "minimax_llm" if provider == "minimax" else provider
+        return await self._services[service_key].chat_completion(messages, **kwargs)
+
     async def generate_copywriting(
         self,
         product_name: str,
@@ -229,6 +438,7 @@ class AIServiceManager:
         style: str = "professional",
         language: str = "zh",
         provider: str = "auto",
+        hedge: Optional[bool] = None,
     ) -> Dict[str, str]:
         """
         生成营销文案
@@ -239,19 +449,44 @@ class AIServiceManager:
             style: 风格
             language: 语言
             provider: 提供商 (openai/stepfun/minimax/auto)
+            hedge: auto 模式下是否对冲到第二个服务商（None 时取 AI_HEDGING_ENABLED）
 
         Returns:
             文案字典
         """
-        if provider == "auto":
-            if self.status.openai:
-                provider = "openai"
-            elif self.status.stepfun:
-                provider = "stepfun"
-            elif self.status.minimax:
-                provider = "minimax"
+        backup = None
+        auto = provider == "auto"
+        if auto:
+            try:
+                provider, backup = self._route("copywriting", COPYWRITING_PROVIDERS, hedge)
+            except ValueError:
+                raise ValueError("No text generation service available")
+
+        if provider not in COPYWRITING_PROVIDERS or not self._provider_ready(
+            "copywriting", provider
+        ):
+            raise ValueError("No text generation service available")
 
-        if provider == "openai" and self.status.openai:
+        return await self.call_with_failover(
+            "copywriting",
+            provider,
+            lambda p: self._copywriting(p, product_name, product_description, style, language),
+            backup=backup,
+            failover=auto,
+            tokens=estimate_tokens(product_name + product_description)
+            + DEFAULT_COMPLETION_TOKENS,
+        )
+
+    async def _copywriting(
+        self,
+        provider: str,
+        product_name: str,
+        product_description: str,
+        style: str,
+        language: str,
+    ) -> Dict[str, str]:
+        """调用服务商生成营销文案"""
+        if provider == "openai":
             service = self._services["openai"]
             return await service.generate_copywriting(
                 product_name=product_name,
@@ -259,7 +494,7 @@ class AIServiceManager:
                 style=style,
                 language=language,
             )
-        elif provider == "stepfun" and self.status.stepfun:
+        elif provider == "stepfun":
             # 使用 StepFun 生成
             service = self._services["stepfun"]
             prompt = f"""请为产品"{product_name}"生成营销文案。
@@ -275,7 +510,7 @@ class AIServiceManager:
             ]
             response = await service.chat_completion(messages)
             return {"content": response}
-        elif provider == "minimax" and self.status.minimax:
+        else:
             # 使用 Minimax 生成
             service = self._services["minimax_llm"]
             return await service.generate_copywriting(
@@ -285,8 +520,6 @@ class AIServiceManager:
                 style=style,
                 length="medium",
             )
-        else:
-            raise ValueError("No text generation service available")
 
     # ============== 图像生成服务 ==============
 
@@ -304,26 +537,27 @@ class AIServiceManager:
         Returns:
             图像二进制数据
         """
-        if provider == "auto":
-            # 优先使用 OpenAI (DALL-E)，其次 Stability
-            if self.status.openai:
-                provider = "openai"
-            elif self.status.stability:
-                provider = "stability"
-            else:
+        auto = provider == "auto"
+        if auto:
+            # 冷启动时优先 OpenAI (DALL-E)，其次 Stability
+            try:
+                provider = self.select_provider("image", IMAGE_PROVIDERS)
+            except ValueError:
                 raise ValueError("No image generation service available")
 
-        if provider == "openai" and self.status.openai:
-            service = self._services["openai"]
-            images = await service.generate_image(prompt, **kwargs)
-            return images[0]
+        if provider not in IMAGE_PROVIDERS or not self._provider_ready("image", provider):
+            raise ValueError(f"Provider {provider} not available")
 
-        elif provider == "stability" and self.status.stability:
-            service = self._services["stability"]
-            return await service.generate_image(prompt, **kwargs)
+        return await self.call_with_failover(
+            "image", provider, lambda p: self._image(p, prompt, **kwargs), failover=auto
+        )
 
-        else:
-            raise ValueError(f"Provider {provider} not available")
+    async def _image(self, provider: str, prompt: str, **kwargs) -> bytes:
+        """调用服务商生成图像"""
+        if provider == "openai":
+            images = await self._services["openai"].generate_image(prompt, **kwargs)
+            return images[0]
+        return await self._services["stability"].generate_image(prompt, **kwargs)
 
     async def enhance_poster(
         self, product_name: str, description: str, style: str = "modern tech"
@@ -485,22 +719,36 @@ class AIServiceManager:
         Returns:
             音频数据
         """
-        if provider == "auto":
-            if self.status.stepfun and STEPFUN_TTS_AVAILABLE:
-                provider = "stepfun"
-            elif self.status.minimax:
-                provider = "minimax"
+        auto = provider == "auto"
+        if auto:
+            try:
+                provider = self.select_provider("speech", SPEECH_PROVIDERS)
+            except ValueError:
+                raise ValueError("TTS provider auto not available")
 
-        if provider == "stepfun" and self.status.stepfun and STEPFUN_TTS_AVAILABLE:
-            api_key = settings.STEPFUN_API_KEY
-            tts = StepFunTTS(api_key=api_key, cache_dir="./generated/voice_cache")
-            return await tts.generate(text, voice=voice, **kwargs)
+        if provider not in SPEECH_PROVIDERS or not self._provider_ready("speech", provider):
+            raise ValueError(f"TTS provider {provider} not available")
 
-        if provider == "minimax" and self.status.minimax:
-            service = self._services["minimax_tts"]
-            return await service.generate(text, voice=voice, **kwargs)
+        return await self.call_with_failover(
+            "speech", provider, lambda p: self._speech(p, text, voice, **kwargs), failover=auto
+        )
 
-        raise ValueError(f"TTS provider {provider} not available")
+    async def _speech(self, provider: str, text: str, voice: str, **kwargs) -> bytes:
+        """调用服务商合成语音"""
+        if provider == "stepfun":
+            return await self._stepfun_tts().generate(text, voice=voice, **kwargs)
+        return await self._services["minimax_tts"].generate(text, voice=voice, **kwargs)
+
+    def _stepfun_tts(self) -> "StepFunTTS":
+        """StepFun TTS 实例（首次使用时创建并复用，每次调用取当前的共享客户端）"""
+        tts = self._services.get("stepfun_tts")
+        if tts is None:
+            tts = self._services["stepfun_tts"] = StepFunTTS(
+                api_key=settings.STEPFUN_API_KEY,
+                cache_dir="./generated/voice_cache",
+            )
+        tts.client = http_clients.get("stepfun")
+        return tts
 
 # ============== 服务推荐 ==============
 
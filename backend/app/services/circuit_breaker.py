@@ -0,0 +1,212 @@
+"""
+AI 服务商熔断器
+连续失败达到阈值后熔断（open），冷却期内直接失败而不再等待超时；冷却结束后放行
+少量探测请求（half-open），成功则恢复（closed），失败则重新熔断
+"""
+
+import asyncio
+import threading
+import time
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import logger
+
+T = TypeVar("T")
+
+
+class CircuitState(str, Enum):
+    """熔断器状态"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """服务商已熔断（冷却期内直接失败）"""
+
+    def __init__(self, provider: str, retry_after: float):
+        self.provider = provider
+        self.retry_after = retry_after
+        super().__init__(f"Provider {provider} circuit open, retry after {retry_after:.0f}s")
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """
+    是否为服务商侧的故障（超时、连接错误、5xx、429）
+
+    参数校验、鉴权失败等 4xx 是调用方的问题，不应使服务商熔断
+    """
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+    else:
+        status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status >= 500 or status == 429)
+
+
+class CircuitBreaker:
+    """
+    单个服务商的熔断器
+
+    - closed：正常放行，连续失败 failure_threshold 次后转为 open
+    - open：recovery_timeout 秒内直接抛出 CircuitOpenError
+    - half-open：冷却结束后最多同时放行 half_open_max_calls 个探测请求，
+      成功则转为 closed，失败则重新 open
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        recovery_timeout: Optional[float] = None,
+        half_open_max_calls: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.AI_CIRCUIT_FAILURE_THRESHOLD
+        self.recovery_timeout = (
+            settings.AI_CIRCUIT_RECOVERY_SECONDS if recovery_timeout is None else recovery_timeout
+        )
+        self.half_open_max_calls = half_open_max_calls or settings.AI_CIRCUIT_HALF_OPEN_CALLS
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._rejected = 0
+        self._trips = 0
+
+    def _current_state(self, now: float) -> CircuitState:
+        if self._state == CircuitState.OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def available(self) -> bool:
+        """当前是否会放行请求（路由时用来排除熔断的服务商）"""
+        with self._lock:
+            state = self._current_state(self._clock())
+            if state == CircuitState.OPEN:
+                return False
+            return state == CircuitState.CLOSED or self._probes < self.half_open_max_calls
+
+    def before_call(self):
+        """
+        请求前检查
+
+        Raises:
+            CircuitOpenError: 熔断中，或半开状态下探测名额已满
+        """
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            if state == CircuitState.CLOSED:
+                return
+            if state == CircuitState.HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return
+            self._rejected += 1
+            retry_after = max(0.0, self.recovery_timeout - (now - self._opened_at))
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CircuitState.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def record_failure(self):
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            self._failures += 1
+            if state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+                if state != CircuitState.OPEN:
+                    self._trips += 1
+                    logger.warning(
+                        f"Circuit for {self.name} opened after {self._failures} failures, "
+                        f"cooling down {self.recovery_timeout:.0f}s"
+                    )
+                self._state = CircuitState.OPEN
+                self._opened_at = now
+                self._probes = 0
+
+    def release(self):
+        """请求被取消（没有结果）时归还半开探测名额"""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    async def call(self, factory: Callable[[], Awaitable[T]]) -> T:
+        """经过熔断器调用"""
+        self.before_call()
+        try:
+            result = await factory()
+        except Exception as e:
+            if is_provider_failure(e):
+                self.record_failure()
+            else:
+                # 调用方的错误：服务商本身可用，只归还半开探测名额
+                self.release()
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._current_state(self._clock()).value,
+                "failures": self._failures,
+                "trips": self._trips,
+                "rejected": self._rejected,
+            }
+
+
+class CircuitBreakerRegistry:
+    """按服务商名称管理熔断器"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(provider)
+            if breaker is None:
+                breaker = self._breakers[provider] = CircuitBreaker(provider)
+            return breaker
+
+    def available(self, provider: str) -> bool:
+        with self._lock:
+            breaker = self._breakers.get(provider)
+        return breaker is None or breaker.available()
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.stats() for name, breaker in sorted(breakers.items())}
+
+
+# 全局熔断器
+circuit_breakers = CircuitBreakerRegistry()
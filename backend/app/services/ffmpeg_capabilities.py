@@ -0,0 +1,215 @@
+"""
+FFmpeg 能力检测
+首次使用时（或启动后在后台）运行一次 ffmpeg -version / -encoders / -filters，
+缓存可用的编码器、滤镜和 CPU SIMD 特性，供视频合成选择可用的最快编码路径
+"""
+
+import asyncio
+import re
+import subprocess
+import threading
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Optional
+
+from app.core.config import settings
+from app.core.logging import logger
+
+# 软件编码器优先级（不使用硬件加速）：libx264 最快且质量最好，其次 OpenH264，
+# 最后是 FFmpeg 内置、任何构建都有的 MPEG-4 Part 2
+VIDEO_ENCODER_PREFERENCE = ("libx264", "libopenh264", "mpeg4")
+AUDIO_ENCODER_PREFERENCE = ("aac", "libfdk_aac", "libmp3lame")
+
+# 影响软件编码速度的 CPU 特性（x86 / ARM）
+SIMD_FLAGS = (
+    "sse2",
+    "ssse3",
+    "sse4_1",
+    "sse4_2",
+    "avx",
+    "avx2",
+    "fma",
+    "avx512f",
+    "asimd",
+    "neon",
+)
+
+_ENCODER_LINE = re.compile(r"^\s*([VAS][.A-Z]{5})\s+(\S+)\s")
+_FILTER_LINE = re.compile(r"^\s*([.A-Z|]{3})\s+(\S+)\s+\S*->\S*\s")
+
+
+def parse_encoders(output: str) -> FrozenSet[str]:
+    """解析 ffmpeg -encoders 输出（分隔线 ------ 之后每行一个编码器）"""
+    names = set()
+    started = False
+    for line in output.splitlines():
+        if not started:
+            started = line.strip().startswith("------")
+            continue
+        match = _ENCODER_LINE.match(line)
+        if match:
+            names.add(match.group(2))
+    return frozenset(names)
+
+
+def parse_filters(output: str) -> FrozenSet[str]:
+    """解析 ffmpeg -filters 输出"""
+    return frozenset(
+        match.group(2) for match in map(_FILTER_LINE.match, output.splitlines()) if match
+    )
+
+
+def cpu_flags(cpuinfo: str = "/proc/cpuinfo") -> FrozenSet[str]:
+    """读取 CPU SIMD 特性（非 Linux 或读取失败时为空）"""
+    try:
+        text = Path(cpuinfo).read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return frozenset()
+    for line in text.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().lower() in ("flags", "features"):
+            return frozenset(flag for flag in value.split() if flag in SIMD_FLAGS)
+    return frozenset()
+
+
+@dataclass(frozen=True)
+class FFmpegCapabilities:
+    """一次检测的结果"""
+
+    available: bool
+    version: Optional[str] = None
+    encoders: FrozenSet[str] = field(default_factory=frozenset)
+    filters: FrozenSet[str] = field(default_factory=frozenset)
+    cpu_flags: FrozenSet[str] = field(default_factory=frozenset)
+
+    def has_encoder(self, name: str) -> bool:
+        return name in self.encoders
+
+    def has_filter(self, name: str) -> bool:
+        return name in self.filters
+
+    def pick_encoder(self, preferred: str, fallbacks) -> Optional[str]:
+        """优先使用 preferred，不可用时按 fallbacks 顺序选择"""
+        for name in (preferred, *fallbacks):
+            if self.has_encoder(name):
+                return name
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "version": self.version,
+            "video_encoder": self.pick_encoder("libx264", VIDEO_ENCODER_PREFERENCE),
+            "audio_encoder": self.pick_encoder("aac", AUDIO_ENCODER_PREFERENCE),
+            "drawtext": self.has_filter("drawtext"),
+            "encoders": len(self.encoders),
+            "filters": len(self.filters),
+            "cpu_flags": sorted(self.cpu_flags),
+        }
+
+
+def detect_capabilities(ffmpeg_path: Optional[str] = None, timeout: float = 10.0) -> FFmpegCapabilities:
+    """运行 FFmpeg 检测版本、编码器和滤镜（阻塞）"""
+    ffmpeg_path = ffmpeg_path or settings.FFMPEG_PATH
+
+    def run(*args: str) -> str:
+        result = subprocess.run(
+            [ffmpeg_path, "-hide_banner", *args], capture_output=True, timeout=timeout
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg {' '.join(args)} exited with {result.returncode}")
+        return result.stdout.decode("utf-8", errors="replace")
+
+    try:
+        version = run("-version").splitlines()[0].split(" Copyright")[0].strip()
+        encoders = parse_encoders(run("-encoders"))
+        filters = parse_filters(run("-filters"))
+    except Exception as e:
+        logger.warning(f"FFmpeg check failed: {e}")
+        return FFmpegCapabilities(available=False, cpu_flags=cpu_flags())
+
+    return FFmpegCapabilities(
+        available=True,
+        version=version,
+        encoders=encoders,
+        filters=filters,
+        cpu_flags=cpu_flags(),
+    )
+
+
+class CapabilityRegistry:
+    """
+    FFmpeg 能力注册表
+
+    - 导入时不运行任何子进程；首次 detect() / load() 时检测一次并缓存
+    - load() 在线程池中检测，不阻塞事件循环；启动时可用 start_background() 提前检测
+    - adapt() 只使用已完成的检测结果，检测完成前原样返回编码档位
+    """
+
+    def __init__(self):
+        self._capabilities: Optional[FFmpegCapabilities] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Future] = None
+
+    def peek(self) -> Optional[FFmpegCapabilities]:
+        """已完成的检测结果（尚未检测时为 None）"""
+        return self._capabilities
+
+    def detect(self) -> FFmpegCapabilities:
+        """返回检测结果，尚未检测时在当前线程检测（阻塞）"""
+        if self._capabilities is None:
+            with self._lock:
+                if self._capabilities is None:
+                    capabilities = detect_capabilities()
+                    if capabilities.available:
+                        logger.info(
+                            f"FFmpeg detected: {capabilities.version} "
+                            f"(video {capabilities.pick_encoder('libx264', VIDEO_ENCODER_PREFERENCE)}, "
+                            f"audio {capabilities.pick_encoder('aac', AUDIO_ENCODER_PREFERENCE)})"
+                        )
+                    else:
+                        logger.warning(
+                            "FFmpeg not available. Video rendering will use fallback mode."
+                        )
+                    self._capabilities = capabilities
+        return self._capabilities
+
+    async def load(self) -> FFmpegCapabilities:
+        """在线程池中检测（已有结果时直接返回）"""
+        if self._capabilities is not None:
+            return self._capabilities
+        return await asyncio.get_running_loop().run_in_executor(None, self.detect)
+
+    def start_background(self):
+        """在后台开始检测（应用启动时调用）"""
+        if self._capabilities is None and self._task is None:
+            self._task = asyncio.ensure_future(self.load())
+
+    def reset(self):
+        """丢弃检测结果（更换 FFmpeg 后调用），下次使用时重新检测"""
+        with self._lock:
+            self._capabilities = None
+            self._task = None
+
+    def adapt(self, profile: Any) -> Any:
+        """
+        把编码档位的编码器换成本机可用的最快编码器
+
+        档位需有 video_codec / audio_codec 字段；检测未完成、FFmpeg 不可用或
+        档位指定的编码器可用时原样返回
+        """
+        capabilities = self._capabilities
+        if capabilities is None or not capabilities.available:
+            return profile
+        video = capabilities.pick_encoder(profile.video_codec, VIDEO_ENCODER_PREFERENCE)
+        audio = capabilities.pick_encoder(profile.audio_codec, AUDIO_ENCODER_PREFERENCE)
+        changes = {}
+        if video and video != profile.video_codec:
+            changes["video_codec"] = video
+        if audio and audio != profile.audio_codec:
+            changes["audio_codec"] = audio
+        return replace(profile, **changes) if changes else profile
+
+
+# 全局 FFmpeg 能力注册表
+ffmpeg_capabilities = CapabilityRegistry()
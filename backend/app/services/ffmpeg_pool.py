@@ -0,0 +1,329 @@
+"""
+FFmpeg 任务调度
+限制同时运行的 FFmpeg 进程数（按 CPU 核数和每个任务的线程数计算），
+排队任务按优先级出队（预览优先于成片），取消任务时结束对应的子进程
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Callable, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.ffmpeg_progress import ProgressParser
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+# 优先级（数值越小越先执行）
+PRIORITIES: Dict[str, int] = {
+    "preview": 0,
+    "final": 10,
+    "background": 20,
+}
+
+
+class FFmpegError(Exception):
+    """FFmpeg 执行失败"""
+
+    pass
+
+
+class FFmpegCancelledError(FFmpegError):
+    """FFmpeg 任务被取消"""
+
+    pass
+
+
+@dataclass
+class FFmpegJob:
+    """一个 FFmpeg 任务（排队或运行中）"""
+
+    id: int
+    priority: str
+    tag: Optional[str]
+    cmd: List[str]
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    process: Optional[asyncio.subprocess.Process] = None
+    waiter: Optional[asyncio.Future] = None
+    cancelled: bool = False
+    on_progress: Optional["ProgressCallback"] = None
+    stdin: Optional[AsyncIterable[bytes]] = None
+
+
+def default_max_jobs(threads_per_job: int) -> int:
+    """默认并发数：CPU 核数 / 每个任务的编码线程数"""
+    return max(1, (os.cpu_count() or 1) // max(1, threads_per_job))
+
+
+class FFmpegScheduler:
+    """
+    FFmpeg 任务调度器
+
+    - 同时运行的进程数不超过 max_jobs，其余任务按 (优先级, 提交顺序) 排队
+    - 调用方取消（asyncio 取消）或按标签 cancel() 时结束子进程；按标签取消后，
+      同一标签之后提交的任务直接失败，直到调用 finish(tag)
+    - 超过 job_timeout 的任务被结束并视为失败
+    """
+
+    def __init__(
+        self,
+        max_jobs: Optional[int] = None,
+        threads_per_job: Optional[int] = None,
+        job_timeout: Optional[float] = None,
+    ):
+        self.threads_per_job = threads_per_job or settings.FFMPEG_THREADS_PER_JOB
+        max_jobs = settings.FFMPEG_MAX_JOBS if max_jobs is None else max_jobs
+        self.max_jobs = max_jobs if max_jobs > 0 else default_max_jobs(self.threads_per_job)
+        self.job_timeout = settings.FFMPEG_JOB_TIMEOUT if job_timeout is None else job_timeout
+
+        self._ids = itertools.count(1)
+        self._queue: List[tuple] = []
+        self._running: Dict[int, FFmpegJob] = {}
+        self._cancelled_tags: Set[str] = set()
+        self._slots_in_use = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._max_queue_depth = 0
+        self._total_wait = 0.0
+
+    # ---------- 槽位 ----------
+
+    def _queued_jobs(self) -> List[FFmpegJob]:
+        return [job for _, _, job in self._queue if not job.waiter.done()]
+
+    async def _acquire(self, job: FFmpegJob):
+        if self._slots_in_use < self.max_jobs and not self._queued_jobs():
+            self._slots_in_use += 1
+            return
+
+        job.waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (PRIORITIES.get(job.priority, 10), job.id, job))
+        self._max_queue_depth = max(self._max_queue_depth, len(self._queued_jobs()))
+        try:
+            await job.waiter
+        except asyncio.CancelledError:
+            # 已经分到槽位后才被取消，槽位交还给下一个任务
+            if job.waiter.done() and not job.waiter.cancelled():
+                self._release()
+            else:
+                job.waiter.cancel()
+            raise
+
+    def _release(self):
+        """释放槽位：直接交给队列中优先级最高的任务"""
+        while self._queue:
+            _, _, job = heapq.heappop(self._queue)
+            if not job.waiter.done():
+                job.waiter.set_result(None)
+                return
+        self._slots_in_use -= 1
+
+    # ---------- 执行 ----------
+
+    async def run(
+        self,
+        cmd: List[str],
+        priority: str = "final",
+        tag: Optional[str] = None,
+        timeout: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        stdin: Optional[AsyncIterable[bytes]] = None,
+    ) -> bytes:
+        """
+        排队执行 FFmpeg 命令
+
+        Args:
+            cmd: 完整命令行
+            priority: preview / final / background
+            tag: 任务标签（如视频任务ID），用于 cancel()
+            timeout: 运行超时（秒），默认 FFMPEG_JOB_TIMEOUT
+            on_progress: 进度回调；提供时追加 -progress pipe:1，边运行边解析 stdout
+            stdin: 写入进程标准输入的数据流（如逐帧的原始画面），写完后关闭 stdin；
+                只在分到槽位后才开始迭代，数据源的异常会在进程结束后抛出
+
+        Returns:
+            stderr 输出
+
+        Raises:
+            FFmpegError: 进程失败或超时
+            FFmpegCancelledError: 任务被 cancel() 取消
+        """
+        if tag is not None and tag in self._cancelled_tags:
+            self._cancelled += 1
+            raise FFmpegCancelledError(f"FFmpeg jobs for {tag} cancelled")
+        if on_progress is not None:
+            cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+        job = FFmpegJob(
+            id=next(self._ids),
+            priority=priority,
+            tag=tag,
+            cmd=cmd,
+            on_progress=on_progress,
+            stdin=stdin,
+        )
+        try:
+            await self._acquire(job)
+        except FFmpegCancelledError:
+            self._cancelled += 1
+            raise
+
+        job.started_at = time.monotonic()
+        self._total_wait += job.started_at - job.submitted_at
+        self._running[job.id] = job
+        try:
+            return await self._execute(job, timeout or self.job_timeout)
+        finally:
+            self._running.pop(job.id, None)
+            self._release()
+
+    async def _execute(self, job: FFmpegJob, timeout: Optional[float]) -> bytes:
+        job.process = await asyncio.create_subprocess_exec(
+            *job.cmd,
+            stdin=asyncio.subprocess.PIPE if job.stdin is not None else None,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stderr = await asyncio.wait_for(self._communicate(job), timeout=timeout)
+        except asyncio.TimeoutError:
+            await self._kill(job)
+            self._failed += 1
+            raise FFmpegError(f"FFmpeg job {job.id} timed out after {timeout:.0f}s")
+        except asyncio.CancelledError:
+            await self._kill(job)
+            self._cancelled += 1
+            raise
+        except Exception:
+            # 标准输入的数据源出错
+            await self._kill(job)
+            self._failed += 1
+            raise
+
+        if job.cancelled:
+            self._cancelled += 1
+            raise FFmpegCancelledError(f"FFmpeg job {job.id} cancelled")
+        if job.process.returncode != 0:
+            self._failed += 1
+            raise FFmpegError(
+                f"FFmpeg exited with {job.process.returncode}: "
+                f"{stderr.decode(errors='ignore')[-500:]}"
+            )
+        self._completed += 1
+        return stderr
+
+    async def _communicate(self, job: FFmpegJob) -> bytes:
+        """
+        等待进程结束
+
+        有进度回调时逐行读取 stdout；有输入数据流时并发写入 stdin；stderr 在后台收集
+        """
+        process = job.process
+        if job.on_progress is None and job.stdin is None:
+            _, stderr = await process.communicate()
+            return stderr
+
+        stderr_task = asyncio.ensure_future(process.stderr.read())
+        feed_task = None
+        if job.stdin is not None:
+            feed_task = asyncio.ensure_future(self._feed(process, job.stdin))
+        try:
+            if job.on_progress is None:
+                await process.stdout.read()
+            else:
+                parser = ProgressParser()
+                async for raw in process.stdout:
+                    block = parser.feed(raw.decode(errors="ignore"))
+                    if block is None:
+                        continue
+                    try:
+                        job.on_progress(block)
+                    except Exception as e:
+                        logger.warning(f"FFmpeg progress callback failed: {e}")
+            await process.wait()
+            if feed_task is not None:
+                await feed_task
+            return await stderr_task
+        finally:
+            for task in (stderr_task, feed_task):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    @staticmethod
+    async def _feed(process: asyncio.subprocess.Process, source: AsyncIterable[bytes]):
+        """把数据流写入进程 stdin（drain 提供背压），写完后关闭"""
+        try:
+            async for chunk in source:
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # 进程提前退出，错误由退出码反映
+            pass
+        finally:
+            process.stdin.close()
+            # 提前结束时关闭数据源（停止生成后续数据）
+            aclose = getattr(source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def _kill(self, job: FFmpegJob):
+        process = job.process
+        if process is not None and process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    def cancel(self, tag: str) -> int:
+        """
+        取消指定标签的所有任务（排队中的直接出队，运行中的结束进程），
+        之后以该标签提交的任务也直接失败
+
+        Returns:
+            取消的任务数
+        """
+        self._cancelled_tags.add(tag)
+        count = 0
+        for job in self._queued_jobs():
+            if job.tag == tag:
+                job.waiter.set_exception(FFmpegCancelledError(f"FFmpeg job {job.id} cancelled"))
+                count += 1
+        for job in list(self._running.values()):
+            if job.tag == tag and not job.cancelled:
+                job.cancelled = True
+                if job.process is not None and job.process.returncode is None:
+                    job.process.kill()
+                count += 1
+        if count:
+            logger.info(f"Cancelled {count} FFmpeg jobs for {tag}")
+        return count
+
+    def finish(self, tag: str):
+        """标签对应的任务已结束（清除取消标记）"""
+        self._cancelled_tags.discard(tag)
+
+    def stats(self) -> Dict[str, Any]:
+        """调度器状态"""
+        queued = self._queued_jobs()
+        started = self._completed + self._failed + self._cancelled + len(self._running)
+        return {
+            "max_jobs": self.max_jobs,
+            "threads_per_job": self.threads_per_job,
+            "running": len(self._running),
+            "queued": len(queued),
+            "queued_by_priority": {
+                name: sum(1 for job in queued if job.priority == name) for name in PRIORITIES
+            },
+            "max_queue_depth": self._max_queue_depth,
+            "completed": self._completed,
+            "failed": self._failed,
+            "cancelled": self._cancelled,
+            "avg_wait_seconds": round(self._total_wait / started, 3) if started else 0.0,
+        }
+
+
+# 全局 FFmpeg 调度器
+ffmpeg_scheduler = FFmpegScheduler()
@@ -0,0 +1,161 @@
+"""
+FFmpeg 进度
+解析 `-progress pipe:1` 输出的 key=value 块，汇总为视频任务各阶段的百分比、fps、速度和预计剩余时间
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# 视频任务的阶段及其在总进度中的权重
+VIDEO_STAGES: Dict[str, float] = {
+    "script": 0.1,
+    "audio": 0.1,
+    "render": 0.7,
+    "finish": 0.1,
+}
+
+
+def _parse_time(value: str) -> Optional[float]:
+    """解析 HH:MM:SS.micro 格式"""
+    try:
+        hours, minutes, seconds = value.split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return None
+
+
+class ProgressParser:
+    """逐行解析 FFmpeg -progress 输出，每遇到 progress= 行产出一个进度块"""
+
+    def __init__(self):
+        self._block: Dict[str, str] = {}
+
+    def feed(self, line: str) -> Optional[Dict[str, Any]]:
+        line = line.strip()
+        if "=" not in line:
+            return None
+        key, value = line.split("=", 1)
+        self._block[key] = value
+        if key != "progress":
+            return None
+
+        block, self._block = self._block, {}
+        return self._summarize(block)
+
+    @staticmethod
+    def _summarize(block: Dict[str, str]) -> Dict[str, Any]:
+        out_seconds = None
+        # out_time_ms 实际单位也是微秒（FFmpeg 的历史遗留）
+        for key in ("out_time_us", "out_time_ms"):
+            if block.get(key, "N/A").lstrip("-").isdigit():
+                out_seconds = max(0, int(block[key])) / 1_000_000
+                break
+        if out_seconds is None and "out_time" in block:
+            out_seconds = _parse_time(block["out_time"])
+
+        def number(key: str) -> Optional[float]:
+            try:
+                return float(block.get(key, "").rstrip("x"))
+            except ValueError:
+                return None
+
+        frame = number("frame")
+        return {
+            "frame": int(frame) if frame is not None else None,
+            "fps": number("fps"),
+            "speed": number("speed"),
+            "out_seconds": out_seconds or 0.0,
+            "done": block.get("progress") == "end",
+        }
+
+
+class VideoProgress:
+    """
+    视频任务进度
+
+    每个阶段由若干作业组成（如每个场景片段一个作业），阶段进度为
+    已完成的媒体时长 / 总媒体时长；总进度按 VIDEO_STAGES 的权重加权
+    """
+
+    def __init__(self, stages: Optional[Dict[str, float]] = None):
+        self.stages = dict(stages or VIDEO_STAGES)
+        self.started_at = time.monotonic()
+        self.stage: Optional[str] = None
+        self._jobs: Dict[str, Dict[str, List[float]]] = {name: {} for name in self.stages}
+        self._completed: Dict[str, bool] = {name: False for name in self.stages}
+        self._fps: Optional[float] = None
+        self._speed: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def reset(self, *stages: str):
+        """清空阶段内已登记的作业（改用其他渲染方式重新开始时调用）"""
+        with self._lock:
+            for stage in stages:
+                self._jobs[stage] = {}
+                self._completed[stage] = False
+
+    def start(self, stage: str):
+        """进入阶段"""
+        with self._lock:
+            self.stage = stage
+
+    def add_job(self, stage: str, job: str, total: float):
+        """登记阶段内的作业及其媒体总时长（秒）"""
+        with self._lock:
+            self._jobs[stage].setdefault(job, [0.0, max(total, 0.001)])
+
+    def update(self, stage: str, job: str, block: Dict[str, Any]):
+        """用一个 FFmpeg 进度块更新作业"""
+        with self._lock:
+            entry = self._jobs[stage].setdefault(job, [0.0, 0.001])
+            entry[0] = entry[1] if block.get("done") else min(block["out_seconds"], entry[1])
+            if block.get("fps"):
+                self._fps = block["fps"]
+            if block.get("speed"):
+                self._speed = block["speed"]
+
+    def complete_job(self, stage: str, job: str):
+        """作业完成（包括直接命中缓存的作业）"""
+        with self._lock:
+            entry = self._jobs[stage].get(job)
+            if entry is not None:
+                entry[0] = entry[1]
+
+    def complete(self, stage: str):
+        """阶段完成"""
+        with self._lock:
+            self._completed[stage] = True
+
+    def _stage_fraction(self, stage: str) -> float:
+        if self._completed[stage]:
+            return 1.0
+        jobs = self._jobs[stage].values()
+        total = sum(entry[1] for entry in jobs)
+        return sum(entry[0] for entry in jobs) / total if total else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前进度（用于状态接口）"""
+        with self._lock:
+            fractions = {name: self._stage_fraction(name) for name in self.stages}
+            weight = sum(self.stages.values()) or 1.0
+            overall = sum(fractions[name] * w for name, w in self.stages.items()) / weight
+            elapsed = time.monotonic() - self.started_at
+
+            eta = None
+            if 0 < overall < 1:
+                eta = elapsed * (1 - overall) / overall
+            elif overall >= 1:
+                eta = 0.0
+
+            return {
+                "stage": self.stage,
+                "percent": round(overall * 100, 1),
+                "stages": {name: round(value * 100, 1) for name, value in fractions.items()},
+                "fps": self._fps,
+                "speed": self._speed,
+                "elapsed_seconds": round(elapsed, 1),
+                "eta_seconds": round(eta, 1) if eta is not None else None,
+                # 建议的轮询间隔：剩余时间的 1/4，限制在 1-10 秒
+                "poll_after_seconds": round(min(10.0, max(1.0, (eta or 4.0) / 4)), 1),
+            }
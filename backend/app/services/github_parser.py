@@ -4,11 +4,11 @@ GitHub 项目解析服务
 """
 
 import re
-import httpx
 from typing import Optional, Dict, List
 from datetime import datetime
 from dataclasses import dataclass
 
+from app.core.http_clients import http_clients
 from app.core.logging import logger
 
 
@@ -74,17 +74,17 @@ class GitHubParser:
         url = f"{self.base_url}/repos/{owner}/{repo}"
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=self._get_headers())
-
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 404:
-                    logger.warning(f"Repository not found: {owner}/{repo}")
-                    return None
-                else:
-                    logger.error(f"GitHub API error: {response.status_code}")
-                    return None
+            client = http_clients.get("github")
+            response = await client.get(url, headers=self._get_headers())
+
+            if response.status_code == 200:
+                return response.json()
+            elif response.status_code == 404:
+                logger.warning(f"Repository not found: {owner}/{repo}")
+                return None
+            else:
+                logger.error(f"GitHub API error: {response.status_code}")
+                return None
 
         except Exception as e:
             logger.error(f"Failed to fetch repo info: {e}")
@@ -101,22 +101,24 @@ class GitHubParser:
 
         for url in urls:
             try:
-                async with httpx.AsyncClient() as client:
-                    headers = self._get_headers()
-                    response = await client.get(url, headers=headers, timeout=10.0)
-
-                    if response.status_code == 200:
-                        # 如果是 API 返回的 JSON，提取 content
-                        if "api.github.com" in url:
-                            data = response.json()
-                            import base64
-
-                            content = base64.b64decode(data.get("content", "")).decode(
-                                "utf-8"
-                            )
-                            return content
-                        else:
-                            return response.text
+                client = http_clients.get("github")
+                headers = self._get_headers()
+                response = await client.get(
+                    url, headers=headers, timeout=http_clients.timeout("github", 10.0)
+                )
+
+                if response.status_code == 200:
+                    # 如果是 API 返回的 JSON，提取 content
+                    if "api.github.com" in url:
+                        data = response.json()
+                        import base64
+
+                        content = base64.b64decode(data.get("content", "")).decode(
+                            "utf-8"
+                        )
+                        return content
+                    else:
+                        return response.text
 
             except Exception as e:
                 logger.warning(f"Failed to fetch README from {url}: {e}")
@@ -0,0 +1,292 @@
+"""
+媒体探测服务
+用 ffprobe 读取生成文件的实际时长、分辨率、帧率和码率；每个文件（路径 + 大小 + 修改时间）
+只探测一次，结果保存在进程内 LRU 和 MongoDB media_metadata 集合中
+"""
+
+import asyncio
+import functools
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.db.mongodb import db
+
+MEDIA_COLLECTION = "media_metadata"
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """媒体文件的实测信息（没有对应流时相关字段为 None）"""
+
+    duration: Optional[float] = None
+    size: int = 0
+    format_name: Optional[str] = None
+    bit_rate: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    video_codec: Optional[str] = None
+    audio_codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+
+    @property
+    def resolution(self) -> Optional[str]:
+        if self.width and self.height:
+            return f"{self.width}x{self.height}"
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def ffprobe_path() -> str:
+    """FFPROBE_PATH，未配置时取 FFMPEG_PATH 同目录下的 ffprobe"""
+    if settings.FFPROBE_PATH:
+        return settings.FFPROBE_PATH
+    ffmpeg = Path(settings.FFMPEG_PATH)
+    if ffmpeg.name.startswith("ffmpeg"):
+        return str(ffmpeg.with_name(ffmpeg.name.replace("ffmpeg", "ffprobe", 1)))
+    return "ffprobe"
+
+
+def _number(value: Any, cast=float) -> Optional[Any]:
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _frame_rate(value: Optional[str]) -> Optional[float]:
+    """解析 "30000/1001" 格式的帧率，0/0 视为未知"""
+    if not value:
+        return None
+    numerator, _, denominator = value.partition("/")
+    num = _number(numerator)
+    den = _number(denominator) if denominator else 1.0
+    if not num or not den:
+        return None
+    return round(num / den, 3)
+
+
+def parse_ffprobe(data: Dict[str, Any], size: int = 0) -> MediaInfo:
+    """把 `ffprobe -show_format -show_streams -of json` 的输出转换为 MediaInfo"""
+    fmt = data.get("format") or {}
+    streams = data.get("streams") or []
+    # 封面图等附加画面也是视频流，跳过
+    video = next(
+        (
+            s
+            for s in streams
+            if s.get("codec_type") == "video"
+            and not (s.get("disposition") or {}).get("attached_pic")
+        ),
+        {},
+    )
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+
+    duration = _number(fmt.get("duration"))
+    if duration is None:
+        durations = [_number(s.get("duration")) for s in streams]
+        durations = [d for d in durations if d is not None]
+        duration = max(durations) if durations else None
+
+    return MediaInfo(
+        duration=round(duration, 3) if duration is not None else None,
+        size=_number(fmt.get("size"), int) or size,
+        format_name=fmt.get("format_name"),
+        bit_rate=_number(fmt.get("bit_rate"), int),
+        width=_number(video.get("width"), int),
+        height=_number(video.get("height"), int),
+        fps=_frame_rate(video.get("avg_frame_rate")) or _frame_rate(video.get("r_frame_rate")),
+        video_codec=video.get("codec_name"),
+        audio_codec=audio.get("codec_name"),
+        sample_rate=_number(audio.get("sample_rate"), int),
+        channels=_number(audio.get("channels"), int),
+    )
+
+
+class MediaProbe:
+    """
+    带缓存的媒体探测
+
+    - 缓存键为 (绝对路径, 大小, 修改时间)，文件被覆盖后自动重新探测
+    - 同一文件的并发请求只运行一次 ffprobe
+    - ffprobe 不可用或探测失败时返回 None，调用方退回计划值
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or settings.MEDIA_PROBE_CACHE_SIZE
+        self._cache: "OrderedDict[Tuple[str, int, int], MediaInfo]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, int, int], asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._unavailable_logged = False
+        self._hits = 0
+        self._probes = 0
+        self._failures = 0
+
+    @staticmethod
+    def _key(path: Path) -> Optional[Tuple[str, int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+
+    def _remember(self, key: Tuple[str, int, int], info: MediaInfo):
+        with self._lock:
+            self._cache[key] = info
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    async def probe(self, path) -> Optional[MediaInfo]:
+        """探测媒体文件（文件不存在或无法探测时返回 None）"""
+        key = self._key(Path(path))
+        if key is None:
+            return None
+
+        with self._lock:
+            info = self._cache.get(key)
+            if info is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return info
+
+        # 探测在独立任务中执行，某个调用方被取消不会影响其他等待者
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._probe(key))
+            self._inflight[key] = pending
+            pending.add_done_callback(functools.partial(self._probe_done, key))
+        return await asyncio.shield(pending)
+
+    async def _probe(self, key: Tuple[str, int, int]) -> Optional[MediaInfo]:
+        info = await self._load(key)
+        if info is None:
+            info = await self._run_ffprobe(key)
+            if info is not None:
+                await self._save(key, info)
+        if info is not None:
+            self._remember(key, info)
+        return info
+
+    def _probe_done(self, key: Tuple[str, int, int], task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def duration(self, path) -> Optional[float]:
+        """实测时长（秒）"""
+        info = await self.probe(path)
+        return info.duration if info else None
+
+    async def _run_ffprobe(self, key: Tuple[str, int, int]) -> Optional[MediaInfo]:
+        path, size, _ = key
+        cmd = [
+            ffprobe_path(),
+            "-v",
+            "error",
+            "-show_format",
+            "-show_streams",
+            "-of",
+            "json",
+            path,
+        ]
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        except OSError as e:
+            if not self._unavailable_logged:
+                logger.warning(f"ffprobe not available, using planned media durations: {e}")
+                self._unavailable_logged = True
+            return None
+
+        self._probes += 1
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(), timeout=settings.MEDIA_PROBE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            self._failures += 1
+            logger.warning(f"ffprobe timed out for {path}")
+            return None
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+
+        if process.returncode != 0:
+            self._failures += 1
+            message = stderr.decode("utf-8", errors="replace").strip()[-300:]
+            logger.warning(f"ffprobe failed for {path}: {message}")
+            return None
+        try:
+            return parse_ffprobe(json.loads(stdout), size=size)
+        except ValueError as e:
+            self._failures += 1
+            logger.warning(f"Invalid ffprobe output for {path}: {e}")
+            return None
+
+    # ---------- MongoDB 元数据索引 ----------
+
+    @staticmethod
+    def _document_id(key: Tuple[str, int, int]) -> str:
+        return "{}:{}:{}".format(*key)
+
+    async def _load(self, key: Tuple[str, int, int]) -> Optional[MediaInfo]:
+        if not db.connected:
+            return None
+        try:
+            doc = await db.database[MEDIA_COLLECTION].find_one({"_id": self._document_id(key)})
+        except Exception as e:
+            logger.warning(f"Media metadata lookup failed: {e}")
+            return None
+        if not doc:
+            return None
+        fields = MediaInfo.__dataclass_fields__
+        return MediaInfo(**{name: doc.get(name) for name in fields if name in doc})
+
+    async def _save(self, key: Tuple[str, int, int], info: MediaInfo):
+        if not db.connected:
+            return
+        path, size, mtime_ns = key
+        document = {
+            **info.to_dict(),
+            "path": path,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "probed_at": datetime.utcnow(),
+        }
+        try:
+            await db.database[MEDIA_COLLECTION].replace_one(
+                {"_id": self._document_id(key)}, document, upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Media metadata save failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """探测统计"""
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "hits": self._hits,
+                "probes": self._probes,
+                "failures": self._failures,
+            }
+
+
+# 全局媒体探测服务
+media_probe = MediaProbe()
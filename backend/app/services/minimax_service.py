@@ -4,12 +4,12 @@ Minimax (稀宇科技) 服务集成
 官网: https://www.minimaxi.com/
 """
 
-import httpx
 import base64
 import json
 from typing import Optional, List, Dict, Any
 from pathlib import Path
 from app.core.config import settings
+from app.core.http_clients import http_clients, status_error
 from app.core.logging import logger
 
 
@@ -68,35 +68,35 @@ class MinimaxLLM:
             "Content-Type": "application/json"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=60.0
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"Minimax API error: {response.status_code}"
-                try:
-                    error_data = response.json()
-                    error_msg += f" - {error_data}"
-                except:
-                    pass
-                raise Exception(error_msg)
-            
-            data = response.json()
-            
-            if data.get("base_resp", {}).get("status_code") != 0:
-                error_msg = data.get("base_resp", {}).get("status_msg", "Unknown error")
-                raise Exception(f"Minimax API error: {error_msg}")
-            
-            # 提取生成的文本
-            choices = data.get("choices", [])
-            if choices:
-                return choices[0].get("message", {}).get("content", "")
-            return ""
-    
+        client = http_clients.get("minimax")
+        response = await client.post(
+            url,
+            headers=headers,
+            json=payload,
+            timeout=http_clients.timeout("minimax", 60.0)
+        )
+        
+        if response.status_code != 200:
+            error_msg = f"Minimax API error: {response.status_code}"
+            try:
+                error_data = response.json()
+                error_msg += f" - {error_data}"
+            except:
+                pass
+            raise status_error(error_msg, response)
+        
+        data = response.json()
+        
+        if data.get("base_resp", {}).get("status_code") != 0:
+            error_msg = data.get("base_resp", {}).get("status_msg", "Unknown error")
+            raise Exception(f"Minimax API error: {error_msg}")
+        
+        # 提取生成的文本
+        choices = data.get("choices", [])
+        if choices:
+            return choices[0].get("message", {}).get("content", "")
+        return ""
+
     async def generate_video_script(
         self,
         product_name: str,
@@ -367,36 +367,36 @@ class MinimaxTTS:
             "Content-Type": "application/json"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=60.0
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"Minimax TTS error: {response.status_code}"
-                try:
-                    error_data = response.json()
-                    error_msg += f" - {error_data}"
-                except:
-                    pass
-                raise Exception(error_msg)
-            
-            data = response.json()
-            
-            if data.get("base_resp", {}).get("status_code") != 0:
-                error_msg = data.get("base_resp", {}).get("status_msg", "Unknown error")
-                raise Exception(f"Minimax TTS error: {error_msg}")
-            
-            # 解码音频数据
-            audio_hex = data.get("data", {}).get("audio", "")
-            if audio_hex:
-                return bytes.fromhex(audio_hex)
-            
-            raise Exception("No audio data in response")
-    
+        client = http_clients.get("minimax")
+        response = await client.post(
+            url,
+            headers=headers,
+            json=payload,
+            timeout=http_clients.timeout("minimax", 60.0)
+        )
+        
+        if response.status_code != 200:
+            error_msg = f"Minimax TTS error: {response.status_code}"
+            try:
+                error_data = response.json()
+                error_msg += f" - {error_data}"
+            except:
+                pass
+            raise status_error(error_msg, response)
+        
+        data = response.json()
+        
+        if data.get("base_resp", {}).get("status_code") != 0:
+            error_msg = data.get("base_resp", {}).get("status_msg", "Unknown error")
+            raise Exception(f"Minimax TTS error: {error_msg}")
+        
+        # 解码音频数据
+        audio_hex = data.get("data", {}).get("audio", "")
+        if audio_hex:
+            return bytes.fromhex(audio_hex)
+        
+        raise Exception("No audio data in response")
+
     @staticmethod
     def estimate_duration(text: str, speed: float = 1.0) -> float:
         """
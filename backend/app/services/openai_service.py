@@ -3,11 +3,11 @@ OpenAI 服务集成
 用于文案生成、图像生成(DALL-E)、对话等
 """
 
-import httpx
 import base64
 from typing import Optional, List, Dict, Any, Union
 from pathlib import Path
 from app.core.config import settings
+from app.core.http_clients import http_clients, status_error
 from app.core.logging import logger
 
 
@@ -43,38 +43,38 @@ class OpenAIService:
         Returns:
             生成的文本内容
         """
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "model": model,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens
-            }
-            if response_format:
-                payload["response_format"] = response_format
-                
-            response = await client.post(
-                f"{self.API_BASE}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json=payload,
-                timeout=60.0
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"OpenAI API error: {response.status_code}"
-                try:
-                    error_data = response.json()
-                    error_msg += f" - {error_data.get('error', {}).get('message', '')}"
-                except:
-                    pass
-                raise Exception(error_msg)
+        client = http_clients.get("openai")
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        if response_format:
+            payload["response_format"] = response_format
             
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
-    
+        response = await client.post(
+            f"{self.API_BASE}/chat/completions",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            json=payload,
+            timeout=http_clients.timeout("openai", 60.0)
+        )
+        
+        if response.status_code != 200:
+            error_msg = f"OpenAI API error: {response.status_code}"
+            try:
+                error_data = response.json()
+                error_msg += f" - {error_data.get('error', {}).get('message', '')}"
+            except:
+                pass
+            raise status_error(error_msg, response)
+        
+        data = response.json()
+        return data["choices"][0]["message"]["content"]
+
     async def generate_image(
         self,
         prompt: str,
@@ -100,47 +100,47 @@ class OpenAIService:
         Returns:
             图像二进制数据列表
         """
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "model": model,
-                "prompt": prompt,
-                "n": n,
-                "size": size,
-                "response_format": "b64_json"
-            }
-            
-            # dall-e-3 特有参数
-            if model == "dall-e-3":
-                payload["quality"] = quality
-                payload["style"] = style
-            
-            response = await client.post(
-                f"{self.API_BASE}/images/generations",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json=payload,
-                timeout=120.0
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"DALL-E API error: {response.status_code}"
-                try:
-                    error_data = response.json()
-                    error_msg += f" - {error_data.get('error', {}).get('message', '')}"
-                except:
-                    pass
-                raise Exception(error_msg)
-            
-            data = response.json()
-            images = []
-            for item in data["data"]:
-                b64_data = item["b64_json"]
-                images.append(base64.b64decode(b64_data))
-            
-            return images
-    
+        client = http_clients.get("openai")
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "n": n,
+            "size": size,
+            "response_format": "b64_json"
+        }
+        
+        # dall-e-3 特有参数
+        if model == "dall-e-3":
+            payload["quality"] = quality
+            payload["style"] = style
+        
+        response = await client.post(
+            f"{self.API_BASE}/images/generations",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            json=payload,
+            timeout=http_clients.timeout("openai", 120.0)
+        )
+        
+        if response.status_code != 200:
+            error_msg = f"DALL-E API error: {response.status_code}"
+            try:
+                error_data = response.json()
+                error_msg += f" - {error_data.get('error', {}).get('message', '')}"
+            except:
+                pass
+            raise status_error(error_msg, response)
+        
+        data = response.json()
+        images = []
+        for item in data["data"]:
+            b64_data = item["b64_json"]
+            images.append(base64.b64decode(b64_data))
+        
+        return images
+
     async def generate_variation(
         self,
         image_data: bytes,
@@ -158,35 +158,35 @@ class OpenAIService:
         Returns:
             图像二进制数据列表
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.API_BASE}/images/variations",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}"
-                },
-                files={
-                    "image": ("image.png", image_data, "image/png")
-                },
-                data={
-                    "n": n,
-                    "size": size,
-                    "response_format": "b64_json"
-                },
-                timeout=120.0
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"DALL-E Variation API error: {response.status_code}"
-                raise Exception(error_msg)
-            
-            data = response.json()
-            images = []
-            for item in data["data"]:
-                b64_data = item["b64_json"]
-                images.append(base64.b64decode(b64_data))
-            
-            return images
-    
+        client = http_clients.get("openai")
+        response = await client.post(
+            f"{self.API_BASE}/images/variations",
+            headers={
+                "Authorization": f"Bearer {self.api_key}"
+            },
+            files={
+                "image": ("image.png", image_data, "image/png")
+            },
+            data={
+                "n": n,
+                "size": size,
+                "response_format": "b64_json"
+            },
+            timeout=http_clients.timeout("openai", 120.0)
+        )
+        
+        if response.status_code != 200:
+            error_msg = f"DALL-E Variation API error: {response.status_code}"
+            raise status_error(error_msg, response)
+        
+        data = response.json()
+        images = []
+        for item in data["data"]:
+            b64_data = item["b64_json"]
+            images.append(base64.b64decode(b64_data))
+        
+        return images
+
     async def edit_image(
         self,
         image_data: bytes,
@@ -208,40 +208,40 @@ class OpenAIService:
         Returns:
             图像二进制数据列表
         """
-        async with httpx.AsyncClient() as client:
-            files = {
-                "image": ("image.png", image_data, "image/png")
-            }
-            if mask_data:
-                files["mask"] = ("mask.png", mask_data, "image/png")
-            
-            response = await client.post(
-                f"{self.API_BASE}/images/edits",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}"
-                },
-                files=files,
-                data={
-                    "prompt": prompt,
-                    "n": n,
-                    "size": size,
-                    "response_format": "b64_json"
-                },
-                timeout=120.0
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"DALL-E Edit API error: {response.status_code}"
-                raise Exception(error_msg)
-            
-            data = response.json()
-            images = []
-            for item in data["data"]:
-                b64_data = item["b64_json"]
-                images.append(base64.b64decode(b64_data))
-            
-            return images
-    
+        client = http_clients.get("openai")
+        files = {
+            "image": ("image.png", image_data, "image/png")
+        }
+        if mask_data:
+            files["mask"] = ("mask.png", mask_data, "image/png")
+        
+        response = await client.post(
+            f"{self.API_BASE}/images/edits",
+            headers={
+                "Authorization": f"Bearer {self.api_key}"
+            },
+            files=files,
+            data={
+                "prompt": prompt,
+                "n": n,
+                "size": size,
+                "response_format": "b64_json"
+            },
+            timeout=http_clients.timeout("openai", 120.0)
+        )
+        
+        if response.status_code != 200:
+            error_msg = f"DALL-E Edit API error: {response.status_code}"
+            raise status_error(error_msg, response)
+        
+        data = response.json()
+        images = []
+        for item in data["data"]:
+            b64_data = item["b64_json"]
+            images.append(base64.b64decode(b64_data))
+        
+        return images
+
     async def generate_copywriting(
         self,
         product_name: str,
@@ -0,0 +1,259 @@
+"""
+海报渲染缓存
+以输入内容的哈希为键缓存已渲染的海报文件，相同输入直接返回已有的下载地址
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from app.core.config import settings
+from app.core.latency import latency_budget
+from app.core.logging import logger
+
+# 渲染逻辑发生不兼容变化时递增，使旧缓存全部失效
+RENDER_CACHE_VERSION = 5
+
+REDIS_KEY_PREFIX = "poster:render:"
+
+
+def poster_cache_key(**inputs: Any) -> str:
+    """根据渲染输入计算内容哈希"""
+    payload = json.dumps(
+        {"v": RENDER_CACHE_VERSION, **inputs},
+        ensure_ascii=False,
+        sort_keys=True,
+        default=list,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PosterRenderCache:
+    """
+    海报渲染缓存
+
+    - 磁盘：渲染文件 + 同名 .json 元数据，重启后可恢复索引
+    - 内存：LRU 索引，按条目数和总字节数淘汰（同时删除文件）
+    - Redis（可选）：多实例共享索引
+    """
+
+    def __init__(
+        self,
+        output_dir: str = "generated",
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        use_redis: Optional[bool] = None,
+    ):
+        self.output_dir = Path(output_dir)
+        self.max_entries = (
+            settings.POSTER_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        )
+        self.max_bytes = (
+            settings.POSTER_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        )
+        self.use_redis = settings.POSTER_CACHE_REDIS if use_redis is None else use_redis
+
+        self._index: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._hits = 0
+        self._misses = 0
+
+    # ---------- 磁盘索引 ----------
+
+    def _meta_path(self, result: Dict[str, Any]) -> Path:
+        return self.output_dir / f"{result['id']}.json"
+
+    def _files(self, result: Dict[str, Any]) -> Iterable[Path]:
+        """结果中引用的所有文件（各格式 + 各社交媒体尺寸）"""
+        urls = list(result.get("download_urls", {}).values())
+        urls += [size["url"] for size in result.get("sizes", {}).values()]
+        names = {url.rsplit("/", 1)[-1] for url in urls}
+        return [self.output_dir / name for name in sorted(names)]
+
+    def _files_exist(self, result: Dict[str, Any]) -> bool:
+        return all(path.exists() for path in self._files(result))
+
+    def _load(self):
+        """首次访问时从磁盘元数据恢复索引（按修改时间排序作为 LRU 顺序）"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            metas = sorted(self.output_dir.glob("poster_*.json"), key=os.path.getmtime)
+            for meta in metas:
+                try:
+                    data = json.loads(meta.read_text(encoding="utf-8"))
+                    key, result = data["key"], data["result"]
+                except (OSError, ValueError, KeyError):
+                    continue
+                if self._files_exist(result):
+                    self._add(key, result, data.get("size", 0))
+            self._loaded = True
+
+    def _add(self, key: str, result: Dict[str, Any], size: int):
+        old = self._index.pop(key, None)
+        if old is not None:
+            self._total_bytes -= old["size"]
+        self._index[key] = {"result": result, "size": size}
+        self._total_bytes += size
+
+    def _evict(self):
+        """淘汰最久未使用的条目，直到满足数量和容量限制"""
+        # 至少保留最新的一条，避免刚渲染的海报立即被删除
+        while len(self._index) > 1 and (
+            len(self._index) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            key, entry = self._index.popitem(last=False)
+            self._total_bytes -= entry["size"]
+            for path in [*self._files(entry["result"]), self._meta_path(entry["result"])]:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            logger.info(f"Evicted cached poster {entry['result']['id']}")
+
+    # ---------- 读写 ----------
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """查询缓存，文件已被删除的条目视为未命中"""
+        self._load()
+
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None:
+                if self._files_exist(entry["result"]):
+                    self._index.move_to_end(key)
+                    self._hits += 1
+                    return entry["result"]
+                self._index.pop(key)
+                self._total_bytes -= entry["size"]
+
+        if self.use_redis:
+            result = await self._redis_get(key)
+            if result and self._files_exist(result):
+                with self._lock:
+                    self._add(key, result, self._size_of(result))
+                    self._hits += 1
+                return result
+
+        self._misses += 1
+        return None
+
+    async def put(self, key: str, result: Dict[str, Any]):
+        """写入缓存"""
+        self._load()
+        size = self._size_of(result)
+
+        try:
+            self._meta_path(result).write_text(
+                json.dumps({"key": key, "result": result, "size": size}, ensure_ascii=False),
+                encoding="utf-8",
+            )
+        except OSError as e:
+            logger.warning(f"Failed to write poster cache metadata: {e}")
+
+        with self._lock:
+            self._add(key, result, size)
+            self._evict()
+
+        if self.use_redis:
+            await self._redis_set(key, result)
+
+    async def get_or_render(
+        self, key: str, render: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        命中则直接返回，否则渲染并写入缓存
+
+        同一进程内相同键的并发请求只渲染一次；渲染在独立任务中执行，不受发起
+        请求的延迟预算限制，任一调用方放弃等待（取消或超出预算）都不会中断渲染，
+        渲染完成后照常写入缓存
+        """
+        cached = await self.get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        pending = self._inflight.get(key)
+        owner = pending is None
+        if owner:
+            pending = asyncio.ensure_future(self._render_and_put(key, render))
+            self._inflight[key] = pending
+            pending.add_done_callback(functools.partial(self._render_done, key))
+
+        result = await asyncio.shield(pending)
+        return {**result, "cached": not owner}
+
+    async def _render_and_put(
+        self, key: str, render: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        # 共享的渲染不属于任何一个请求
+        with latency_budget(None):
+            result = await render()
+        await self.put(key, result)
+        return result
+
+    def _render_done(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 所有调用方都已放弃时，避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def _size_of(self, result: Dict[str, Any]) -> int:
+        total = 0
+        for path in self._files(result):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    # ---------- Redis ----------
+
+    async def _redis_get(self, key: str) -> Optional[Dict[str, Any]]:
+        from app.db.redis import redis_client
+
+        try:
+            value = await redis_client.get(REDIS_KEY_PREFIX + key)
+            return json.loads(value) if value else None
+        except Exception as e:
+            logger.warning(f"Poster cache Redis lookup failed: {e}")
+            return None
+
+    async def _redis_set(self, key: str, result: Dict[str, Any]):
+        from app.db.redis import redis_client
+
+        try:
+            await redis_client.set(
+                REDIS_KEY_PREFIX + key,
+                json.dumps(result, ensure_ascii=False),
+                expire=settings.GENERATED_FILES_EXPIRY_HOURS * 3600,
+            )
+        except Exception as e:
+            logger.warning(f"Poster cache Redis write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+# 全局海报渲染缓存
+poster_render_cache = PosterRenderCache()
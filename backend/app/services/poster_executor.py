@@ -0,0 +1,161 @@
+"""
+海报渲染执行器
+把 PIL 绘制和 PNG/JPEG 编码放到进程池中执行，避免阻塞 uvicorn 事件循环
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.latency import LatencyBudgetExceeded, current_budget
+from app.core.logging import logger
+
+
+class RenderPoolSaturatedError(Exception):
+    """渲染池已满（排队超时）"""
+
+    pass
+
+
+def _init_render_worker():
+    """渲染进程初始化：预加载字体，避免首个任务付出加载开销"""
+    from app.services.poster_renderer import poster_renderer
+
+    poster_renderer.preload_fonts()
+
+
+class RenderExecutor:
+    """
+    渲染执行器
+
+    - workers > 0 时使用进程池，吞吐随 CPU 核数扩展
+    - workers = 0 时退化为线程池（开发/测试环境）
+    - 同时在途的任务数受 max_pending 限制，超出时排队等待，
+      等待超过 queue_timeout 则抛出 RenderPoolSaturatedError
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        initializer: Optional[Callable[[], None]] = _init_render_worker,
+    ):
+        self.workers = settings.POSTER_RENDER_WORKERS if workers is None else workers
+        self.max_pending = max(
+            1,
+            settings.POSTER_RENDER_MAX_PENDING if max_pending is None else max_pending,
+        )
+        self.queue_timeout = (
+            settings.POSTER_RENDER_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        )
+        self.initializer = initializer
+
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        self._slots = asyncio.BoundedSemaphore(self.max_pending)
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> Executor:
+        """延迟创建进程池（首次提交任务时）"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    if self.workers > 0:
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.workers, initializer=self.initializer
+                        )
+                        logger.info(f"Poster render pool started with {self.workers} workers")
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.max_pending,
+                            thread_name_prefix="poster-render",
+                        )
+        return self._executor
+
+    async def _acquire_slot(self):
+        """获取执行槽位，池满时等待，超时（或请求延迟预算用完）则拒绝"""
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return
+
+        timeout = self.queue_timeout
+        budget = current_budget()
+        limited_by_budget = budget is not None and budget.remaining() < timeout
+        if limited_by_budget:
+            timeout = budget.remaining()
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            if limited_by_budget:
+                raise LatencyBudgetExceeded("Latency budget exhausted waiting for render slot")
+            raise RenderPoolSaturatedError(
+                f"Poster render pool saturated ({self.max_pending} jobs in flight)"
+            )
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        提交渲染任务并等待结果
+
+        Args:
+            fn: 模块级函数（进程池要求可序列化）
+            *args: 可序列化的参数
+
+        Returns:
+            fn 的返回值
+        """
+        await self._acquire_slot()
+        self._in_flight += 1
+        loop = asyncio.get_running_loop()
+        try:
+            job = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release_slot()
+            raise
+        # 槽位在任务真正结束时才归还：调用方被取消（如超出延迟预算）时
+        # 已在执行的渲染不会停止，提前归还会使在途任务超过 max_pending
+        job.add_done_callback(functools.partial(self._job_done, loop))
+        return await asyncio.wrap_future(job)
+
+    def _job_done(self, loop: asyncio.AbstractEventLoop, _job):
+        """任务结束（在工作线程中回调），回到事件循环归还槽位"""
+        try:
+            loop.call_soon_threadsafe(self._release_slot)
+        except RuntimeError:
+            # 事件循环已关闭，不会再有人竞争槽位
+            self._release_slot()
+
+    def _release_slot(self):
+        self._in_flight -= 1
+        self._completed += 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """执行器状态"""
+        return {
+            "mode": "process" if self.workers > 0 else "thread",
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self, wait: bool = True):
+        """关闭进程池"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+                logger.info("Poster render pool shut down")
+
+
+# 全局渲染执行器
+poster_executor = RenderExecutor()
@@ -0,0 +1,224 @@
+"""
+海报导出
+从一次渲染的内存图像并行编码出多种格式（PNG/JPEG/WebP/AVIF）和多种社交媒体尺寸
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image, ImageFilter, ImageOps
+
+from app.core.config import settings
+from app.core.logging import logger
+
+# 社交媒体尺寸 (宽, 高)
+SOCIAL_SIZES: Dict[str, Tuple[int, int]] = {
+    "story": (1080, 1920),  # 抖音/小红书/Instagram 竖屏
+    "square": (1080, 1080),  # 朋友圈/微博方图
+    "thumbnail": (300, 400),  # 列表缩略图
+}
+
+
+def _format_options() -> Dict[str, Dict[str, Any]]:
+    """各导出格式的 PIL 编码参数（压缩级别来自配置）"""
+    return {
+        "png": {
+            "format": "PNG",
+            "params": {"compress_level": settings.POSTER_PNG_COMPRESS_LEVEL},
+        },
+        "jpg": {
+            "format": "JPEG",
+            "params": {
+                "quality": settings.POSTER_JPEG_QUALITY,
+                "optimize": True,
+                "progressive": True,
+            },
+        },
+        "webp": {
+            "format": "WEBP",
+            "params": {"quality": settings.POSTER_WEBP_QUALITY, "method": 4},
+        },
+        "avif": {
+            "format": "AVIF",
+            "params": {"quality": settings.POSTER_WEBP_QUALITY},
+        },
+    }
+
+
+def supported_formats() -> List[str]:
+    """当前 Pillow 构建支持写出的格式"""
+    Image.init()
+    return [
+        name
+        for name, option in _format_options().items()
+        if option["format"] in Image.SAVE
+    ]
+
+
+def fit_to_size(image: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """
+    把海报放进目标尺寸
+
+    宽高比相同时直接缩放；不同时完整保留海报内容，
+    空白处用海报本身的模糊放大版本填充
+    """
+    if image.width * size[1] == image.height * size[0]:
+        return image.resize(size, Image.LANCZOS)
+
+    # 在小图上模糊再放大，比直接在大图上做高斯模糊便宜得多
+    small = (max(1, size[0] // 8), max(1, size[1] // 8))
+    background = ImageOps.fit(image, small, Image.BILINEAR)
+    background = background.filter(ImageFilter.GaussianBlur(4)).resize(size, Image.BILINEAR)
+
+    content = ImageOps.contain(image, size, Image.LANCZOS)
+    offset = ((size[0] - content.width) // 2, (size[1] - content.height) // 2)
+    background.paste(content, offset)
+    return background
+
+
+class PosterExporter:
+    """多格式、多尺寸导出（编码在线程池中并行执行）"""
+
+    def __init__(self, max_threads: Optional[int] = None):
+        self.max_threads = max_threads or settings.POSTER_EXPORT_THREADS
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_threads, thread_name_prefix="poster-export"
+                    )
+        return self._pool
+
+    def _encode(
+        self,
+        image: Image.Image,
+        size: Optional[Tuple[int, int]],
+        path: Path,
+        fmt: str,
+    ):
+        if size is not None:
+            image = fit_to_size(image, size)
+        else:
+            # Image.save 会在对象上写入编码参数，多线程共享同一对象时需要各自的副本
+            image = image.copy()
+        option = _format_options()[fmt]
+        image.save(path, option["format"], **option["params"])
+
+    def export(
+        self,
+        image: Image.Image,
+        output_dir: str,
+        filename: str,
+        formats: Iterable[str] = ("png", "jpg"),
+        sizes: Iterable[str] = (),
+        size_format: str = "jpg",
+    ) -> Dict[str, Any]:
+        """
+        导出海报
+
+        Args:
+            image: 渲染完成的 RGB 图像
+            output_dir: 输出目录
+            filename: 文件名（不含扩展名）
+            formats: 原尺寸导出的格式
+            sizes: 额外导出的社交媒体尺寸（见 SOCIAL_SIZES）
+            size_format: 社交媒体尺寸使用的格式
+
+        Returns:
+            {"download_urls": {格式: URL}, "sizes": {尺寸: {"url", "width", "height"}}}
+        """
+        available = set(supported_formats())
+        output = Path(output_dir)
+        jobs: List[Tuple[Image.Image, Optional[Tuple[int, int]], Path, str]] = []
+        download_urls: Dict[str, str] = {}
+        size_urls: Dict[str, Dict[str, Any]] = {}
+
+        for fmt in formats:
+            if fmt not in available:
+                logger.warning(f"Poster export format not supported, skipping: {fmt}")
+                continue
+            jobs.append((image, None, output / f"{filename}.{fmt}", fmt))
+            download_urls[fmt] = f"/download/{filename}.{fmt}"
+
+        if size_format not in available:
+            size_format = "jpg"
+        for name in sizes:
+            if name not in SOCIAL_SIZES:
+                logger.warning(f"Unknown poster export size, skipping: {name}")
+                continue
+            width, height = SOCIAL_SIZES[name]
+            path = output / f"{filename}_{name}.{size_format}"
+            jobs.append((image, (width, height), path, size_format))
+            size_urls[name] = {
+                "url": f"/download/{filename}_{name}.{size_format}",
+                "width": width,
+                "height": height,
+            }
+
+        # 缩放和编码都在线程池中执行，PIL 在这些操作中会释放 GIL
+        futures = [self._get_pool().submit(self._encode, *job) for job in jobs]
+        for future in futures:
+            future.result()
+
+        return {"download_urls": download_urls, "sizes": size_urls}
+
+    def _thumbnail(self, source: Path, size: Tuple[int, int]) -> Image.Image:
+        with Image.open(source) as image:
+            # JPEG 在解码阶段直接按 1/2、1/4、1/8 缩小，避免解出整张大图
+            image.draft("RGB", size)
+            image = image.convert("RGB")
+            image.thumbnail(size, Image.LANCZOS)
+            return image
+
+    def contact_sheet(
+        self,
+        sources: List[Path],
+        output_path: Path,
+        columns: int = 4,
+        thumb_size: Tuple[int, int] = (300, 400),
+        gap: int = 20,
+        background: Tuple[int, int, int] = (24, 24, 27),
+    ) -> Tuple[int, int]:
+        """
+        把多张海报拼成一张预览图（缩略图并行解码）
+
+        Returns:
+            预览图尺寸 (宽, 高)
+        """
+        columns = max(1, min(columns, len(sources)))
+        rows = (len(sources) + columns - 1) // columns
+        cell_w, cell_h = thumb_size
+        sheet_size = (
+            columns * cell_w + (columns + 1) * gap,
+            rows * cell_h + (rows + 1) * gap,
+        )
+        sheet = Image.new("RGB", sheet_size, background)
+
+        pool = self._get_pool()
+        thumbs = pool.map(lambda source: self._thumbnail(source, thumb_size), sources)
+        for index, thumb in enumerate(thumbs):
+            row, col = divmod(index, columns)
+            x = gap + col * (cell_w + gap) + (cell_w - thumb.width) // 2
+            y = gap + row * (cell_h + gap) + (cell_h - thumb.height) // 2
+            sheet.paste(thumb, (x, y))
+
+        option = _format_options()["jpg"]
+        sheet.save(output_path, option["format"], **option["params"])
+        return sheet_size
+
+    def shutdown(self):
+        """关闭编码线程池"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+# 全局导出器
+poster_exporter = PosterExporter()
@@ -0,0 +1,247 @@
+"""
+海报字体管理
+启动时只在本地查找字体（不联网），解析出一条回退链；
+FreeTypeFont 按 (字体文件, 字号) 缓存复用，中英文、Emoji 混排时逐字选择可用字体
+"""
+
+import os
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PIL import ImageDraw, ImageFont
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.poster_text import text_measurer
+
+# 系统字体候选（按优先级）
+CJK_FONT_PATHS = [
+    "C:/Windows/Fonts/msyh.ttc",  # 微软雅黑
+    "C:/Windows/Fonts/simhei.ttf",  # 黑体
+    "C:/Windows/Fonts/simsun.ttc",  # 宋体
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",  # 文泉驿
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/System/Library/Fonts/PingFang.ttc",  # 苹方
+    "/System/Library/Fonts/STHeiti Light.ttc",
+]
+
+LATIN_FONT_PATHS = [
+    "C:/Windows/Fonts/arial.ttf",
+    "C:/Windows/Fonts/segoeui.ttf",
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+]
+
+EMOJI_FONT_PATHS = [
+    "C:/Windows/Fonts/seguiemj.ttf",
+    "/usr/share/fonts/truetype/noto/NotoColorEmoji.ttf",
+    "/System/Library/Fonts/Apple Color Emoji.ttc",
+]
+
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+# 检测字形覆盖时使用的字号和一个几乎不会有字形的码位（渲染结果即 .notdef）
+_PROBE_SIZE = 32
+_MISSING_CHAR = "\U0010FFFF"
+
+FontType = ImageFont.FreeTypeFont
+
+
+def _is_blank(char: str) -> bool:
+    """空白和控制字符本来就没有可见字形，视为所有字体都支持"""
+    return char.isspace() or unicodedata.category(char) in ("Cc", "Cf", "Zs")
+
+
+class FontManager:
+    """
+    字体管理器
+
+    - 回退链：POSTER_FONT_PATHS > 字体目录 > 系统中文字体 > 系统西文字体 > Emoji 字体
+    - 每个 (字体文件, 字号) 只加载一次
+    - 字符覆盖检测结果按 (字体文件, 字符) 缓存
+    """
+
+    def __init__(
+        self,
+        font_dir: Optional[str] = None,
+        extra_paths: Optional[Sequence[str]] = None,
+    ):
+        self.font_dir = settings.POSTER_FONT_DIR if font_dir is None else font_dir
+        if extra_paths is None:
+            extra_paths = [p.strip() for p in settings.POSTER_FONT_PATHS.split(",") if p.strip()]
+        self.extra_paths = list(extra_paths)
+
+        self._chain: Optional[List[str]] = None
+        self._fonts: Dict[Tuple[str, int], Optional[FontType]] = {}
+        self._default_fonts: Dict[int, ImageFont.ImageFont] = {}
+        self._coverage: Dict[Tuple[str, str], bool] = {}
+        self._notdef: Dict[str, Tuple] = {}
+        self._lock = threading.Lock()
+
+    # ---------- 字体解析 ----------
+
+    def _candidates(self) -> List[str]:
+        candidates = list(self.extra_paths)
+        font_dir = Path(self.font_dir)
+        if font_dir.is_dir():
+            candidates += sorted(
+                str(path)
+                for path in font_dir.iterdir()
+                if path.suffix.lower() in FONT_EXTENSIONS
+            )
+        return candidates + CJK_FONT_PATHS + LATIN_FONT_PATHS + EMOJI_FONT_PATHS
+
+    @property
+    def chain(self) -> List[str]:
+        """回退链（首次访问时解析，只包含实际存在的字体文件）"""
+        if self._chain is None:
+            with self._lock:
+                if self._chain is None:
+                    chain: List[str] = []
+                    for path in self._candidates():
+                        if path not in chain and os.path.isfile(path):
+                            chain.append(path)
+                    if not chain:
+                        logger.warning(
+                            "No poster fonts found; using Pillow's built-in font. "
+                            f"Put a CJK font in '{self.font_dir}/' or set POSTER_FONT_PATHS"
+                        )
+                    else:
+                        logger.info(
+                            f"Poster font: {chain[0]} ({len(chain) - 1} fallbacks)"
+                        )
+                    self._chain = chain
+        return self._chain
+
+    def _load(self, path: str, size: int) -> Optional[FontType]:
+        key = (path, size)
+        if key in self._fonts:
+            return self._fonts[key]
+        try:
+            font = ImageFont.truetype(path, size)
+        except OSError as e:
+            # 位图 Emoji 字体只支持固定字号，这类字体在该字号下跳过
+            logger.debug(f"Cannot load font {path} at size {size}: {e}")
+            font = None
+        with self._lock:
+            self._fonts[key] = font
+        return font
+
+    def get(self, size: int) -> ImageFont.ImageFont:
+        """获取指定字号的主字体（回退链中第一个可加载的字体）"""
+        for path in self.chain:
+            font = self._load(path, size)
+            if font is not None:
+                return font
+
+        default = self._default_fonts.get(size)
+        if default is None:
+            default = ImageFont.load_default(size)
+            with self._lock:
+                self._default_fonts[size] = default
+        return default
+
+    def preload(self, sizes: Sequence[int]):
+        """预加载常用字号"""
+        for size in sizes:
+            self.get(size)
+
+    # ---------- 字符覆盖 ----------
+
+    def covers(self, path: str, char: str) -> bool:
+        """字体是否包含该字符的字形（与 .notdef 的渲染结果比较）"""
+        if _is_blank(char):
+            return True
+        key = (path, char)
+        value = self._coverage.get(key)
+        if value is not None:
+            return value
+
+        probe = self._load(path, _PROBE_SIZE)
+        if probe is None:
+            value = False
+        else:
+            notdef = self._notdef.get(path)
+            if notdef is None:
+                notdef = self._signature(probe, _MISSING_CHAR)
+                self._notdef[path] = notdef
+            signature = self._signature(probe, char)
+            value = signature[0] is not None and signature != notdef
+
+        with self._lock:
+            self._coverage[key] = value
+        return value
+
+    @staticmethod
+    def _signature(font: FontType, char: str) -> Tuple:
+        try:
+            mask = font.getmask(char)
+        except (OSError, ValueError):
+            return (None, b"")
+        return (mask.getbbox(), bytes(mask))
+
+    def _font_for(self, char: str, font: ImageFont.ImageFont) -> ImageFont.ImageFont:
+        """为单个字符选择字体：主字体支持则用主字体，否则沿回退链查找"""
+        primary = getattr(font, "path", None)
+        if not isinstance(primary, str) or self.covers(primary, char):
+            return font
+        size = getattr(font, "size", _PROBE_SIZE)
+        for path in self.chain:
+            if path != primary and self.covers(path, char):
+                fallback = self._load(path, size)
+                if fallback is not None:
+                    return fallback
+        return font
+
+    def runs(self, text: str, font: ImageFont.ImageFont) -> List[Tuple[str, ImageFont.ImageFont]]:
+        """把文本切分为 (片段, 字体) 序列，相邻且字体相同的字符合并为一段"""
+        result: List[Tuple[str, ImageFont.ImageFont]] = []
+        for char in text:
+            chosen = self._font_for(char, font)
+            if result and result[-1][1] is chosen:
+                result[-1] = (result[-1][0] + char, chosen)
+            else:
+                result.append((char, chosen))
+        return result
+
+    # ---------- 绘制 ----------
+
+    def text_width(self, text: str, font: ImageFont.ImageFont) -> int:
+        """考虑字体回退后的文本宽度"""
+        return sum(text_measurer.width(run, run_font) for run, run_font in self.runs(text, font))
+
+    def wrap(self, text: str, font: ImageFont.ImageFont, max_width: int) -> List[str]:
+        """考虑字体回退后的自动换行（行宽与 text_width 一致）"""
+        return text_measurer.wrap(
+            text, font, max_width, font_for=lambda char: self._font_for(char, font)
+        )
+
+    def draw_text(
+        self,
+        draw: ImageDraw.ImageDraw,
+        xy: Tuple[int, int],
+        text: str,
+        font: ImageFont.ImageFont,
+        fill,
+    ):
+        """逐段绘制文本，主字体缺字的部分使用回退字体"""
+        x, y = xy
+        for run, run_font in self.runs(text, font):
+            draw.text((x, y), run, font=run_font, fill=fill, embedded_color=True)
+            x += text_measurer.width(run, run_font)
+
+    def stats(self) -> Dict[str, int]:
+        """缓存统计"""
+        return {
+            "chain": len(self.chain),
+            "loaded_fonts": sum(1 for font in self._fonts.values() if font is not None),
+            "coverage_entries": len(self._coverage),
+        }
+
+
+# 全局字体管理器
+font_manager = FontManager()
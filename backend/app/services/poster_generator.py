@@ -7,6 +7,7 @@ from datetime import datetime
 from typing import Optional
 
 from app.core.config import settings
+from app.core.latency import simulate_latency
 from app.core.logging import logger
 
 
@@ -41,9 +42,8 @@ class PosterGenerator:
         
         template_id = request.template_id or random.choice(self.templates)
         
-        # Simulate processing time
-        import asyncio
-        await asyncio.sleep(2)
+        # Simulate processing time (only under a demo latency profile)
+        await simulate_latency("poster.mock")
         
         generation_id = f"poster_{datetime.now().strftime('%Y%m%d%H%M%S')}_{random.randint(1000, 9999)}"
         
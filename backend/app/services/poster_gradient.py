@@ -0,0 +1,166 @@
+"""
+海报渐变背景引擎
+使用 PIL 的渐变蒙版 + 通道查找表一次性生成整幅背景，并按 (尺寸, 颜色, 类型) 缓存
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple, Union
+
+from PIL import Image
+
+GRADIENT_LINEAR = "linear"  # 自上而下的线性渐变
+GRADIENT_RADIAL = "radial"  # 由中心向四周的径向渐变
+
+RGB = Tuple[int, int, int]
+ColorStop = Union[str, Tuple[float, str]]
+
+
+def hex_to_rgb(hex_color: str) -> RGB:
+    """十六进制转RGB"""
+    hex_color = hex_color.lstrip("#")
+    return tuple(int(hex_color[i : i + 2], 16) for i in (0, 2, 4))
+
+
+def normalize_stops(colors: Sequence[ColorStop]) -> Tuple[Tuple[float, RGB], ...]:
+    """
+    规范化渐变色标
+
+    Args:
+        colors: 颜色列表，可以是等距分布的十六进制颜色，
+                也可以是 (位置0-1, 颜色) 形式的色标
+
+    Returns:
+        按位置排序的 (位置, RGB) 元组
+    """
+    if not colors:
+        raise ValueError("Gradient requires at least one color")
+
+    if len(colors) == 1:
+        rgb = hex_to_rgb(colors[0] if isinstance(colors[0], str) else colors[0][1])
+        return ((0.0, rgb), (1.0, rgb))
+
+    stops = []
+    last = len(colors) - 1
+    for i, color in enumerate(colors):
+        if isinstance(color, str):
+            stops.append((i / last, hex_to_rgb(color)))
+        else:
+            offset, value = color
+            stops.append((min(max(float(offset), 0.0), 1.0), hex_to_rgb(value)))
+
+    stops.sort(key=lambda stop: stop[0])
+    return tuple(stops)
+
+
+def build_channel_luts(stops: Sequence[Tuple[float, RGB]]) -> Tuple[List[int], ...]:
+    """
+    根据色标生成 R/G/B 三个通道的 256 级查找表
+
+    蒙版灰度值 0-255 对应渐变位置 0-1
+    """
+    luts: Tuple[List[int], ...] = ([], [], [])
+    segment = 0
+
+    for level in range(256):
+        t = level / 255
+        while segment < len(stops) - 2 and t > stops[segment + 1][0]:
+            segment += 1
+
+        (start, c1), (end, c2) = stops[segment], stops[segment + 1]
+        span = end - start
+        ratio = 0.0 if span <= 0 else min(max((t - start) / span, 0.0), 1.0)
+
+        for channel in range(3):
+            luts[channel].append(int(c1[channel] * (1 - ratio) + c2[channel] * ratio))
+
+    return luts
+
+
+class GradientEngine:
+    """渐变背景引擎 - 整幅生成，带 LRU 缓存"""
+
+    def __init__(self, max_cache_size: int = 32):
+        self.max_cache_size = max_cache_size
+        self._cache: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def render(
+        self,
+        size: Tuple[int, int],
+        colors: Sequence[ColorStop],
+        kind: str = GRADIENT_LINEAR,
+    ) -> Image.Image:
+        """
+        获取渐变背景
+
+        Args:
+            size: 画布尺寸 (宽, 高)
+            colors: 颜色或色标列表（两个以上即为多色渐变）
+            kind: 渐变类型 linear/radial
+
+        Returns:
+            RGB 图像副本，调用方可以直接在上面绘制
+        """
+        key = (tuple(size), tuple(colors), kind)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return cached.copy()
+            self._misses += 1
+
+        image = self._build(size, colors, kind)
+
+        with self._lock:
+            self._cache[key] = image
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cache_size:
+                self._cache.popitem(last=False)
+
+        return image.copy()
+
+    def _build(
+        self, size: Tuple[int, int], colors: Sequence[ColorStop], kind: str
+    ) -> Image.Image:
+        """生成渐变背景（不经过缓存）"""
+        width, height = size
+        luts = build_channel_luts(normalize_stops(colors))
+
+        if kind == GRADIENT_LINEAR:
+            # 线性渐变只需要一列像素，着色后再横向拉伸
+            mask = Image.linear_gradient("L").resize((1, height), Image.BILINEAR)
+        elif kind == GRADIENT_RADIAL:
+            mask = Image.radial_gradient("L").resize((width, height), Image.BILINEAR)
+        else:
+            raise ValueError(f"Unknown gradient type: {kind}")
+
+        image = Image.merge("RGB", [mask.point(lut) for lut in luts])
+        if image.size != (width, height):
+            image = image.resize((width, height), Image.NEAREST)
+        return image
+
+    def clear_cache(self):
+        """清空缓存"""
+        with self._lock:
+            self._cache.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def cache_info(self) -> Dict[str, int]:
+        """缓存统计"""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._cache),
+                "max_size": self.max_cache_size,
+            }
+
+
+# 全局渐变引擎实例
+gradient_engine = GradientEngine()
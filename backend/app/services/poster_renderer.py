@@ -3,41 +3,85 @@
 无需外部依赖，适合黑客松快速演示
 """
 
-import io
+import json
 import os
 import random
+from dataclasses import dataclass
 from datetime import datetime
+from pathlib import Path
 from typing import Optional, Tuple, List
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from PIL import ImageDraw, ImageFont
 import asyncio
-import urllib.request
+
+from app.core.config import settings
+from app.core.latency import simulate_latency, within_budget
+from app.services.poster_cache import poster_cache_key, poster_render_cache
+from app.services.poster_executor import poster_executor
+from app.services.poster_export import SOCIAL_SIZES, poster_exporter, supported_formats
+from app.services.poster_gradient import GRADIENT_LINEAR, gradient_engine, hex_to_rgb
+from app.services.poster_fonts import font_manager
+from app.services.poster_templates import (
+    DEFAULT_LAYOUT,
+    CompiledTemplate,
+    ContentLayout,
+    TemplateCache,
+    compose_decorations,
+    resolve_layout,
+)
+
+
+@dataclass(frozen=True)
+class PosterRenderSpec:
+    """海报渲染参数（纯数据，可序列化后交给渲染进程）"""
+
+    filename: str
+    product_name: str
+    description: str
+    features: Tuple[str, ...]
+    template_id: str
+    bg_gradient: Tuple[str, ...]
+    width: int = 1200
+    height: int = 1600
+    formats: Tuple[str, ...] = ("png", "jpg")
+    sizes: Tuple[str, ...] = ()
 
 
 class PosterRenderer:
     """极简海报渲染器 - PIL实现"""
 
     # 预设配色方案
+    # bg_colors 中每一项是一组渐变色，两个以上颜色即为多色渐变
+    # gradient 为渐变类型: linear（自上而下）/ radial（由中心向外）
+    # layout（可选）覆盖默认版式中的字段，见 poster_templates.DEFAULT_LAYOUT
     COLOR_SCHEMES = {
         "tech-modern": {
             "bg_colors": [("#0ea5e9", "#6366f1"), ("#1e3a8a", "#3b82f6")],
+            "gradient": "linear",
             "text_color": "#ffffff",
             "accent_color": "#60a5fa",
             "font": "modern",
         },
         "startup-bold": {
             "bg_colors": [("#f97316", "#ec4899"), ("#dc2626", "#f59e0b")],
+            "gradient": "linear",
             "text_color": "#ffffff",
             "accent_color": "#fcd34d",
             "font": "bold",
         },
         "minimal-clean": {
-            "bg_colors": [("#18181b", "#3f3f46"), ("#27272a", "#52525b")],
+            "bg_colors": [("#3f3f46", "#18181b"), ("#52525b", "#27272a")],
+            "gradient": "radial",
             "text_color": "#fafafa",
             "accent_color": "#a1a1aa",
             "font": "clean",
         },
         "creative-gradient": {
-            "bg_colors": [("#8b5cf6", "#ec4899"), ("#06b6d4", "#8b5cf6")],
+            "bg_colors": [
+                ("#8b5cf6", "#ec4899"),
+                ("#06b6d4", "#8b5cf6"),
+                ("#8b5cf6", "#ec4899", "#f43f5e"),
+            ],
+            "gradient": "linear",
             "text_color": "#ffffff",
             "accent_color": "#c084fc",
             "font": "creative",
@@ -47,69 +91,21 @@ class PosterRenderer:
     def __init__(self):
         self.output_dir = "generated"
         os.makedirs(self.output_dir, exist_ok=True)
-        self.font_path = self._ensure_font()
-
-    def _ensure_font(self) -> str:
-        """确保有中文字体可用"""
-        # 下载开源中文字体
-        font_dir = "fonts"
-        os.makedirs(font_dir, exist_ok=True)
-
-        font_path = os.path.join(font_dir, "NotoSansCJK-Regular.ttc")
-
-        # 如果字体不存在，尝试下载或使用系统字体
-        if not os.path.exists(font_path):
-            # 先尝试找系统字体
-            system_fonts = [
-                "C:/Windows/Fonts/msyh.ttc",  # 微软雅黑
-                "C:/Windows/Fonts/simhei.ttf",  # 黑体
-                "C:/Windows/Fonts/simsun.ttc",  # 宋体
-                "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",  # 文泉驿
-                "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
-                "/System/Library/Fonts/PingFang.ttc",  # 苹方
-                "/System/Library/Fonts/STHeiti Light.ttc",
-            ]
-
-            for sf in system_fonts:
-                if os.path.exists(sf):
-                    return sf
-
-            # 如果没有系统字体，下载Google Noto字体
-            try:
-                print("Downloading Noto Sans CJK font...")
-                url = "https://github.com/notofonts/noto-cjk/raw/main/Sans/OTF/SimplifiedChinese/NotoSansCJKsc-Regular.otf"
-                font_path = os.path.join(font_dir, "NotoSansCJKsc-Regular.otf")
-                if not os.path.exists(font_path):
-                    urllib.request.urlretrieve(url, font_path)
-                return font_path
-            except:
-                pass
-
-        return font_path if os.path.exists(font_path) else None
+        self.template_cache = TemplateCache()
+        self.content_cache = TemplateCache(max_size=64)
 
     def _get_font(self, size: int) -> ImageFont:
-        """获取字体"""
-        if self.font_path and os.path.exists(self.font_path):
-            try:
-                return ImageFont.truetype(self.font_path, size)
-            except:
-                pass
-
-        # 尝试其他系统字体
-        font_paths = [
-            "C:/Windows/Fonts/arial.ttf",
-            "C:/Windows/Fonts/segoeui.ttf",
-            "/System/Library/Fonts/Helvetica.ttc",
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        ]
-
-        for path in font_paths:
-            try:
-                return ImageFont.truetype(path, size)
-            except:
-                continue
-
-        return ImageFont.load_default()
+        """获取字体（由字体管理器缓存）"""
+        return font_manager.get(size)
+
+    def preload_fonts(self):
+        """预加载渲染用到的字号（渲染进程启动时调用）"""
+        font_manager.preload(
+            {
+                DEFAULT_LAYOUT[section]["font_size"]
+                for section in ("title", "description", "tags", "footer")
+            }
+        )
 
     async def generate(
         self,
@@ -118,253 +114,515 @@ class PosterRenderer:
         features: List[str],
         template_id: str = "tech-modern",
         primary_color: Optional[str] = None,
+        deterministic: Optional[bool] = None,
+        formats: Optional[List[str]] = None,
+        sizes: Optional[List[str]] = None,
     ) -> dict:
-        """生成海报主函数"""
+        """
+        生成海报主函数
+
+        一次渲染导出全部格式（默认见 POSTER_EXPORT_FORMATS）和社交媒体尺寸
+        （story/square/thumbnail）。
+
+        确定性模式下（默认开启，见 POSTER_DETERMINISTIC）相同输入生成相同的海报，
+        并通过内容哈希命中渲染缓存，直接返回已有文件的下载地址。
+        primary_color 目前不参与渲染（配色由模板决定），因此也不计入缓存键
+        """
+        if deterministic is None:
+            deterministic = settings.POSTER_DETERMINISTIC
+        formats, sizes = self._export_options(formats, sizes)
+
+        cache_key = None
+        if deterministic:
+            cache_key = poster_cache_key(
+                product_name=product_name,
+                description=description,
+                features=list(features),
+                template_id=template_id,
+                formats=sorted(formats),
+                sizes=sorted(sizes),
+            )
+
+        spec = self.build_spec(
+            product_name,
+            description,
+            features,
+            template_id,
+            cache_key=cache_key,
+            formats=formats,
+            sizes=sizes,
+        )
 
-        # 模拟处理时间
-        await asyncio.sleep(1.5)
+        async def render() -> dict:
+            # 模拟处理时间（仅演示配置下生效）
+            await simulate_latency("poster.render")
+            # PIL 绘制和编码交给渲染执行器，不阻塞事件循环
+            return await within_budget(
+                poster_executor.submit(render_poster, spec), "poster render"
+            )
+
+        if cache_key and settings.POSTER_CACHE_ENABLED:
+            # 超出预算时只放弃等待，共享的渲染继续完成并写入缓存
+            return await within_budget(
+                poster_render_cache.get_or_render(cache_key, render), "poster render"
+            )
+        return await render()
+
+    @staticmethod
+    def _export_options(
+        formats: Optional[List[str]], sizes: Optional[List[str]]
+    ) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """
+        整理导出格式（默认见 POSTER_EXPORT_FORMATS）和社交媒体尺寸并去重
+
+        Raises:
+            ValueError: 没有导出格式，或包含当前不支持的格式/未知的尺寸
+        """
+        if formats is None:
+            formats = [f.strip() for f in settings.POSTER_EXPORT_FORMATS.split(",") if f.strip()]
+        formats = tuple(dict.fromkeys(formats))
+        sizes = tuple(dict.fromkeys(sizes or []))
+        if not formats:
+            raise ValueError("At least one export format is required")
+        unsupported = [fmt for fmt in formats if fmt not in supported_formats()]
+        if unsupported:
+            raise ValueError(f"Unsupported export formats: {', '.join(unsupported)}")
+        unknown = [name for name in sizes if name not in SOCIAL_SIZES]
+        if unknown:
+            raise ValueError(f"Unknown export sizes: {', '.join(unknown)}")
+        return formats, sizes
+
+    def expand_variants(self, count: int) -> List[Tuple[str, Tuple[str, ...]]]:
+        """按模板轮流取配色，生成 count 个 (模板, 背景色) 变体"""
+        variants = []
+        depth = max(len(scheme["bg_colors"]) for scheme in self.COLOR_SCHEMES.values())
+        for index in range(depth):
+            for template_id, scheme in self.COLOR_SCHEMES.items():
+                if index < len(scheme["bg_colors"]):
+                    variants.append((template_id, tuple(scheme["bg_colors"][index])))
+        return variants[:count]
+
+    async def generate_variants(
+        self,
+        product_name: str,
+        description: str,
+        features: List[str],
+        variants: Optional[List[Tuple[str, Optional[Tuple[str, ...]]]]] = None,
+        count: int = 8,
+        formats: Optional[List[str]] = None,
+        sizes: Optional[List[str]] = None,
+    ) -> dict:
+        """
+        批量生成同一内容的多个配色/模板变体，并拼出一张预览图
+
+        - 文字排版只做一次，所有变体共享（见 layout_content）
+        - 未命中缓存的变体分组交给多个渲染进程并行渲染
+        - 每个变体单独进入渲染缓存，相同内容、格式和尺寸的变体请求可以直接命中
+          （单张渲染请求的缓存键不同，不共享这些条目）
+
+        Args:
+            variants: [(模板ID, 背景色或 None)]，背景色为 None 时使用模板第一组配色；
+                      不传则按 count 自动选取
+            count: 自动选取时的变体数
+
+        Returns:
+            {"id", "contact_sheet_url", "variants": [...], "rendered", "cached"}
+        """
+        formats, sizes = self._export_options(formats, sizes)
+
+        if variants is None:
+            variants = self.expand_variants(count)
+        variants = [
+            (
+                template_id,
+                tuple(bg_gradient)
+                if bg_gradient
+                else tuple(
+                    self.COLOR_SCHEMES.get(template_id, self.COLOR_SCHEMES["tech-modern"])[
+                        "bg_colors"
+                    ][0]
+                ),
+            )
+            for template_id, bg_gradient in variants
+        ]
+        if not variants:
+            raise ValueError("At least one poster variant is required")
+        if len(variants) > settings.POSTER_VARIANTS_MAX:
+            raise ValueError(f"Too many poster variants (max {settings.POSTER_VARIANTS_MAX})")
+
+        keys = [
+            poster_cache_key(
+                product_name=product_name,
+                description=description,
+                features=list(features),
+                template_id=template_id,
+                bg_gradient=list(bg_gradient),
+                formats=sorted(formats),
+                sizes=sorted(sizes),
+            )
+            for template_id, bg_gradient in variants
+        ]
 
-        # 选择配色
-        scheme = self.COLOR_SCHEMES.get(template_id, self.COLOR_SCHEMES["tech-modern"])
-        bg_gradient = random.choice(scheme["bg_colors"])
+        results: List[Optional[dict]] = [None] * len(variants)
+        if settings.POSTER_CACHE_ENABLED:
+            for index, key in enumerate(keys):
+                cached = await poster_render_cache.get(key)
+                if cached is not None:
+                    results[index] = {**cached, "cached": True}
+
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            await simulate_latency("poster.render")
+
+            # 按渲染进程数分组，组内共享排版和模板编译结果
+            groups = max(1, min(poster_executor.workers, len(missing)))
+            chunks = [missing[offset::groups] for offset in range(groups)]
+            specs = {
+                index: self.build_spec(
+                    product_name,
+                    description,
+                    features,
+                    variants[index][0],
+                    cache_key=keys[index],
+                    formats=formats,
+                    sizes=sizes,
+                    bg_gradient=variants[index][1],
+                )
+                for index in missing
+            }
+            rendered = await within_budget(
+                asyncio.gather(
+                    *(
+                        poster_executor.submit(
+                            render_poster_batch, [specs[index] for index in chunk]
+                        )
+                        for chunk in chunks
+                    )
+                ),
+                "poster variants render",
+            )
+            for chunk, chunk_results in zip(chunks, rendered):
+                for index, result in zip(chunk, chunk_results):
+                    if settings.POSTER_CACHE_ENABLED:
+                        await poster_render_cache.put(keys[index], result)
+                    results[index] = {**result, "cached": False}
+
+        # 预览图由全部变体决定，已存在时直接复用
+        sheet_id = "variants_" + poster_cache_key(keys=keys)[:20]
+        sheet_path = os.path.join(self.output_dir, f"{sheet_id}.jpg")
+        if not os.path.exists(sheet_path):
+            sources = [self._sheet_source(result) for result in results]
+            await within_budget(
+                poster_executor.submit(render_contact_sheet, sources, sheet_path),
+                "contact sheet render",
+            )
 
-        # 创建画布 (1200 x 1600 - 适合社交媒体)
-        width, height = 1200, 1600
-        image = Image.new("RGB", (width, height), bg_gradient[0])
-        draw = ImageDraw.Draw(image)
+        return {
+            "id": sheet_id,
+            "contact_sheet_url": f"/download/{sheet_id}.jpg",
+            "variants": results,
+            "rendered": len(missing),
+            "cached": len(variants) - len(missing),
+        }
 
-        # 绘制渐变背景
-        self._draw_gradient(draw, width, height, bg_gradient[0], bg_gradient[1])
+    def _sheet_source(self, result: dict) -> str:
+        """预览图使用的源文件（优先 JPEG，可在解码时直接缩小）"""
+        urls = result["download_urls"]
+        for fmt in ("jpg", "png", "webp"):
+            if fmt in urls:
+                return os.path.join(self.output_dir, urls[fmt].rsplit("/", 1)[-1])
+        thumbnail = result.get("sizes", {}).get("thumbnail")
+        if thumbnail:
+            return os.path.join(self.output_dir, thumbnail["url"].rsplit("/", 1)[-1])
+        return os.path.join(self.output_dir, next(iter(urls.values())).rsplit("/", 1)[-1])
+
+    def build_spec(
+        self,
+        product_name: str,
+        description: str,
+        features: List[str],
+        template_id: str = "tech-modern",
+        cache_key: Optional[str] = None,
+        formats: Tuple[str, ...] = ("png", "jpg"),
+        sizes: Tuple[str, ...] = (),
+        bg_gradient: Optional[Tuple[str, ...]] = None,
+    ) -> PosterRenderSpec:
+        """
+        组装渲染参数（选择配色、生成文件名）
+
+        传入 cache_key 时配色和文件名都由内容哈希决定，否则随机生成；
+        指定 bg_gradient 时直接使用该背景色
+        """
+        scheme = self.COLOR_SCHEMES.get(template_id, self.COLOR_SCHEMES["tech-modern"])
 
-        # 绘制装饰元素
-        self._draw_decorations(draw, width, height, scheme["accent_color"])
+        if cache_key:
+            if bg_gradient is None:
+                bg_gradient = random.Random(cache_key).choice(scheme["bg_colors"])
+            filename = f"poster_{cache_key[:20]}"
+        else:
+            if bg_gradient is None:
+                bg_gradient = random.choice(scheme["bg_colors"])
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"poster_{timestamp}_{random.randint(1000, 9999)}"
+
+        return PosterRenderSpec(
+            filename=filename,
+            product_name=product_name,
+            description=description,
+            features=tuple(features),
+            template_id=template_id,
+            bg_gradient=tuple(bg_gradient),
+            formats=tuple(formats),
+            sizes=tuple(sizes),
+        )
 
-        # 绘制内容
-        self._draw_content(
-            draw,
-            width,
-            height,
-            product_name,
-            description,
-            features,
-            scheme["text_color"],
-            scheme["accent_color"],
+    def compile_template(
+        self, template_id: str, bg_gradient: Tuple[str, ...], size: Tuple[int, int]
+    ) -> CompiledTemplate:
+        """
+        编译模板（带缓存）
+
+        预先栅格化背景渐变、装饰和页脚，解析版式、字体和颜色，
+        同一 (模板, 背景色, 尺寸) 只编译一次
+        """
+        key = (template_id, tuple(bg_gradient), tuple(size))
+        return self.template_cache.get_or_compile(
+            key, lambda: self._compile_template(template_id, bg_gradient, size)
         )
 
-        # 生成文件名
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"poster_{timestamp}_{random.randint(1000, 9999)}"
+    def _compile_template(
+        self, template_id: str, bg_gradient: Tuple[str, ...], size: Tuple[int, int]
+    ) -> CompiledTemplate:
+        scheme = self.COLOR_SCHEMES.get(template_id, self.COLOR_SCHEMES["tech-modern"])
+        layout = resolve_layout(scheme.get("layout", {}))
+        width, height = size
+
+        compiled = CompiledTemplate(
+            template_id=template_id,
+            size=(width, height),
+            base=gradient_engine.render(
+                (width, height), bg_gradient, scheme.get("gradient", GRADIENT_LINEAR)
+            ),
+            layout=layout,
+            text_rgb=self._hex_to_rgb(scheme["text_color"]),
+            accent_rgb=self._hex_to_rgb(scheme["accent_color"]),
+            fonts={
+                "title": self._get_font(layout["title"]["font_size"]),
+                "body": self._get_font(layout["description"]["font_size"]),
+                "tag": self._get_font(layout["tags"]["font_size"]),
+                "footer": self._get_font(layout["footer"]["font_size"]),
+            },
+        )
 
-        # 保存PNG
-        png_path = f"{self.output_dir}/{filename}.png"
-        image.save(png_path, "PNG", quality=95)
+        # 静态图层：装饰元素（预渲染贴图，一次合成）
+        compiled.base = compose_decorations(
+            compiled.base, layout["decorations"], compiled.accent_rgb
+        )
+        draw = ImageDraw.Draw(compiled.base)
 
-        # 保存JPG
-        jpg_path = f"{self.output_dir}/{filename}.jpg"
-        image_jpg = image.convert("RGB")
-        image_jpg.save(jpg_path, "JPEG", quality=90)
+        # 静态图层：底部文字
+        footer = layout["footer"]
+        if footer.get("text"):
+            font = compiled.fonts["footer"]
+            text_width = font_manager.text_width(footer["text"], font)
+            x = (width - text_width) // 2
+            y = height - footer["bottom"]
+            font_manager.draw_text(draw, (x, y), footer["text"], font, compiled.text_rgb)
 
-        return {
-            "id": filename,
-            "preview_url": f"/download/{filename}.png",
-            "download_urls": {
-                "png": f"/download/{filename}.png",
-                "jpg": f"/download/{filename}.jpg",
-            },
-            "template_id": template_id,
-            "dimensions": {"width": width, "height": height},
-        }
+        return compiled
 
-    def _draw_gradient(
-        self, draw: ImageDraw, width: int, height: int, color1: str, color2: str
-    ):
-        """绘制渐变背景"""
-        c1_rgb = self._hex_to_rgb(color1)
-        c2_rgb = self._hex_to_rgb(color2)
-
-        for y in range(height):
-            ratio = y / height
-            r = int(c1_rgb[0] * (1 - ratio) + c2_rgb[0] * ratio)
-            g = int(c1_rgb[1] * (1 - ratio) + c2_rgb[1] * ratio)
-            b = int(c1_rgb[2] * (1 - ratio) + c2_rgb[2] * ratio)
-            draw.line([(0, y), (width, y)], fill=(r, g, b))
-
-    def _draw_decorations(
-        self, draw: ImageDraw, width: int, height: int, accent_color: str
-    ):
-        """绘制装饰元素"""
-        accent_rgb = self._hex_to_rgb(accent_color)
+    def render(self, spec: PosterRenderSpec) -> dict:
+        """同步渲染并保存海报（在渲染进程或线程中执行）"""
+        width, height = spec.width, spec.height
+        filename = spec.filename
 
-        # 绘制几个圆形装饰（半透明）
-        overlay = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-        overlay_draw = ImageDraw.Draw(overlay)
+        # 在编译好的模板底图上只绘制动态文字
+        compiled = self.compile_template(spec.template_id, spec.bg_gradient, (width, height))
+        image = compiled.base.copy()
+        draw = ImageDraw.Draw(image)
 
-        circles = [
-            (100, 200, 250),
-            (width - 150, height - 300, 350),
-            (width // 2, 150, 120),
-        ]
+        self._draw_content(
+            draw, compiled, spec.product_name, spec.description, list(spec.features)
+        )
 
-        for x, y, r in circles:
-            overlay_draw.ellipse([x - r, y - r, x + r, y + r], fill=(*accent_rgb, 25))
+        # 一次渲染，并行编码所有格式和尺寸
+        exported = poster_exporter.export(
+            image, self.output_dir, filename, formats=spec.formats, sizes=spec.sizes
+        )
+        download_urls = exported["download_urls"]
+        preview_format = "png" if "png" in download_urls else next(iter(download_urls), None)
 
-        # 合并图层
-        # 注意：这里简化处理，直接绘制
+        return {
+            "id": filename,
+            "preview_url": download_urls.get(preview_format),
+            "download_urls": download_urls,
+            "sizes": exported["sizes"],
+            "template_id": spec.template_id,
+            "dimensions": {"width": width, "height": height},
+        }
 
-    def _draw_content(
+    def layout_content(
         self,
-        draw: ImageDraw,
-        width: int,
-        height: int,
+        compiled: CompiledTemplate,
         product_name: str,
         description: str,
         features: List[str],
-        text_color: str,
-        accent_color: str,
-    ):
-        """绘制文字内容"""
-        text_rgb = self._hex_to_rgb(text_color)
-        accent_rgb = self._hex_to_rgb(accent_color)
-
-        # 获取字体
-        title_font = self._get_font(90)
-        body_font = self._get_font(36)
-        small_font = self._get_font(32)
-
-        margin = 80
-        current_y = 280
-
-        # 绘制产品名称（居中，自动换行）
-        max_width = width - 2 * margin
-        lines = self._wrap_text(product_name, title_font, max_width, draw)
+    ) -> ContentLayout:
+        """
+        排版文字内容（带缓存）
+
+        排版结果只取决于版式、尺寸和文本，与配色无关，
+        同一内容的不同配色/模板变体共享一次换行和测量
+        """
+        key = (
+            compiled.size,
+            json.dumps(compiled.layout, sort_keys=True),
+            product_name,
+            description,
+            tuple(features),
+        )
+        return self.content_cache.get_or_compile(
+            key,
+            lambda: self._layout_content(compiled, product_name, description, features),
+        )
 
-        for line in lines[:2]:
-            bbox = draw.textbbox((0, 0), line, font=title_font)
-            text_width = bbox[2] - bbox[0]
+    def _layout_content(
+        self,
+        compiled: CompiledTemplate,
+        product_name: str,
+        description: str,
+        features: List[str],
+    ) -> ContentLayout:
+        layout = compiled.layout
+        width = compiled.size[0]
+        max_width = compiled.content_width
+        content = ContentLayout()
+
+        # 产品名称（居中，自动换行）
+        title = layout["title"]
+        title_font = compiled.fonts["title"]
+        current_y = title["top"]
+        lines = self._wrap_text(product_name, title_font, max_width)
+
+        for line in lines[: title["max_lines"]]:
+            text_width = font_manager.text_width(line, title_font)
             x = (width - text_width) // 2
-            draw.text((x, current_y), line, font=title_font, fill=text_rgb)
-            current_y += 110
-
-        current_y += 50
-
-        # 绘制分隔线
-        line_margin = 150
-        draw.line(
-            [(line_margin, current_y), (width - line_margin, current_y)],
-            fill=accent_rgb,
-            width=3,
+            content.texts.append(("title", x, current_y, line))
+            current_y += title["line_height"]
+
+        # 分隔线
+        divider = layout["divider"]
+        current_y += divider["gap_before"]
+        content.lines.append(
+            (divider["inset"], current_y, width - divider["inset"], current_y, divider["width"])
         )
-        current_y += 60
-
-        # 绘制描述（自动换行）
-        desc_lines = self._wrap_text(description, body_font, max_width - 40, draw)
-        for line in desc_lines[:3]:
-            bbox = draw.textbbox((0, 0), line, font=body_font)
-            text_width = bbox[2] - bbox[0]
+        current_y += divider["gap_after"]
+
+        # 描述（自动换行）
+        desc = layout["description"]
+        body_font = compiled.fonts["body"]
+        desc_lines = self._wrap_text(description, body_font, max_width - desc["inset"])
+        for line in desc_lines[: desc["max_lines"]]:
+            text_width = font_manager.text_width(line, body_font)
             x = (width - text_width) // 2
-            draw.text((x, current_y), line, font=body_font, fill=text_rgb)
-            current_y += 55
+            content.texts.append(("body", x, current_y, line))
+            current_y += desc["line_height"]
 
-        current_y += 80
+        current_y += desc["gap_after"]
 
-        # 绘制功能标签
+        # 功能标签
         if features:
-            tag_height = 65
-            tag_padding = 25
-            gap = 20
+            tags = layout["tags"]
+            tag_font = compiled.fonts["tag"]
+            tag_height = tags["height"]
+            tag_padding = tags["padding"]
+            gap = tags["gap"]
 
-            # 计算每行能放多少个标签
+            # 计算每行能放多少个标签（每个标签只测量一次）
             row_tags = []
             current_row = []
             current_width = 0
 
-            for feature in features[:4]:
-                bbox = draw.textbbox((0, 0), feature, font=small_font)
-                tag_width = bbox[2] - bbox[0] + tag_padding * 2
+            for feature in features[: tags["max_tags"]]:
+                text_w = font_manager.text_width(feature, tag_font)
+                tag_width = text_w + tag_padding * 2
 
                 if current_width + tag_width + gap > max_width and current_row:
                     row_tags.append(current_row)
-                    current_row = [feature]
+                    current_row = [(feature, text_w, tag_width)]
                     current_width = tag_width
                 else:
-                    current_row.append(feature)
+                    current_row.append((feature, text_w, tag_width))
                     current_width += tag_width + gap
 
             if current_row:
                 row_tags.append(current_row)
 
-            # 绘制标签
-            for row in row_tags[:2]:
-                total_width = 0
-                tag_widths = []
-
-                for tag in row:
-                    bbox = draw.textbbox((0, 0), tag, font=small_font)
-                    tw = bbox[2] - bbox[0] + tag_padding * 2
-                    tag_widths.append(tw)
-                    total_width += tw
-
-                total_width += gap * (len(row) - 1)
-                start_x = (width - total_width) // 2
-                x = start_x
-
-                for i, tag in enumerate(row):
-                    tw = tag_widths[i]
-                    # 绘制圆角矩形背景
-                    draw.rounded_rectangle(
-                        [x, current_y, x + tw, current_y + tag_height],
-                        radius=32,
-                        fill=accent_rgb,
-                        outline=accent_rgb,
-                        width=2,
-                    )
+            for row in row_tags[: tags["max_rows"]]:
+                total_width = sum(tw for _, _, tw in row) + gap * (len(row) - 1)
+                x = (width - total_width) // 2
 
-                    # 绘制文字
-                    bbox = draw.textbbox((0, 0), tag, font=small_font)
-                    text_w = bbox[2] - bbox[0]
+                for tag, text_w, tw in row:
+                    content.tags.append((x, current_y, x + tw, current_y + tag_height))
                     text_x = x + (tw - text_w) // 2
-                    text_y = current_y + (tag_height - 32) // 2
-                    draw.text((text_x, text_y), tag, font=small_font, fill=text_rgb)
-
+                    text_y = current_y + (tag_height - tags["font_size"]) // 2
+                    content.texts.append(("tag", text_x, text_y, tag))
                     x += tw + gap
 
-                current_y += tag_height + 25
-
-        # 底部文字
-        current_y = height - 120
-        footer_text = "Generated by PitchCube"
-        bbox = draw.textbbox((0, 0), footer_text, font=small_font)
-        text_width = bbox[2] - bbox[0]
-        x = (width - text_width) // 2
-        draw.text((x, current_y), footer_text, font=small_font, fill=text_rgb)
-
-    def _wrap_text(
-        self, text: str, font: ImageFont, max_width: int, draw: ImageDraw
-    ) -> List[str]:
-        """自动换行"""
-        lines = []
-        current_line = ""
-
-        for char in text:
-            test_line = current_line + char
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            if bbox[2] - bbox[0] <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = char
-
-        if current_line:
-            lines.append(current_line)
-
-        return lines if lines else [text]
+                current_y += tag_height + tags["row_gap"]
+
+        return content
+
+    def _draw_content(
+        self,
+        draw: ImageDraw,
+        compiled: CompiledTemplate,
+        product_name: str,
+        description: str,
+        features: List[str],
+    ):
+        """按编译好的版式绘制文字内容"""
+        content = self.layout_content(compiled, product_name, description, features)
+        text_rgb = compiled.text_rgb
+        accent_rgb = compiled.accent_rgb
+
+        for x1, y1, x2, y2, line_width in content.lines:
+            draw.line([(x1, y1), (x2, y2)], fill=accent_rgb, width=line_width)
+
+        # 标签的圆角矩形背景
+        radius = compiled.layout["tags"]["radius"]
+        for rect in content.tags:
+            draw.rounded_rectangle(rect, radius=radius, fill=accent_rgb, outline=accent_rgb, width=2)
+
+        for font_name, x, y, text in content.texts:
+            font_manager.draw_text(draw, (x, y), text, compiled.fonts[font_name], text_rgb)
+
+    def _wrap_text(self, text: str, font: ImageFont, max_width: int) -> List[str]:
+        """自动换行（基于字形宽度缓存，线性时间；按回退字体的实际宽度测量）"""
+        return font_manager.wrap(text, font, max_width)
 
     def _hex_to_rgb(self, hex_color: str) -> Tuple[int, int, int]:
         """十六进制转RGB"""
-        hex_color = hex_color.lstrip("#")
-        return tuple(int(hex_color[i : i + 2], 16) for i in (0, 2, 4))
+        return hex_to_rgb(hex_color)
 
 
 # 全局渲染器实例
 poster_renderer = PosterRenderer()
+
+
+def render_poster(spec: PosterRenderSpec) -> dict:
+    """渲染入口（模块级函数，可被进程池序列化调用）"""
+    return poster_renderer.render(spec)
+
+
+def render_poster_batch(specs: List[PosterRenderSpec]) -> List[dict]:
+    """批量渲染入口（同一进程内连续渲染，复用模板编译和文字排版）"""
+    return [poster_renderer.render(spec) for spec in specs]
+
+
+def render_contact_sheet(sources: List[str], output_path: str) -> dict:
+    """预览图渲染入口"""
+    width, height = poster_exporter.contact_sheet(
+        [Path(source) for source in sources], Path(output_path)
+    )
+    return {"width": width, "height": height}
@@ -0,0 +1,189 @@
+"""
+海报模板布局
+声明式描述模板的版式，编译时预先栅格化静态部分（背景、装饰、页脚）并按模板缓存，
+每次渲染只需在编译结果上绘制动态文字
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+# 默认版式（单位：像素，基于 1200 x 1600 画布）
+# 配色方案中可以通过 "layout" 键覆盖其中任意字段
+DEFAULT_LAYOUT: Dict[str, Any] = {
+    "margin": 80,
+    "title": {"font_size": 90, "top": 280, "line_height": 110, "max_lines": 2},
+    "divider": {"gap_before": 50, "inset": 150, "width": 3, "gap_after": 60},
+    "description": {
+        "font_size": 36,
+        "line_height": 55,
+        "max_lines": 3,
+        "inset": 40,
+        "gap_after": 80,
+    },
+    "tags": {
+        "font_size": 32,
+        "height": 65,
+        "padding": 25,
+        "gap": 20,
+        "row_gap": 25,
+        "radius": 32,
+        "max_tags": 4,
+        "max_rows": 2,
+    },
+    "footer": {"text": "Generated by PitchCube", "font_size": 32, "bottom": 120},
+    # 半透明装饰圆：(x 占宽度比例, y 占高度比例, 半径)，半径随画布宽度缩放
+    "decorations": {
+        "opacity": 25,
+        "blur": 6,
+        "circles": [[0.083, 0.125, 250], [0.875, 0.8125, 350], [0.5, 0.094, 120]],
+    },
+}
+
+# 版式数值的参考画布宽度
+REFERENCE_WIDTH = 1200
+
+
+def resolve_layout(overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """把模板的版式覆盖项合并到默认版式上（逐层合并）"""
+
+    def merge(base: Dict[str, Any], extra: Dict[str, Any]) -> Dict[str, Any]:
+        for key, value in extra.items():
+            if isinstance(value, dict) and isinstance(base.get(key), dict):
+                merge(base[key], value)
+            else:
+                base[key] = value
+        return base
+
+    return merge(copy.deepcopy(DEFAULT_LAYOUT), overrides or {})
+
+
+@lru_cache(maxsize=64)
+def decoration_sprite(radius: int, rgba: Tuple[int, int, int, int], blur: int) -> Image.Image:
+    """
+    单个装饰圆的 RGBA 贴图（带模糊边缘）
+
+    只在贴图大小的画布上绘制和模糊一次，结果缓存复用（调用方不要修改返回的图像）
+    """
+    pad = blur * 3
+    size = 2 * (radius + pad)
+    sprite = Image.new("RGBA", (size, size), (*rgba[:3], 0))
+    ImageDraw.Draw(sprite).ellipse(
+        [pad, pad, pad + 2 * radius, pad + 2 * radius], fill=rgba
+    )
+    if blur > 0:
+        sprite = sprite.filter(ImageFilter.GaussianBlur(blur))
+    return sprite
+
+
+@lru_cache(maxsize=32)
+def decoration_layer(
+    size: Tuple[int, int],
+    circles: Tuple[Tuple[float, float, float], ...],
+    rgba: Tuple[int, int, int, int],
+    blur: int,
+) -> Image.Image:
+    """
+    整张装饰图层（按 模板配色 + 尺寸 缓存）
+
+    各贴图只贴到自身所在的区域，画布之外的部分裁掉
+    """
+    width, height = size
+    scale = width / REFERENCE_WIDTH
+    layer = Image.new("RGBA", size, (0, 0, 0, 0))
+
+    for fx, fy, radius in circles:
+        sprite = decoration_sprite(max(1, round(radius * scale)), rgba, max(0, round(blur * scale)))
+        half = sprite.width // 2
+        x, y = round(fx * width) - half, round(fy * height) - half
+        # alpha_composite 不接受负坐标，先裁掉超出左/上边界的部分
+        left, top = max(0, -x), max(0, -y)
+        right, bottom = min(sprite.width, width - x), min(sprite.height, height - y)
+        if left < right and top < bottom:
+            layer.alpha_composite(sprite, (x + left, y + top), (left, top, right, bottom))
+
+    return layer
+
+
+def compose_decorations(
+    base: Image.Image, decorations: Dict[str, Any], accent_rgb: Tuple[int, int, int]
+) -> Image.Image:
+    """把装饰图层一次性 alpha 合成到背景上"""
+    circles = tuple(tuple(circle) for circle in decorations.get("circles", ()))
+    if not circles or decorations.get("opacity", 0) <= 0:
+        return base
+
+    layer = decoration_layer(
+        base.size,
+        circles,
+        (*accent_rgb, decorations["opacity"]),
+        decorations.get("blur", 0),
+    )
+    return Image.alpha_composite(base.convert("RGBA"), layer).convert("RGB")
+
+
+@dataclass
+class CompiledTemplate:
+    """编译后的模板：静态图层已栅格化，字体和颜色已解析"""
+
+    template_id: str
+    size: Tuple[int, int]
+    base: Image.Image  # 背景 + 装饰 + 页脚
+    layout: Dict[str, Any]
+    text_rgb: Tuple[int, int, int]
+    accent_rgb: Tuple[int, int, int]
+    fonts: Dict[str, ImageFont.ImageFont] = field(default_factory=dict)
+
+    @property
+    def content_width(self) -> int:
+        """正文可用宽度"""
+        return self.size[0] - 2 * self.layout["margin"]
+
+
+@dataclass
+class ContentLayout:
+    """排版后的文字内容（只有坐标，不含配色，可被同一内容的多个变体复用）"""
+
+    texts: List[Tuple[str, int, int, str]] = field(default_factory=list)  # (字体, x, y, 文本)
+    lines: List[Tuple[int, int, int, int, int]] = field(default_factory=list)  # 分隔线
+    tags: List[Tuple[int, int, int, int]] = field(default_factory=list)  # 标签背景矩形
+
+
+class TemplateCache:
+    """编译结果（模板、排版）的 LRU 缓存"""
+
+    def __init__(self, max_size: int = 32):
+        self.max_size = max_size
+        self._cache: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compile(
+        self, key: Hashable, compile_fn: Callable[[], Any]
+    ) -> Any:
+        """命中直接返回，否则编译并缓存"""
+        with self._lock:
+            compiled = self._cache.get(key)
+            if compiled is not None:
+                self._cache.move_to_end(key)
+                return compiled
+
+        compiled = compile_fn()
+
+        with self._lock:
+            self._cache[key] = compiled
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        """清空缓存（模板定义变化时调用）"""
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
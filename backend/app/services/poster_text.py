@@ -0,0 +1,220 @@
+"""
+海报文字排版工具
+按 (字体, 字号) 缓存字形宽度和字偶距，提供线性时间的自动换行（支持中英文混排）
+"""
+
+import threading
+import unicodedata
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from PIL import ImageFont
+
+# 不能出现在行首的标点（避头尾规则），遇到时允许悬挂在行尾
+NO_LINE_START = set("，。、；：！？）》」』】〕…·,.;:!?)]}%")
+
+
+def is_cjk(char: str) -> bool:
+    """判断字符是否为中日韩文字或全角符号（可在任意位置换行）"""
+    if not char:
+        return False
+    code = ord(char)
+    return (
+        0x2E80 <= code <= 0x9FFF  # CJK 部首、符号、假名、统一汉字
+        or 0xAC00 <= code <= 0xD7AF  # 韩文
+        or 0xF900 <= code <= 0xFAFF  # CJK 兼容汉字
+        or 0xFF00 <= code <= 0xFFEF  # 全角字符
+        or 0x20000 <= code <= 0x2FFFF  # CJK 扩展区
+        or unicodedata.east_asian_width(char) in ("W", "F")
+    )
+
+
+def font_key(font: ImageFont.ImageFont) -> Hashable:
+    """生成字体缓存键 (字体文件, 字号)"""
+    path = getattr(font, "path", None)
+    if isinstance(path, str):
+        return (path, getattr(font, "size", None))
+    # 内存中加载的字体（如默认字体）没有文件路径，按对象区分
+    return (id(font), getattr(font, "size", None))
+
+
+class GlyphMetrics:
+    """单个 (字体, 字号) 的字形度量缓存"""
+
+    def __init__(self, font: ImageFont.ImageFont):
+        self.font = font
+        self._advances: Dict[str, float] = {}
+        self._kerning: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def advance(self, char: str) -> float:
+        """单个字符的前进宽度"""
+        value = self._advances.get(char)
+        if value is None:
+            value = self.font.getlength(char)
+            with self._lock:
+                self._advances[char] = value
+        return value
+
+    def kerning(self, left: str, right: str) -> float:
+        """字符对的字偶距修正（大多数中文字体为 0）"""
+        pair = (left, right)
+        value = self._kerning.get(pair)
+        if value is None:
+            value = self.font.getlength(left + right) - self.advance(left) - self.advance(right)
+            with self._lock:
+                self._kerning[pair] = value
+        return value
+
+    def step(self, prev: str, char: str) -> float:
+        """在 prev 之后追加 char 时增加的宽度"""
+        width = self.advance(char)
+        if prev:
+            width += self.kerning(prev, char)
+        return width
+
+    def width(self, text: str) -> float:
+        """文本宽度（含字偶距）"""
+        total = 0.0
+        prev = ""
+        for char in text:
+            total += self.step(prev, char)
+            prev = char
+        return total
+
+
+class FallbackMetrics:
+    """
+    混排文本的度量：每个字符按实际绘制所用的字体测量
+
+    与逐段绘制一致，字偶距只在同一字体的相邻字符之间计算
+    """
+
+    def __init__(
+        self,
+        measurer: "TextMeasurer",
+        font_for: Callable[[str], ImageFont.ImageFont],
+    ):
+        self.measurer = measurer
+        self.font_for = font_for
+
+    def step(self, prev: str, char: str) -> float:
+        """在 prev 之后追加 char 时增加的宽度"""
+        font = self.font_for(char)
+        metrics = self.measurer.metrics(font)
+        width = metrics.advance(char)
+        if prev and self.font_for(prev) is font:
+            width += metrics.kerning(prev, char)
+        return width
+
+    def width(self, text: str) -> float:
+        """文本宽度"""
+        total = 0.0
+        prev = ""
+        for char in text:
+            total += self.step(prev, char)
+            prev = char
+        return total
+
+
+class TextMeasurer:
+    """文字测量与换行"""
+
+    def __init__(self):
+        self._metrics: Dict[Hashable, GlyphMetrics] = {}
+        self._lock = threading.Lock()
+
+    def metrics(self, font: ImageFont.ImageFont) -> GlyphMetrics:
+        """获取字体对应的度量缓存"""
+        key = font_key(font)
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self._metrics.setdefault(key, GlyphMetrics(font))
+        return metrics
+
+    def width(self, text: str, font: ImageFont.ImageFont) -> int:
+        """测量文本宽度（像素）"""
+        return int(round(self.metrics(font).width(text)))
+
+    def wrap(
+        self,
+        text: str,
+        font: ImageFont.ImageFont,
+        max_width: int,
+        font_for: Optional[Callable[[str], ImageFont.ImageFont]] = None,
+    ) -> List[str]:
+        """
+        自动换行
+
+        每个字符只测量一次（宽度来自缓存），整体为线性时间：
+        - 中日韩文字之间可以任意换行
+        - 拉丁单词只在空格处换行，超长单词按字符强制断开
+        - 行首标点悬挂到上一行末尾
+
+        Args:
+            text: 待换行文本
+            font: 字体
+            max_width: 最大行宽（像素）
+            font_for: 字符实际使用的字体（有字体回退时传入，按回退字体测量）
+
+        Returns:
+            行列表
+        """
+        metrics = self.metrics(font) if font_for is None else FallbackMetrics(self, font_for)
+        lines: List[str] = []
+
+        for paragraph in text.split("\n"):
+            lines.extend(self._wrap_paragraph(paragraph, metrics, max_width))
+
+        return lines if lines else [text]
+
+    def _wrap_paragraph(
+        self, text: str, metrics: "GlyphMetrics | FallbackMetrics", max_width: int
+    ) -> List[str]:
+        lines: List[str] = []
+        line: List[str] = []
+        line_width = 0.0
+        break_at = -1  # 当前行最后一个可换行位置（该位置之前的字符留在本行）
+
+        for char in text:
+            prev = line[-1] if line else ""
+
+            if line and (is_cjk(char) or is_cjk(prev) or prev.isspace()):
+                if char not in NO_LINE_START:
+                    break_at = len(line)
+
+            step = metrics.step(prev, char)
+
+            if line and line_width + step > max_width and char not in NO_LINE_START:
+                if break_at <= 0 or char.isspace():
+                    split = len(line)
+                else:
+                    split = break_at
+
+                lines.append("".join(line[:split]).rstrip())
+
+                rest = line[split:]
+                while rest and rest[0].isspace():
+                    rest = rest[1:]
+                # 剩余部分不含换行点（最多是一个单词），重新累加其宽度
+                line = rest
+                line_width = metrics.width("".join(line))
+                break_at = -1
+
+                if char.isspace() and not line:
+                    continue
+
+                prev = line[-1] if line else ""
+                step = metrics.step(prev, char)
+
+            line.append(char)
+            line_width += step
+
+        if line:
+            lines.append("".join(line).rstrip())
+
+        return lines
+
+
+# 全局文字测量实例
+text_measurer = TextMeasurer()
@@ -0,0 +1,193 @@
+"""
+AI 服务商路由
+按 操作（text / image / speech ...）和服务商记录最近调用的延迟与错误率，
+auto 请求优先发给当前最快的健康服务商，并按权重保留少量探索流量
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+def percentile(values: Sequence[float], fraction: float) -> Optional[float]:
+    """最近邻法分位数（values 为空时返回 None）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class LatencyWindow:
+    """
+    滚动窗口：最近 max_samples 次调用，且不早于 max_age 秒
+
+    只有成功调用计入延迟分布，失败调用只计入错误率
+    """
+
+    def __init__(self, max_samples: int, max_age: float):
+        self.max_age = max_age
+        self._samples: Deque[Tuple[float, float, bool]] = deque(maxlen=max_samples)
+
+    def add(self, latency: float, ok: bool, now: Optional[float] = None):
+        self._samples.append((now if now is not None else time.monotonic(), latency, ok))
+
+    def _prune(self, now: float):
+        while self._samples and now - self._samples[0][0] > self.max_age:
+            self._samples.popleft()
+
+    def latencies(self, now: Optional[float] = None) -> List[float]:
+        """窗口内成功调用的延迟"""
+        self._prune(now if now is not None else time.monotonic())
+        return [latency for _, latency, ok in self._samples if ok]
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Any]:
+        latencies = self.latencies(now)
+        total = len(self._samples)
+        errors = total - len(latencies)
+        return {
+            "samples": total,
+            "error_rate": errors / total if total else 0.0,
+            "p50": percentile(latencies, 0.5),
+            "p90": percentile(latencies, 0.9),
+            "p99": percentile(latencies, 0.99),
+        }
+
+
+class ProviderRouter:
+    """
+    延迟感知的服务商路由
+
+    - 样本不足 min_samples 的服务商按候选顺序优先试用，尽快建立延迟分布
+    - 错误率超过 max_error_rate 的服务商视为不健康，没有健康服务商时按错误率排序
+    - 健康服务商按 p90 延迟排序；以 exploration 的概率按 1/p90 加权随机选择，
+      让较慢的服务商也有少量流量，恢复后能被重新发现
+    """
+
+    def __init__(
+        self,
+        window_size: Optional[int] = None,
+        window_seconds: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        max_error_rate: Optional[float] = None,
+        exploration: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.window_size = window_size or settings.AI_ROUTER_WINDOW_SIZE
+        self.window_seconds = window_seconds or settings.AI_ROUTER_WINDOW_SECONDS
+        self.min_samples = settings.AI_ROUTER_MIN_SAMPLES if min_samples is None else min_samples
+        self.max_error_rate = (
+            settings.AI_ROUTER_MAX_ERROR_RATE if max_error_rate is None else max_error_rate
+        )
+        self.exploration = settings.AI_ROUTER_EXPLORATION if exploration is None else exploration
+        self._rng = rng or random.Random()
+        self._windows: Dict[Tuple[str, str], LatencyWindow] = {}
+        self._lock = threading.Lock()
+
+    def _window(self, operation: str, provider: str) -> LatencyWindow:
+        key = (operation, provider)
+        if key not in self._windows:
+            self._windows[key] = LatencyWindow(self.window_size, self.window_seconds)
+        return self._windows[key]
+
+    def record(self, operation: str, provider: str, latency: float, ok: bool = True):
+        """记录一次调用"""
+        with self._lock:
+            self._window(operation, provider).add(latency, ok)
+
+    def _peek(self, operation: str, provider: str) -> LatencyWindow:
+        """只读访问（没有记录时返回空窗口，不写入）"""
+        return self._windows.get((operation, provider)) or LatencyWindow(1, self.window_seconds)
+
+    def summary(self, operation: str, provider: str) -> Dict[str, Any]:
+        with self._lock:
+            return self._peek(operation, provider).summary()
+
+    def latency(self, operation: str, provider: str, fraction: float = 0.9) -> Optional[float]:
+        """服务商最近成功调用的延迟分位数（样本不足时为 None）"""
+        with self._lock:
+            latencies = self._peek(operation, provider).latencies()
+        if len(latencies) < max(1, self.min_samples):
+            return None
+        return percentile(latencies, fraction)
+
+    def rank(self, operation: str, candidates: Sequence[str]) -> List[str]:
+        """候选服务商按当前表现排序（第一个是本次应使用的服务商）"""
+        candidates = list(dict.fromkeys(candidates))
+        if len(candidates) <= 1:
+            return candidates
+        summaries = {provider: self.summary(operation, provider) for provider in candidates}
+
+        cold = [p for p in candidates if summaries[p]["samples"] < self.min_samples]
+        healthy = [
+            p
+            for p in candidates
+            if p not in cold and summaries[p]["error_rate"] <= self.max_error_rate
+        ]
+        healthy.sort(key=lambda p: summaries[p]["p90"] or float("inf"))
+        unhealthy = sorted(
+            (p for p in candidates if p not in cold and p not in healthy),
+            key=lambda p: summaries[p]["error_rate"],
+        )
+
+        if not cold and len(healthy) > 1 and self._rng.random() < self.exploration:
+            weights = [1.0 / max(summaries[p]["p90"] or 0.001, 0.001) for p in healthy]
+            pick = self._rng.choices(healthy, weights=weights)[0]
+            healthy.remove(pick)
+            healthy.insert(0, pick)
+
+        return cold + healthy + unhealthy
+
+    def choose(self, operation: str, candidates: Sequence[str]) -> str:
+        """本次使用的服务商"""
+        ranked = self.rank(operation, candidates)
+        if not ranked:
+            raise ValueError(f"No provider available for {operation}")
+        return ranked[0]
+
+    async def call(
+        self, operation: str, provider: str, factory: Callable[[], Awaitable[T]]
+    ) -> T:
+        """调用并记录延迟和成败（被取消的调用不计入）"""
+        started = time.monotonic()
+        try:
+            result = await factory()
+        except Exception:
+            self.record(operation, provider, time.monotonic() - started, ok=False)
+            raise
+        self.record(operation, provider, time.monotonic() - started, ok=True)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """各操作、各服务商的延迟和错误率"""
+        with self._lock:
+            keys = list(self._windows)
+        stats: Dict[str, Dict[str, Any]] = {}
+        for operation, provider in keys:
+            summary = self.summary(operation, provider)
+            stats.setdefault(operation, {})[provider] = {
+                key: round(value, 3) if isinstance(value, float) else value
+                for key, value in summary.items()
+            }
+        return stats
+
+
+# 全局服务商路由
+provider_router = ProviderRouter()
@@ -0,0 +1,409 @@
+"""
+AI 服务商限流
+每个服务商一组令牌桶（每分钟请求数、每分钟 token 数）和并发上限，调用前排队等待额度，
+等待时间受请求的延迟预算和 AI_RATE_LIMIT_QUEUE_TIMEOUT 限制；集群模式下令牌桶保存在
+Redis 中，多个进程共享同一份配额
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.latency import LatencyBudgetExceeded, current_budget
+from app.core.logging import logger
+
+REDIS_KEY_PREFIX = "pitchcube:ratelimit:"
+
+# 令牌桶容量按 BURST_SECONDS 秒的配额计算：允许短时突发，又不会一次用完整分钟的配额
+BURST_SECONDS = 10.0
+
+# Redis 令牌桶：按 Redis 服务器时间补充令牌，额度足够时扣减并返回 0，否则返回需要等待的毫秒数
+_REDIS_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1]) / 60000.0
+local capacity = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= amount then
+  tokens = tokens - amount
+else
+  wait = math.ceil((amount - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate) + 1000)
+return wait
+"""
+
+# 归还 Redis 令牌桶中已扣减但未使用的额度（不超过容量）
+_REDIS_REFUND_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens then
+  redis.call('HSET', KEYS[1], 'tokens', math.min(capacity, tokens + tonumber(ARGV[2])))
+end
+return 0
+"""
+
+
+class RateLimitExceeded(Exception):
+    """服务商额度在等待期限内无法满足"""
+
+    def __init__(self, provider: str, retry_after: float):
+        self.provider = provider
+        self.retry_after = retry_after
+        super().__init__(f"Provider {provider} rate limit reached, retry after {retry_after:.1f}s")
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    """服务商配额（None 表示不限制）"""
+
+    rpm: Optional[int] = None
+    tpm: Optional[int] = None
+    max_in_flight: Optional[int] = None
+
+
+# 默认配额（略低于各服务商默认档位的上限），可用 AI_RATE_LIMITS_STR 覆盖
+PROVIDER_RATE_LIMITS: Dict[str, RateLimits] = {
+    "openai": RateLimits(rpm=500, tpm=150_000, max_in_flight=16),
+    "stepfun": RateLimits(rpm=60, tpm=100_000, max_in_flight=8),
+    "minimax": RateLimits(rpm=120, tpm=100_000, max_in_flight=8),
+    "stability": RateLimits(rpm=150, max_in_flight=4),
+    "replicate": RateLimits(rpm=600, max_in_flight=8),
+    "runway": RateLimits(rpm=60, max_in_flight=4),
+}
+
+
+def parse_rate_limits(value: str) -> Dict[str, RateLimits]:
+    """
+    解析 "openai=500/150000/16,stability=150/0/4" 格式的配额（rpm/tpm/并发，0 表示不限制）
+    """
+    limits: Dict[str, RateLimits] = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, spec = item.partition("=")
+        numbers = [int(n) if n.strip() else 0 for n in spec.split("/")]
+        numbers += [0] * (3 - len(numbers))
+        rpm, tpm, in_flight = (n or None for n in numbers[:3])
+        limits[name.strip()] = RateLimits(rpm=rpm, tpm=tpm, max_in_flight=in_flight)
+    return limits
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：CJK 字符约 1 个 token，其他字符约 4 个一个 token"""
+    cjk = sum(1 for ch in text if "一" <= ch <= "鿿")
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+class TokenBucket:
+    """
+    进程内令牌桶（预约式）
+
+    reserve() 立即扣减额度（可为负）并返回需要等待的秒数，后来的请求排在后面，
+    先到先得；等待期限内无法满足时不扣减
+    """
+
+    def __init__(self, per_minute: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, per_minute * BURST_SECONDS / 60.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float, max_wait: float) -> Optional[float]:
+        """预约 amount 个令牌，返回需要等待的秒数；超过 max_wait 时返回 None"""
+        amount = min(amount, self.capacity)
+        self._refill(self._clock())
+        wait = max(0.0, (amount - self._tokens) / self.rate)
+        # 期限已过时 max_wait 为负，仍然放行无需等待的请求
+        if wait > max(0.0, max_wait):
+            return None
+        self._tokens -= amount
+        return wait
+
+    def refund(self, amount: float):
+        """归还未使用的预约"""
+        self._tokens = min(self.capacity, self._tokens + min(amount, self.capacity))
+
+    @property
+    def available(self) -> float:
+        self._refill(self._clock())
+        return self._tokens
+
+
+class ConcurrencyGate:
+    """并发上限（先到先得；不绑定事件循环）"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: float) -> bool:
+        """timeout 秒内取得名额返回 True"""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return True
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=max(0.0, timeout))
+            return True
+        except asyncio.TimeoutError:
+            return self._abandon(waiter)
+        except asyncio.CancelledError:
+            if self._abandon(waiter):
+                self.release()
+            raise
+
+    def _abandon(self, waiter: asyncio.Future) -> bool:
+        """放弃等待；名额恰好已转交时返回 True（名额归调用方）"""
+        if waiter.done() and not waiter.cancelled():
+            return True
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        return False
+
+    def release(self):
+        """释放名额，直接转交给下一个等待者"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+class ProviderLimiter:
+    """
+    单个服务商的限流器
+
+    rpm / tpm 在集群模式下由 Redis 共享（Redis 不可用时退回进程内令牌桶），
+    并发上限始终按进程计算
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limits: RateLimits,
+        cluster: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.limits = limits
+        self.cluster = cluster
+        self._clock = clock
+        self._requests = TokenBucket(limits.rpm, clock) if limits.rpm else None
+        self._tokens = TokenBucket(limits.tpm, clock) if limits.tpm else None
+        self._gate = ConcurrencyGate(limits.max_in_flight) if limits.max_in_flight else None
+        self._admitted = 0
+        self._queued = 0
+        self._rejected = 0
+        self._redis_failed = False
+
+    def _deadline(self) -> Tuple[float, bool]:
+        """(截止时间, 是否受延迟预算限制)"""
+        now = self._clock()
+        deadline = now + settings.AI_RATE_LIMIT_QUEUE_TIMEOUT
+        budget = current_budget()
+        if budget is not None and now + budget.remaining() < deadline:
+            return now + budget.remaining(), True
+        return deadline, False
+
+    def _reject(self, retry_after: float, by_budget: bool):
+        self._rejected += 1
+        if by_budget:
+            raise LatencyBudgetExceeded(f"Latency budget exhausted waiting for {self.name} quota")
+        raise RateLimitExceeded(self.name, retry_after)
+
+    def _reserve_local(self, amounts, deadline: float, by_budget: bool) -> float:
+        """在进程内令牌桶中预约，返回需要等待的秒数"""
+        reserved = []
+        wait = 0.0
+        for bucket, amount in amounts:
+            bucket_wait = bucket.reserve(amount, deadline - self._clock())
+            if bucket_wait is None:
+                for other, other_amount in reserved:
+                    other.refund(other_amount)
+                needed = (min(amount, bucket.capacity) - bucket.available) / bucket.rate
+                self._reject(needed, by_budget)
+            reserved.append((bucket, amount))
+            wait = max(wait, bucket_wait)
+        return wait
+
+    async def _reserve_cluster(self, amounts, deadline: float, by_budget: bool):
+        """
+        在 Redis 令牌桶中取得额度（额度不足时等待后重试）
+
+        返回 (已在 Redis 中扣减的额度, 未能在 Redis 中预约的额度)；Redis 不可用时
+        剩余额度由调用方退回进程内限流，已扣减的部分不再重复计算
+        """
+        from app.db.redis import redis_client
+
+        client = redis_client.client
+        if client is None:
+            return [], list(amounts)
+        taken = []
+        for index, (bucket, amount, kind) in enumerate(amounts):
+            key = f"{REDIS_KEY_PREFIX}{self.name}:{kind}"
+            amount = min(amount, bucket.capacity)
+            while True:
+                try:
+                    wait_ms = await client.eval(
+                        _REDIS_BUCKET_SCRIPT, 1, key, bucket.rate * 60, bucket.capacity, amount
+                    )
+                except Exception as e:
+                    if not self._redis_failed:
+                        logger.warning(f"Redis rate limiter unavailable, limiting per process: {e}")
+                        self._redis_failed = True
+                    return taken, list(amounts[index:])
+                self._redis_failed = False
+                wait = int(wait_ms) / 1000
+                if wait <= 0:
+                    break
+                if self._clock() + wait > deadline:
+                    await self._refund_cluster(taken)
+                    self._reject(wait, by_budget)
+                self._queued += 1
+                await asyncio.sleep(wait)
+            taken.append((key, bucket, amount))
+        return taken, []
+
+    async def _refund_cluster(self, taken):
+        """归还已在 Redis 中扣减的额度（失败时忽略，令牌桶会自然补充）"""
+        if not taken:
+            return
+        from app.db.redis import redis_client
+
+        client = redis_client.client
+        for key, bucket, amount in taken:
+            try:
+                await client.eval(_REDIS_REFUND_SCRIPT, 1, key, bucket.capacity, amount)
+            except Exception as e:
+                logger.debug(f"Redis rate limit refund failed for {key}: {e}")
+
+    async def acquire(self, tokens: int = 0):
+        """
+        等待请求额度和并发名额
+
+        Raises:
+            RateLimitExceeded: 等待期限内无法取得额度
+            LatencyBudgetExceeded: 请求的延迟预算先用完
+        """
+        deadline, by_budget = self._deadline()
+        amounts = [(self._requests, 1, "rpm")] if self._requests else []
+        if self._tokens and tokens:
+            amounts.append((self._tokens, tokens, "tpm"))
+
+        taken = []
+        if self.cluster and amounts:
+            taken, amounts = await self._reserve_cluster(amounts, deadline, by_budget)
+
+        local = [(bucket, amount) for bucket, amount, _ in amounts]
+        if local:
+            try:
+                wait = self._reserve_local(local, deadline, by_budget)
+            except (RateLimitExceeded, LatencyBudgetExceeded):
+                await self._refund_cluster(taken)
+                raise
+            if wait > 0:
+                self._queued += 1
+                try:
+                    await asyncio.sleep(wait)
+                except asyncio.CancelledError:
+                    for bucket, amount in local:
+                        bucket.refund(amount)
+                    raise
+
+        if self._gate is not None:
+            if self._gate.in_flight >= self._gate.limit:
+                self._queued += 1
+            if not await self._gate.acquire(deadline - self._clock()):
+                for bucket, amount in local:
+                    bucket.refund(amount)
+                await self._refund_cluster(taken)
+                self._reject(1.0, by_budget)
+        self._admitted += 1
+
+    def release(self):
+        if self._gate is not None:
+            self._gate.release()
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0) -> AsyncIterator[None]:
+        """取得额度后执行，结束时释放并发名额"""
+        await self.acquire(tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rpm": self.limits.rpm,
+            "tpm": self.limits.tpm,
+            "max_in_flight": self.limits.max_in_flight,
+            "in_flight": self._gate.in_flight if self._gate else None,
+            "waiting": self._gate.waiting if self._gate else 0,
+            "admitted": self._admitted,
+            "queued": self._queued,
+            "rejected": self._rejected,
+            "cluster": self.cluster and not self._redis_failed,
+        }
+
+
+class RateLimiterRegistry:
+    """按服务商管理限流器"""
+
+    def __init__(self):
+        self._limiters: Dict[str, ProviderLimiter] = {}
+        self._overrides = parse_rate_limits(settings.AI_RATE_LIMITS_STR)
+
+    def limits_for(self, provider: str) -> RateLimits:
+        return self._overrides.get(provider) or PROVIDER_RATE_LIMITS.get(provider, RateLimits())
+
+    def get(self, provider: str) -> ProviderLimiter:
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            limiter = self._limiters[provider] = ProviderLimiter(
+                provider, self.limits_for(provider), cluster=settings.AI_RATE_LIMIT_CLUSTER
+            )
+        return limiter
+
+    @asynccontextmanager
+    async def slot(self, provider: str, tokens: int = 0) -> AsyncIterator[None]:
+        """服务商调用的限流上下文（AI_RATE_LIMIT_ENABLED 关闭时不限制）"""
+        if not settings.AI_RATE_LIMIT_ENABLED:
+            yield
+            return
+        async with self.get(provider).slot(tokens):
+            yield
+
+    def reset(self):
+        self._limiters.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: limiter.stats() for name, limiter in sorted(self._limiters.items())}
+
+
+# 全局服务商限流器
+rate_limiter = RateLimiterRegistry()
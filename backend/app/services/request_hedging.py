@@ -0,0 +1,124 @@
+"""
+对冲请求（hedged requests）
+主服务商在其 p90 延迟内没有返回时，把同一请求发给第二个服务商，先成功的结果胜出，
+另一个请求被取消；对冲预算限制额外请求的比例，最多使花费翻倍
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.logging import logger
+
+T = TypeVar("T")
+
+
+class HedgeBudget:
+    """
+    对冲预算（令牌桶）
+
+    每个主请求存入 ratio 个额度（上限 burst），每次对冲消耗 1 个额度；
+    ratio 不超过 1，因此对冲请求数不会超过主请求数，总花费最多翻倍
+    """
+
+    def __init__(self, ratio: Optional[float] = None, burst: Optional[float] = None):
+        ratio = settings.AI_HEDGING_BUDGET_RATIO if ratio is None else ratio
+        self.ratio = min(max(ratio, 0.0), 1.0)
+        self.burst = settings.AI_HEDGING_BUDGET_BURST if burst is None else burst
+        self._credits = 0.0
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._hedges = 0
+        self._denied = 0
+        self._hedge_wins = 0
+
+    def deposit(self):
+        """记录一个主请求"""
+        with self._lock:
+            self._requests += 1
+            self._credits = min(self.burst, self._credits + self.ratio)
+
+    def try_spend(self) -> bool:
+        """预算允许时消耗一个额度并返回 True"""
+        with self._lock:
+            # 容忍 0.1 累加 10 次的浮点误差
+            if self._credits >= 1.0 - 1e-9:
+                self._credits = max(0.0, self._credits - 1.0)
+                self._hedges += 1
+                return True
+            self._denied += 1
+            return False
+
+    def record_win(self):
+        with self._lock:
+            self._hedge_wins += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ratio": self.ratio,
+                "credits": round(self._credits, 3),
+                "requests": self._requests,
+                "hedges": self._hedges,
+                "denied": self._denied,
+                "hedge_wins": self._hedge_wins,
+            }
+
+
+async def _cancel(task: "asyncio.Task"):
+    task.cancel()
+    try:
+        await task
+    except BaseException:
+        pass
+
+
+async def hedged(
+    primary: Callable[[], Awaitable[T]],
+    backup: Optional[Callable[[], Awaitable[T]]],
+    delay: Optional[float],
+    budget: HedgeBudget,
+) -> T:
+    """
+    执行主请求，delay 秒后仍未返回且预算允许时发起备用请求
+
+    - 先成功的结果胜出，另一个请求被取消
+    - 一个失败时继续等待另一个；都失败时抛出主请求的异常
+    - backup 或 delay 为 None 时不对冲
+    """
+    budget.deposit()
+    if backup is None or delay is None:
+        return await primary()
+
+    first = asyncio.ensure_future(primary())
+    second: Optional["asyncio.Task"] = None
+    try:
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done or not budget.try_spend():
+            return await first
+
+        second = asyncio.ensure_future(backup())
+        pending = {first, second}
+        errors: Dict["asyncio.Task", BaseException] = {}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for loser in pending:
+                        await _cancel(loser)
+                    if task is second:
+                        budget.record_win()
+                    return task.result()
+                errors[task] = task.exception()
+        logger.warning(f"Hedged request failed on both providers: {errors[second]}")
+        raise errors[first]
+    finally:
+        # 调用方被取消（或超时）时不留下后台请求
+        for task in (first, second):
+            if task is not None and not task.done():
+                await _cancel(task)
+
+
+# 全局对冲预算
+hedge_budget = HedgeBudget()
@@ -3,11 +3,11 @@ Stability AI 服务集成
 用于海报图像生成和增强
 """
 
-import httpx
 import base64
 from typing import Optional, List
 from pathlib import Path
 from app.core.config import settings
+from app.core.http_clients import http_clients, status_error
 from app.core.logging import logger
 
 
@@ -42,33 +42,33 @@ class StabilityAI:
         Returns:
             图像二进制数据
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.API_BASE}/stable-image/generate/ultra",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Accept": "image/*"
-                },
-                data={
-                    "prompt": prompt,
-                    "negative_prompt": negative_prompt,
-                    "aspect_ratio": aspect_ratio,
-                    "output_format": output_format
-                },
-                timeout=60.0
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"Stability API error: {response.status_code}"
-                try:
-                    error_data = response.json()
-                    error_msg += f" - {error_data.get('errors', [''])[0]}"
-                except:
-                    pass
-                raise Exception(error_msg)
-            
-            return response.content
-    
+        client = http_clients.get("stability")
+        response = await client.post(
+            f"{self.API_BASE}/stable-image/generate/ultra",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Accept": "image/*"
+            },
+            data={
+                "prompt": prompt,
+                "negative_prompt": negative_prompt,
+                "aspect_ratio": aspect_ratio,
+                "output_format": output_format
+            },
+            timeout=http_clients.timeout("stability", 60.0)
+        )
+        
+        if response.status_code != 200:
+            error_msg = f"Stability API error: {response.status_code}"
+            try:
+                error_data = response.json()
+                error_msg += f" - {error_data.get('errors', [''])[0]}"
+            except:
+                pass
+            raise status_error(error_msg, response)
+        
+        return response.content
+
     async def upscale_image(
         self,
         image_data: bytes,
@@ -84,31 +84,31 @@ class StabilityAI:
         Returns:
             放大后的图像数据
         """
-        async with httpx.AsyncClient() as client:
-            files = {
-                "image": ("image.png", image_data, "image/png")
-            }
-            data = {}
-            if prompt:
-                data["prompt"] = prompt
-            
-            response = await client.post(
-                f"{self.API_BASE}/stable-image/upscale/conservative",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Accept": "image/*"
-                },
-                files=files,
-                data=data,
-                timeout=120.0
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"Stability Upscale API error: {response.status_code}"
-                raise Exception(error_msg)
-            
-            return response.content
-    
+        client = http_clients.get("stability")
+        files = {
+            "image": ("image.png", image_data, "image/png")
+        }
+        data = {}
+        if prompt:
+            data["prompt"] = prompt
+        
+        response = await client.post(
+            f"{self.API_BASE}/stable-image/upscale/conservative",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Accept": "image/*"
+            },
+            files=files,
+            data=data,
+            timeout=http_clients.timeout("stability", 120.0)
+        )
+        
+        if response.status_code != 200:
+            error_msg = f"Stability Upscale API error: {response.status_code}"
+            raise status_error(error_msg, response)
+        
+        return response.content
+
     async def enhance_poster(
         self,
         product_name: str,
@@ -3,9 +3,9 @@ StepFun (阶跃星辰) 服务集成
 用于大语言模型调用 - 视频脚本生成、文案优化等
 """
 
-import httpx
 from typing import Optional, List, Dict, Any
 from app.core.config import settings
+from app.core.http_clients import http_clients, status_error
 from app.core.logging import logger
 
 
@@ -39,34 +39,34 @@ class StepFunLLM:
         Returns:
             生成的文本内容
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.API_BASE}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model,
-                    "messages": messages,
-                    "temperature": temperature,
-                    "max_tokens": max_tokens
-                },
-                timeout=60.0
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"StepFun API error: {response.status_code}"
-                try:
-                    error_data = response.json()
-                    error_msg += f" - {error_data.get('error', {}).get('message', '')}"
-                except:
-                    pass
-                raise Exception(error_msg)
-            
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
-    
+        client = http_clients.get("stepfun")
+        response = await client.post(
+            f"{self.API_BASE}/chat/completions",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": self.model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens
+            },
+            timeout=http_clients.timeout("stepfun", 60.0)
+        )
+        
+        if response.status_code != 200:
+            error_msg = f"StepFun API error: {response.status_code}"
+            try:
+                error_data = response.json()
+                error_msg += f" - {error_data.get('error', {}).get('message', '')}"
+            except:
+                pass
+            raise status_error(error_msg, response)
+        
+        data = response.json()
+        return data["choices"][0]["message"]["content"]
+
     async def generate_video_script(
         self,
         product_name: str,
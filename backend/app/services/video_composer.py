@@ -5,11 +5,42 @@
 
 import os
 import asyncio
-import subprocess
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterable, Tuple
 from pathlib import Path
 from app.core.config import settings
 from app.core.logging import logger
+from app.services.ffmpeg_capabilities import ffmpeg_capabilities
+from app.services.ffmpeg_pool import (
+    FFmpegCancelledError,
+    ProgressCallback,
+    ffmpeg_scheduler,
+)
+from app.services.ffmpeg_progress import VideoProgress
+from app.services.media_probe import media_probe
+from app.services.video_frames import frame_pipe_command, stream_frames, timeline_frames
+from app.services.video_hls import (
+    PLAYLIST_NAME,
+    HLSPlaylist,
+    read_scene_entries,
+    scene_hls_command,
+)
+from app.services.video_profiles import (
+    EncodingProfile,
+    get_profile,
+    ladder_command,
+    ladder_rungs,
+)
+from app.services.video_scenes import (
+    SceneSpec,
+    brand_card_spec,
+    build_scene_specs,
+    finish_command,
+    fit_to_narration,
+    render_scene_card,
+    segment_command,
+    write_concat_list,
+)
+from app.services.video_segment_cache import segment_cache
 
 
 class VideoComposer:
@@ -18,147 +49,611 @@ class VideoComposer:
     def __init__(self):
         self.output_dir = Path("generated/videos")
         self.output_dir.mkdir(parents=True, exist_ok=True)
-
-        # 检查FFmpeg是否可用
-        self.ffmpeg_available = self._check_ffmpeg()
-
-        if not self.ffmpeg_available:
-            logger.warning(
-                "FFmpeg not available. Video rendering will use fallback mode."
-            )
-
-    def _check_ffmpeg(self) -> bool:
-        """检查FFmpeg是否可用"""
-        try:
-            result = subprocess.run(
-                [settings.FFMPEG_PATH, "-version"], capture_output=True, timeout=5
-            )
-            return result.returncode == 0
-        except Exception as e:
-            logger.warning(f"FFmpeg check failed: {e}")
-            return False
+        self.segment_cache = segment_cache
+        # FFmpeg 能力在首次使用时检测（或由应用启动时在后台检测），导入时不运行子进程
+        self.capabilities = ffmpeg_capabilities
 
     async def create_simple_video(
-        self, task_id: str, title: str, scenes: List[Dict[str, Any]], duration: int = 60
+        self,
+        task_id: str,
+        title: str,
+        scenes: List[Dict[str, Any]],
+        duration: int = 60,
+        priority: str = "final",
+        audio_path: Optional[Path] = None,
+        watermark: Optional[str] = None,
+        progress: Optional[VideoProgress] = None,
+        profile: Optional[str] = None,
+        renditions: Optional[List[str]] = None,
+        hls: bool = False,
+        motion: bool = False,
     ) -> Dict[str, Any]:
         """
         创建简化版视频（使用FFmpeg或Fallback）
 
         Args:
-            task_id: 任务ID
+            task_id: 任务ID（同时作为 FFmpeg 任务标签，可用 cancel() 取消）
             title: 视频标题
             scenes: 场景列表
             duration: 视频时长
+            priority: FFmpeg 调度优先级 preview / final / background
+            audio_path: 整段旁白音频（在成片阶段混流）
+            watermark: 水印文字，默认 VIDEO_WATERMARK_TEXT，空字符串表示不加水印
+            progress: 进度跟踪（render / finish 阶段由这里更新）
+            profile: 编码档位，默认 VIDEO_DEFAULT_PROFILE
+            renditions: 额外输出的码率阶梯档位（如 ["720p", "480p"]），高于成片分辨率的档位被忽略
+            hls: 同时输出 HLS（场景编码完成即可播放，地址见 hls_url(task_id)）
+            motion: 逐帧渲染动态效果（Ken Burns、文字淡入、转场），不能与 hls 同时使用
 
         Returns:
             视频信息字典
+
+        Raises:
+            ValueError: 未知的编码档位或阶梯档位，或同时指定 motion 和 hls
+            FFmpegCancelledError: 任务被取消
         """
+        # 先完成能力检测，档位的编码器才会换成本机可用的编码器
+        ffmpeg_available = (await self.capabilities.load()).available
+        encoding = get_profile(profile)
+        rungs = ladder_rungs(encoding, renditions or [])
+        if motion and hls:
+            raise ValueError("Motion rendering does not support HLS output")
         try:
-            if self.ffmpeg_available:
+            if ffmpeg_available and motion:
+                return await self._create_motion_video(
+                    task_id,
+                    title,
+                    scenes,
+                    duration,
+                    priority=priority,
+                    audio_path=audio_path,
+                    watermark=watermark,
+                    progress=progress,
+                    encoding=encoding,
+                    rungs=rungs,
+                )
+            if ffmpeg_available:
                 return await self._create_video_with_ffmpeg(
-                    task_id, title, scenes, duration
+                    task_id,
+                    title,
+                    scenes,
+                    duration,
+                    priority=priority,
+                    audio_path=audio_path,
+                    watermark=watermark,
+                    progress=progress,
+                    encoding=encoding,
+                    rungs=rungs,
+                    hls=hls,
                 )
             else:
                 return await self._create_video_fallback(
                     task_id, title, scenes, duration
                 )
+        except FFmpegCancelledError:
+            raise
         except Exception as e:
             logger.error(f"Video creation failed: {e}")
-            return await self._create_video_fallback(task_id, title, scenes, duration)
+            return await self._create_video_fallback(
+                task_id,
+                title,
+                scenes,
+                duration,
+                try_frames=not motion,
+                priority=priority,
+                audio_path=audio_path,
+                watermark=watermark,
+                progress=progress,
+                encoding=encoding,
+                rungs=rungs,
+            )
 
     async def _create_video_with_ffmpeg(
-        self, task_id: str, title: str, scenes: List[Dict[str, Any]], duration: int
+        self,
+        task_id: str,
+        title: str,
+        scenes: List[Dict[str, Any]],
+        duration: int,
+        priority: str = "final",
+        audio_path: Optional[Path] = None,
+        watermark: Optional[str] = None,
+        progress: Optional[VideoProgress] = None,
+        encoding: Optional[EncodingProfile] = None,
+        rungs: Optional[List[str]] = None,
+        hls: bool = False,
     ) -> Dict[str, Any]:
         """
-        使用FFmpeg创建视频
+        使用FFmpeg创建视频（场景图渲染）
+
+        每个场景编码为独立片段（并发执行，已缓存的片段直接复用），
+        前后可加品牌片头片尾，再用一次 FFmpeg 调用完成流复制拼接、旁白混流和缩略图输出；
+        需要码率阶梯时再解码一次成片，同时编码各档位；
+        HLS 模式下每个片段完成后按场景顺序转封装并追加到播放列表
 
         Args:
             task_id: 任务ID
             title: 视频标题
-            scenes: 场景列表
+            scenes: 场景列表（可带 audio_path 指定该场景的旁白音频）
             duration: 视频时长
+            priority: FFmpeg 调度优先级
+            audio_path: 整段旁白音频
+            watermark: 水印文字
+            progress: 进度跟踪
+            encoding: 编码档位
+            rungs: 码率阶梯档位
+            hls: 是否输出 HLS
 
         Returns:
             视频信息字典
         """
         output_path = self.output_dir / f"{task_id}.mp4"
+        encoding = encoding or get_profile()
+        rungs = rungs or []
+        specs, intro_offset = await self._plan_scenes(
+            task_id, title, scenes, duration, watermark, encoding, audio_path
+        )
+
+        total_duration = sum(spec.duration for spec in specs)
+        thumbnail_path = self.output_dir / f"{task_id}_thumb.jpg"
+
+        # 先登记全部作业的媒体时长，百分比的分母从一开始就是完整的
+        progress = progress or VideoProgress()
+        for spec in specs:
+            progress.add_job("render", str(spec.index), spec.duration)
+        progress.add_job("finish", "finish", total_duration)
+        rendition_paths = {name: self.output_dir / f"{task_id}_{name}.mp4" for name in rungs}
+        if rendition_paths:
+            progress.add_job("finish", "ladder", total_duration)
+
+        playlist = None
+        if hls:
+            # 先写出空的播放列表，客户端拿到地址后即可开始轮询
+            playlist = HLSPlaylist(
+                self.hls_dir(task_id) / PLAYLIST_NAME,
+                max(settings.VIDEO_HLS_SEGMENT_SECONDS, encoding.gop_seconds),
+            )
+            playlist.write()
 
-        # 创建临时字幕文件
-        subtitle_path = self.output_dir / f"{task_id}_subtitles.srt"
-        self._create_subtitle_file(subtitle_path, scenes)
-
-        # 使用FFmpeg创建视频
-        # 这里使用简单的slide show效果，每个场景持续相等时间
-        scene_duration = duration / len(scenes) if scenes else 1
-
-        # 构建FFmpeg命令
-        cmd = [
-            settings.FFMPEG_PATH,
-            "-y",  # 覆盖输出文件
-            "-f",
-            "lavfi",
-            "-i",
-            f"color=c=black:s=1280x720:d={scene_duration}",  # 黑色背景
-            "-vf",
-            f"drawtext=text='{title}':fontsize=48:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2",
-            "-c:v",
-            "libx264",
-            "-pix_fmt",
-            "yuv420p",
-            "-r",
-            "30",
-            str(output_path),
-        ]
-
-        # 执行FFmpeg
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            # 拼接完成前，本视频用到的片段不会被缓存淘汰
+            with self.segment_cache.pinned(spec.key() for spec in specs):
+                progress.start("render")
+                tasks = [
+                    asyncio.create_task(self.render_segment(spec, priority, task_id, progress))
+                    for spec in specs
+                ]
+                workers = list(tasks)
+                if playlist is not None:
+                    workers.append(
+                        asyncio.create_task(
+                            self._publish_hls(
+                                task_id, specs, tasks, playlist, audio_path, intro_offset, encoding
+                            )
+                        )
+                    )
+                try:
+                    await asyncio.gather(*workers)
+                except BaseException:
+                    # 任一片段失败时取消其余片段，结束它们的 FFmpeg 进程
+                    for task in workers:
+                        task.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+                    if playlist is not None:
+                        # 结束播放列表，客户端不会一直等待后续分片
+                        playlist.end()
+                    raise
+                segments = [task.result() for task in tasks]
+                progress.complete("render")
+
+                progress.start("finish")
+                list_path = self.output_dir / f"{task_id}_segments.txt"
+                write_concat_list(segments, list_path)
+                cmd = finish_command(
+                    list_path,
+                    output_path,
+                    thumbnail_path,
+                    total_duration,
+                    audio_path=str(audio_path) if audio_path else None,
+                    thumbnail_at=min(intro_offset + 1.0, total_duration / 2),
+                    audio_offset=intro_offset,
+                    profile=encoding,
+                )
+                try:
+                    await self._run_ffmpeg(
+                        cmd,
+                        priority,
+                        task_id,
+                        on_progress=lambda block: progress.update("finish", "finish", block),
+                    )
+                finally:
+                    list_path.unlink(missing_ok=True)
+
+            await self._encode_renditions(
+                task_id, output_path, encoding, rendition_paths, priority, progress
             )
+            progress.complete("finish")
 
-            stdout, stderr = await process.communicate()
+        except FFmpegCancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"FFmpeg execution failed: {e}")
+            return await self._create_video_fallback(
+                task_id,
+                title,
+                scenes,
+                duration,
+                priority=priority,
+                audio_path=audio_path,
+                watermark=watermark,
+                progress=progress,
+                encoding=encoding,
+                rungs=rungs,
+            )
 
-            if process.returncode != 0:
-                logger.error(f"FFmpeg error: {stderr.decode()}")
-                # Fallback to simpler method
-                return await self._create_video_fallback(
-                    task_id, title, scenes, duration
+        if not thumbnail_path.exists():
+            logger.warning(f"Thumbnail generation failed for {output_path}")
+
+        return {
+            "video_url": f"/download/videos/{task_id}.mp4",
+            "thumbnail_url": f"/download/videos/{task_id}_thumb.jpg",
+            "subtitle_url": f"/download/videos/{task_id}_subtitles.srt",
+            **await self._describe_output(output_path, total_duration, encoding),
+            "profile": encoding.name,
+            "format": "mp4",
+            "scenes": len(specs),
+            "renditions": {
+                name: f"/download/videos/{path.name}" for name, path in rendition_paths.items()
+            },
+            "hls_url": self.hls_url(task_id) if playlist is not None else None,
+        }
+
+    async def _plan_scenes(
+        self,
+        task_id: str,
+        title: str,
+        scenes: List[Dict[str, Any]],
+        duration: int,
+        watermark: Optional[str],
+        encoding: EncodingProfile,
+        audio_path: Optional[Path] = None,
+    ) -> Tuple[List[SceneSpec], float]:
+        """
+        生成场景描述（含品牌片头片尾）并写出 SRT 字幕
+
+        有整段旁白时按实测时长拉长场景，画面、混流和字幕都以实际时长为准
+
+        Returns:
+            (场景描述列表, 片头时长)
+        """
+        if watermark is None:
+            watermark = settings.VIDEO_WATERMARK_TEXT
+        specs = build_scene_specs(
+            title, scenes, duration, watermark=watermark, profile=encoding.name
+        )
+        if audio_path:
+            specs = fit_to_narration(specs, await media_probe.duration(audio_path))
+        subtitles = [{"duration": spec.duration, "subtitle": spec.subtitle} for spec in specs]
+
+        # 品牌片头片尾与产品无关，所有视频共用缓存中的同一片段
+        intro_offset = 0.0
+        if settings.VIDEO_INTRO_TEXT:
+            intro = brand_card_spec(
+                settings.VIDEO_INTRO_TEXT, -1, watermark=watermark, profile=encoding.name
+            )
+            specs.insert(0, intro)
+            intro_offset = intro.duration
+        if settings.VIDEO_OUTRO_TEXT:
+            specs.append(
+                brand_card_spec(
+                    settings.VIDEO_OUTRO_TEXT, len(specs), watermark=watermark, profile=encoding.name
                 )
+            )
 
-            # 生成缩略图
-            thumbnail_path = self.output_dir / f"{task_id}_thumb.jpg"
-            await self._generate_thumbnail(output_path, thumbnail_path)
+        # 字幕已绘制在画面上，另外输出 SRT 供播放器使用
+        subtitle_path = self.output_dir / f"{task_id}_subtitles.srt"
+        self._create_subtitle_file(subtitle_path, subtitles, offset=intro_offset)
+        return specs, intro_offset
 
-            return {
-                "video_url": f"/download/videos/{task_id}.mp4",
-                "thumbnail_url": f"/download/videos/{task_id}_thumb.jpg",
-                "duration": duration,
-                "resolution": "720p",
-                "format": "mp4",
-                "size": output_path.stat().st_size if output_path.exists() else 0,
-            }
+    async def _describe_output(
+        self, output_path: Path, planned_duration: float, encoding: EncodingProfile
+    ) -> Dict[str, Any]:
+        """成片的实测时长、分辨率和大小（无法探测时使用计划值）"""
+        info = await media_probe.probe(output_path)
+        return {
+            "duration": info.duration if info and info.duration else planned_duration,
+            "resolution": (info and info.resolution) or "{}x{}".format(*encoding.resolution),
+            "size": output_path.stat().st_size if output_path.exists() else 0,
+            "media": info.to_dict() if info else None,
+        }
+
+    async def _encode_renditions(
+        self,
+        task_id: str,
+        output_path: Path,
+        encoding: EncodingProfile,
+        rendition_paths: Dict[str, Path],
+        priority: str,
+        progress: VideoProgress,
+    ):
+        """从成片一次解码输出码率阶梯的各档位"""
+        if not rendition_paths:
+            return
+        cmd = ladder_command(
+            output_path,
+            encoding,
+            rendition_paths,
+            threads=ffmpeg_scheduler.threads_per_job,
+        )
+        await self._run_ffmpeg(
+            cmd,
+            priority,
+            task_id,
+            on_progress=lambda block: progress.update("finish", "ladder", block),
+        )
+
+    async def _create_motion_video(
+        self,
+        task_id: str,
+        title: str,
+        scenes: List[Dict[str, Any]],
+        duration: int,
+        priority: str = "final",
+        audio_path: Optional[Path] = None,
+        watermark: Optional[str] = None,
+        progress: Optional[VideoProgress] = None,
+        encoding: Optional[EncodingProfile] = None,
+        rungs: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        逐帧渲染带动态效果的视频（Ken Burns、文字淡入、场景交叉淡化）
 
-        except Exception as e:
-            logger.error(f"FFmpeg execution failed: {e}")
-            return await self._create_video_fallback(task_id, title, scenes, duration)
+        画面在线程中用 PIL 生成，经有界队列以原始 RGB 写入 FFmpeg 标准输入，
+        一次 FFmpeg 调用完成编码和旁白混流；缩略图直接取自生成的画面。
+        每一帧都不同，不能复用片段缓存，也不支持 HLS 分段输出
+
+        Returns:
+            视频信息字典
+        """
+        output_path = self.output_dir / f"{task_id}.mp4"
+        thumbnail_path = self.output_dir / f"{task_id}_thumb.jpg"
+        encoding = encoding or get_profile()
+        specs, intro_offset = await self._plan_scenes(
+            task_id, title, scenes, duration, watermark, encoding, audio_path
+        )
+        total_duration = sum(spec.duration for spec in specs)
+
+        progress = progress or VideoProgress()
+        progress.add_job("render", "frames", total_duration)
+        rendition_paths = {name: self.output_dir / f"{task_id}_{name}.mp4" for name in rungs or []}
+        if rendition_paths:
+            progress.add_job("finish", "ladder", total_duration)
+
+        thumbnail_frame = round(min(intro_offset + 1.0, total_duration / 2) * encoding.fps)
+
+        def save_thumbnail(number: int, image):
+            if number == thumbnail_frame:
+                thumb = image.copy()
+                thumb.thumbnail((320, 320))
+                thumb.save(thumbnail_path, "JPEG", quality=85)
+
+        frames = timeline_frames(specs, encoding.fps, on_frame=save_thumbnail)
+        cmd = frame_pipe_command(
+            encoding.resolution,
+            encoding.fps,
+            total_duration,
+            output_path,
+            audio_path=str(audio_path) if audio_path else None,
+            audio_offset=intro_offset,
+            profile=encoding,
+            threads=ffmpeg_scheduler.threads_per_job,
+        )
+
+        progress.start("render")
+        try:
+            await self._run_ffmpeg(
+                cmd,
+                priority,
+                task_id,
+                on_progress=lambda block: progress.update("render", "frames", block),
+                stdin=stream_frames(frames),
+            )
+        except BaseException:
+            # 不留下编码到一半的文件
+            output_path.unlink(missing_ok=True)
+            raise
+        progress.complete("render")
+
+        progress.start("finish")
+        await self._encode_renditions(
+            task_id, output_path, encoding, rendition_paths, priority, progress
+        )
+        progress.complete("finish")
+
+        return {
+            "video_url": f"/download/videos/{task_id}.mp4",
+            "thumbnail_url": f"/download/videos/{task_id}_thumb.jpg",
+            "subtitle_url": f"/download/videos/{task_id}_subtitles.srt",
+            **await self._describe_output(output_path, total_duration, encoding),
+            "profile": encoding.name,
+            "format": "mp4",
+            "scenes": len(specs),
+            "renditions": {
+                name: f"/download/videos/{path.name}" for name, path in rendition_paths.items()
+            },
+            "hls_url": None,
+        }
+
+    def hls_dir(self, task_id: str) -> Path:
+        """任务的 HLS 输出目录"""
+        return self.output_dir / "hls" / task_id
+
+    def hls_url(self, task_id: str) -> str:
+        """任务的 HLS 播放列表地址"""
+        return f"/download/videos/hls/{task_id}/{PLAYLIST_NAME}"
+
+    async def _publish_hls(
+        self,
+        task_id: str,
+        specs: List[SceneSpec],
+        tasks: List["asyncio.Task[Path]"],
+        playlist: HLSPlaylist,
+        audio_path: Optional[Path],
+        intro_offset: float,
+        encoding: EncodingProfile,
+    ):
+        """
+        按场景顺序发布 HLS 分片
+
+        后面的场景可能先编码完成，但只有前面的场景都已发布后才追加到播放列表；
+        转封装只复制视频流，以预览优先级排队，尽快让客户端看到画面
+        """
+        hls_dir = playlist.path.parent
+        start = 0.0
+        for index, (spec, task) in enumerate(zip(specs, tasks)):
+            segment_path = await task
+            prefix = f"s{index:03d}"
+            # 片头期间没有旁白，片段自带的静音轨直接复制
+            narration = audio_path if audio_path and start >= intro_offset else None
+            cmd = scene_hls_command(
+                segment_path,
+                hls_dir,
+                prefix,
+                spec.duration,
+                audio_path=str(narration) if narration else None,
+                audio_start=start - intro_offset,
+                profile=encoding,
+            )
+            await self._run_ffmpeg(cmd, "preview", task_id)
+
+            scene_playlist = hls_dir / f"{prefix}.m3u8"
+            playlist.append_scene(read_scene_entries(scene_playlist))
+            scene_playlist.unlink(missing_ok=True)
+            start += spec.duration
+
+        playlist.end()
+
+    async def render_segment(
+        self,
+        spec: SceneSpec,
+        priority: str = "final",
+        tag: Optional[str] = None,
+        progress: Optional[VideoProgress] = None,
+    ) -> Path:
+        """
+        渲染单个场景片段
+
+        片段通过片段缓存按内容哈希复用；同一片段的并发请求只编码一次
+        """
+        job = str(spec.index)
+        on_progress = None
+        if progress:
+            on_progress = lambda block: progress.update("render", job, block)
+
+        segment_path, _ = await self.segment_cache.get_or_encode(
+            spec.key(),
+            lambda tmp_path: self._encode_segment(spec, tmp_path, priority, tag, on_progress),
+        )
+        if progress:
+            progress.complete_job("render", job)
+        return segment_path
+
+    async def _encode_segment(
+        self,
+        spec: SceneSpec,
+        output_path: Path,
+        priority: str,
+        tag: Optional[str],
+        on_progress: Optional[ProgressCallback] = None,
+    ):
+        """编码片段到 output_path（片段缓存提供的临时路径）"""
+        card_path = output_path.with_suffix(".png")
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, render_scene_card, spec, card_path)
+        try:
+            cmd = segment_command(
+                spec, card_path, output_path, threads=ffmpeg_scheduler.threads_per_job
+            )
+            await self._run_ffmpeg(cmd, priority, tag, on_progress=on_progress)
+        finally:
+            card_path.unlink(missing_ok=True)
+
+    async def _run_ffmpeg(
+        self,
+        cmd: List[str],
+        priority: str = "final",
+        tag: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        stdin: Optional[AsyncIterable[bytes]] = None,
+    ) -> bytes:
+        """通过全局调度器执行 FFmpeg 命令，失败时抛出 FFmpegError"""
+        return await ffmpeg_scheduler.run(
+            cmd, priority=priority, tag=tag, on_progress=on_progress, stdin=stdin
+        )
+
+    def cancel(self, task_id: str) -> int:
+        """取消视频任务的所有 FFmpeg 进程（排队中、运行中和之后提交的）"""
+        return ffmpeg_scheduler.cancel(task_id)
+
+    def finish(self, task_id: str):
+        """视频任务结束（清除取消标记）"""
+        ffmpeg_scheduler.finish(task_id)
 
     async def _create_video_fallback(
-        self, task_id: str, title: str, scenes: List[Dict[str, Any]], duration: int
+        self,
+        task_id: str,
+        title: str,
+        scenes: List[Dict[str, Any]],
+        duration: int,
+        try_frames: bool = True,
+        priority: str = "final",
+        audio_path: Optional[Path] = None,
+        watermark: Optional[str] = None,
+        progress: Optional[VideoProgress] = None,
+        encoding: Optional[EncodingProfile] = None,
+        rungs: Optional[List[str]] = None,
     ) -> Dict[str, Any]:
         """
-        Fallback方法：创建模拟视频（实际为静态图片）
-
-        在没有FFmpeg或FFmpeg失败时使用
+        Fallback方法：场景片段流程失败时改用逐帧渲染（沿用原任务的旁白、水印、
+        编码档位、优先级和进度）；FFmpeg 不可用时创建模拟视频（实际为静态图片）
 
         Args:
             task_id: 任务ID
             title: 视频标题
             scenes: 场景列表
             duration: 视频时长
+            try_frames: 是否先尝试逐帧渲染
+            priority: FFmpeg 调度优先级
+            audio_path: 整段旁白音频
+            watermark: 水印文字
+            progress: 进度跟踪（重新开始计算）
+            encoding: 编码档位
+            rungs: 码率阶梯档位
 
         Returns:
             视频信息字典
         """
+        if (await self.capabilities.load()).available and try_frames:
+            try:
+                if progress is not None:
+                    progress.reset("render", "finish")
+                return await self._create_motion_video(
+                    task_id,
+                    title,
+                    scenes,
+                    duration,
+                    priority=priority,
+                    audio_path=audio_path,
+                    watermark=watermark,
+                    progress=progress,
+                    encoding=encoding,
+                    rungs=rungs,
+                )
+            except FFmpegCancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Frame rendering fallback failed: {e}")
+
         try:
             from PIL import Image, ImageDraw, ImageFont
         except ImportError:
@@ -250,16 +745,19 @@ class VideoComposer:
                 "note": "Fallback mode: Creation failed",
             }
 
-    def _create_subtitle_file(self, subtitle_path: Path, scenes: List[Dict[str, Any]]):
+    def _create_subtitle_file(
+        self, subtitle_path: Path, scenes: List[Dict[str, Any]], offset: float = 0.0
+    ):
         """
         创建SRT字幕文件
 
         Args:
             subtitle_path: 字幕文件路径
             scenes: 场景列表
+            offset: 第一条字幕的开始时间（片头时长）
         """
         with open(subtitle_path, "w", encoding="utf-8") as f:
-            start_time = 0
+            start_time = offset
             for i, scene in enumerate(scenes):
                 duration = scene.get("duration", 5)
                 end_time = start_time + duration
@@ -293,7 +791,12 @@ class VideoComposer:
         return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
 
     async def _generate_thumbnail(
-        self, video_path: Path, thumbnail_path: Path, timestamp: float = 1.0
+        self,
+        video_path: Path,
+        thumbnail_path: Path,
+        timestamp: float = 1.0,
+        priority: str = "final",
+        tag: Optional[str] = None,
     ):
         """
         从视频中提取缩略图
@@ -318,15 +821,13 @@ class VideoComposer:
                 str(thumbnail_path),
             ]
 
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-
-            await process.communicate()
+            await self._run_ffmpeg(cmd, priority, tag)
 
             if not thumbnail_path.exists():
                 logger.warning(f"Thumbnail generation failed for {video_path}")
 
+        except FFmpegCancelledError:
+            raise
         except Exception as e:
             logger.error(f"Thumbnail generation error: {e}")
 
@@ -344,7 +845,7 @@ class VideoComposer:
         Returns:
             是否成功
         """
-        if not self.ffmpeg_available:
+        if not (await self.capabilities.load()).available:
             logger.warning("FFmpeg not available, cannot combine audio and video")
             return False
 
@@ -359,19 +860,16 @@ class VideoComposer:
                 "-c:v",
                 "copy",
                 "-c:a",
-                "aac",
+                get_profile().audio_codec,
                 "-shortest",
                 str(output_path),
             ]
 
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-
-            await process.communicate()
-
-            return process.returncode == 0
+            await self._run_ffmpeg(cmd)
+            return True
 
+        except FFmpegCancelledError:
+            raise
         except Exception as e:
             logger.error(f"Audio-video combination failed: {e}")
             return False
@@ -390,9 +888,13 @@ class VideoComposer:
         Returns:
             是否成功
         """
-        if not self.ffmpeg_available:
+        capabilities = await self.capabilities.load()
+        if not capabilities.available:
             logger.warning("FFmpeg not available, cannot add watermark")
             return False
+        if not capabilities.has_filter("drawtext"):
+            logger.warning("FFmpeg built without drawtext, cannot add watermark")
+            return False
 
         try:
             cmd = [
@@ -407,14 +909,11 @@ class VideoComposer:
                 str(output_path),
             ]
 
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-
-            await process.communicate()
-
-            return process.returncode == 0
+            await self._run_ffmpeg(cmd)
+            return True
 
+        except FFmpegCancelledError:
+            raise
         except Exception as e:
             logger.error(f"Watermark addition failed: {e}")
             return False
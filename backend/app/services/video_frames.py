@@ -0,0 +1,231 @@
+"""
+逐帧视频渲染
+用 PIL 逐帧生成画面（背景 Ken Burns 推拉平移、文字淡入、场景交叉淡化），
+以原始 RGB 数据经有界队列写入 FFmpeg 标准输入，不落地任何中间图片
+"""
+
+import asyncio
+import threading
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from app.core.config import settings
+from app.services.video_profiles import EncodingProfile, get_profile
+from app.services.video_scenes import AUDIO_SAMPLE_RATE, SceneSpec, scene_layers
+
+# Ken Burns 缩放幅度（场景结束时画面放大到 1 + KEN_BURNS_ZOOM 倍）
+KEN_BURNS_ZOOM = 0.08
+# 文字淡入时长（秒）和上移距离（720p 下的像素）
+TEXT_FADE_SECONDS = 0.6
+TEXT_RISE = 16
+
+# 平移方向：(x, y)，按场景序号轮换
+_PAN_DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+_DONE = object()
+
+
+def _ease(x: float) -> float:
+    """缓动曲线（ease-in-out），x 限制在 0-1"""
+    x = min(1.0, max(0.0, x))
+    return x * x * (3 - 2 * x)
+
+
+class SceneAnimator:
+    """单个场景的逐帧画面（图层只绘制一次，每帧只做裁剪缩放和合成）"""
+
+    def __init__(self, spec: SceneSpec, index: int):
+        self.spec = spec
+        self.size = spec.resolution
+        self.background, overlay = scene_layers(spec)
+        self.overlay = overlay
+        self.zoom_in = index % 2 == 0
+        self.pan = _PAN_DIRECTIONS[index % len(_PAN_DIRECTIONS)]
+        self.rise = round(TEXT_RISE * min(self.size) / 720)
+        self._alpha = overlay.getchannel("A")
+
+    def _background_at(self, progress: float) -> Image.Image:
+        """Ken Burns：按进度缩放并向 pan 方向平移的背景"""
+        width, height = self.size
+        amount = _ease(progress) if self.zoom_in else 1 - _ease(progress)
+        zoom = 1 + KEN_BURNS_ZOOM * amount
+        crop_w, crop_h = width / zoom, height / zoom
+        # 可平移的余量，按进度从中心移到 pan 方向的边缘
+        dx = (width - crop_w) / 2 * self.pan[0] * amount
+        dy = (height - crop_h) / 2 * self.pan[1] * amount
+        left = (width - crop_w) / 2 + dx
+        top = (height - crop_h) / 2 + dy
+        return self.background.transform(
+            self.size,
+            Image.Transform.EXTENT,
+            (left, top, left + crop_w, top + crop_h),
+            Image.Resampling.BILINEAR,
+        )
+
+    def frame(self, t: float) -> Image.Image:
+        """场景内 t 秒处的画面（t 可以略超出场景时长，用于交叉淡化）"""
+        progress = t / self.spec.duration if self.spec.duration else 1.0
+        image = self._background_at(progress)
+
+        fade = _ease(t / TEXT_FADE_SECONDS) if TEXT_FADE_SECONDS else 1.0
+        if fade >= 1:
+            image.paste(self.overlay, (0, 0), self.overlay)
+        elif fade > 0:
+            mask = self._alpha.point(lambda a: int(a * fade))
+            image.paste(self.overlay, (0, round(self.rise * (1 - fade))), mask)
+        return image
+
+
+def timeline_frames(
+    specs: List[SceneSpec],
+    fps: int,
+    transition: Optional[float] = None,
+    on_frame: Optional[Callable[[int, Image.Image], None]] = None,
+) -> Iterator[Image.Image]:
+    """
+    整段视频的逐帧画面
+
+    相邻场景在分界点前后各 transition / 2 秒内交叉淡化，总时长不变；
+    同一时间最多保留相邻两个场景的图层
+    """
+    transition = settings.VIDEO_TRANSITION_SECONDS if transition is None else transition
+    half = transition / 2
+
+    starts = []
+    position = 0.0
+    for spec in specs:
+        starts.append(position)
+        position += spec.duration
+    total_frames = round(position * fps)
+
+    animators: Dict[int, SceneAnimator] = {}
+
+    def animator(index: int) -> SceneAnimator:
+        if index not in animators:
+            for old in [key for key in animators if key < index - 1]:
+                del animators[old]
+            animators[index] = SceneAnimator(specs[index], index)
+        return animators[index]
+
+    index = 0
+    for number in range(total_frames):
+        t = number / fps
+        while index + 1 < len(specs) and t >= starts[index + 1]:
+            index += 1
+        local = t - starts[index]
+        image = animator(index).frame(local)
+
+        # 分界点附近与相邻场景交叉淡化（混合比例在分界点处为 0.5）
+        remaining = specs[index].duration - local
+        if half > 0 and index + 1 < len(specs) and remaining < half:
+            other = animator(index + 1).frame(0.0)
+            image = Image.blend(image, other, 0.5 * (1 - remaining / half))
+        elif half > 0 and index > 0 and local < half:
+            other = animator(index - 1).frame(specs[index - 1].duration + local)
+            image = Image.blend(other, image, 0.5 + 0.5 * local / half)
+
+        if on_frame is not None:
+            on_frame(number, image)
+        yield image
+
+
+async def stream_frames(
+    frames: Iterator[Image.Image], queue_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    在线程中生成画面，经有界队列产出原始 RGB 数据
+
+    队列满时生成线程阻塞（编码跟不上时不会无限占用内存）；
+    消费方提前停止时通知生成线程退出
+    """
+    queue_size = queue_size or settings.VIDEO_FRAME_QUEUE_SIZE
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item):
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    def produce():
+        try:
+            for frame in frames:
+                if stop.is_set():
+                    return
+                put(frame.convert("RGB").tobytes())
+            put(_DONE)
+        except Exception as e:
+            if not stop.is_set():
+                put(e)
+
+    producer = loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # 取走队列中的数据，让阻塞在 put 上的生成线程继续并退出
+        while not producer.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.sleep(0.01)
+
+
+def frame_pipe_command(
+    size: Tuple[int, int],
+    fps: int,
+    duration: float,
+    output_path: Path,
+    audio_path: Optional[str] = None,
+    audio_offset: float = 0.0,
+    profile: Optional[EncodingProfile] = None,
+    threads: Optional[int] = None,
+) -> List[str]:
+    """从标准输入读取原始 RGB 帧并编码的 FFmpeg 命令（旁白可选，否则为静音轨）"""
+    profile = profile or get_profile()
+    width, height = size
+    cmd = [
+        settings.FFMPEG_PATH,
+        "-y",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgb24",
+        "-s",
+        f"{width}x{height}",
+        "-r",
+        str(fps),
+        "-i",
+        "pipe:0",
+    ]
+    audio_filter = f"apad=whole_dur={duration:.3f}"
+    if audio_path:
+        cmd += ["-i", str(audio_path)]
+        if audio_offset > 0:
+            audio_filter = f"adelay=delays={round(audio_offset * 1000)}:all=1,{audio_filter}"
+    else:
+        cmd += ["-f", "lavfi", "-i", f"anullsrc=r={AUDIO_SAMPLE_RATE}:cl=stereo"]
+
+    cmd += [
+        "-map",
+        "0:v",
+        "-map",
+        "1:a",
+        "-af",
+        audio_filter,
+        "-t",
+        f"{duration:.3f}",
+        *profile.video_args(still=False),
+        *profile.audio_args(),
+        *profile.thread_args(threads),
+        "-movflags",
+        "+faststart",
+        str(output_path),
+    ]
+    return cmd
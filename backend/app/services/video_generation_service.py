@@ -3,12 +3,12 @@
 支持 Replicate、Runway ML 等视频生成 API
 """
 
-import httpx
 import asyncio
 from typing import Optional, List, Dict, Any
 from pathlib import Path
 from enum import Enum
 from app.core.config import settings
+from app.core.http_clients import http_clients, status_error
 from app.core.logging import logger
 
 
@@ -79,47 +79,47 @@ class ReplicateService(VideoGenerationService):
         input_data: Dict[str, Any]
     ) -> Dict[str, Any]:
         """创建预测任务"""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.API_BASE}/predictions",
-                headers={
-                    "Authorization": f"Token {self.api_token}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "version": model_version,
-                    "input": input_data
-                },
-                timeout=30.0
-            )
-            
-            if response.status_code not in [200, 201]:
-                error_msg = f"Replicate API error: {response.status_code}"
-                try:
-                    error_data = response.json()
-                    error_msg += f" - {error_data}"
-                except:
-                    pass
-                raise Exception(error_msg)
-            
-            return response.json()
-    
+        client = http_clients.get("replicate")
+        response = await client.post(
+            f"{self.API_BASE}/predictions",
+            headers={
+                "Authorization": f"Token {self.api_token}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "version": model_version,
+                "input": input_data
+            },
+            timeout=http_clients.timeout("replicate", 30.0)
+        )
+        
+        if response.status_code not in [200, 201]:
+            error_msg = f"Replicate API error: {response.status_code}"
+            try:
+                error_data = response.json()
+                error_msg += f" - {error_data}"
+            except:
+                pass
+            raise status_error(error_msg, response)
+        
+        return response.json()
+
     async def get_prediction(self, prediction_id: str) -> Dict[str, Any]:
         """获取预测任务状态"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.API_BASE}/predictions/{prediction_id}",
-                headers={
-                    "Authorization": f"Token {self.api_token}"
-                },
-                timeout=30.0
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Failed to get prediction: {response.status_code}")
-            
-            return response.json()
-    
+        client = http_clients.get("replicate")
+        response = await client.get(
+            f"{self.API_BASE}/predictions/{prediction_id}",
+            headers={
+                "Authorization": f"Token {self.api_token}"
+            },
+            timeout=http_clients.timeout("replicate", 30.0)
+        )
+        
+        if response.status_code != 200:
+            raise status_error(f"Failed to get prediction: {response.status_code}", response)
+        
+        return response.json()
+
     async def wait_for_completion(
         self,
         prediction_id: str,
@@ -286,32 +286,32 @@ class RunwayMLService(VideoGenerationService):
         # Runway API 调用示例
         # 注意：具体实现需要根据 Runway 实际 API 文档调整
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.API_BASE}/text_to_video",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "prompt": prompt,
-                    "duration": min(duration, 16),  # Runway通常限制16秒
-                    "resolution": resolution
-                },
-                timeout=30.0
-            )
-            
-            if response.status_code not in [200, 201, 202]:
-                error_msg = f"Runway API error: {response.status_code}"
-                raise Exception(error_msg)
-            
-            data = response.json()
-            return {
-                "task_id": data.get("id"),
-                "status": "processing",
-                "provider": "runway"
-            }
-    
+        client = http_clients.get("runway")
+        response = await client.post(
+            f"{self.API_BASE}/text_to_video",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "prompt": prompt,
+                "duration": min(duration, 16),  # Runway通常限制16秒
+                "resolution": resolution
+            },
+            timeout=http_clients.timeout("runway", 30.0)
+        )
+        
+        if response.status_code not in [200, 201, 202]:
+            error_msg = f"Runway API error: {response.status_code}"
+            raise status_error(error_msg, response)
+        
+        data = response.json()
+        return {
+            "task_id": data.get("id"),
+            "status": "processing",
+            "provider": "runway"
+        }
+
     async def image_to_video(
         self,
         image_data: bytes,
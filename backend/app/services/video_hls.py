@@ -0,0 +1,151 @@
+"""
+HLS 分段输出
+场景片段编码完成后按顺序转封装为 fMP4 分片（视频流复制），追加到一个不断增长的
+EVENT 播放列表中，客户端在整段视频编码完成前即可开始播放
+"""
+
+import os
+from pathlib import Path
+from typing import List, Optional
+
+from app.core.config import settings
+from app.services.video_profiles import EncodingProfile, get_profile
+
+PLAYLIST_NAME = "index.m3u8"
+
+# 场景播放列表中需要原样搬到总播放列表的标签
+_SEGMENT_TAGS = ("#EXT-X-MAP", "#EXTINF", "#EXT-X-BYTERANGE")
+
+
+def scene_hls_command(
+    segment_path: Path,
+    hls_dir: Path,
+    prefix: str,
+    duration: float,
+    audio_path: Optional[str] = None,
+    audio_start: float = 0.0,
+    profile: Optional[EncodingProfile] = None,
+    segment_seconds: Optional[float] = None,
+    byte_ranges: Optional[bool] = None,
+) -> List[str]:
+    """
+    把一个场景片段转封装为 fMP4 HLS 分片
+
+    - 视频流复制，不重新编码
+    - 有整段旁白时截取该场景对应的一段替换静音轨（只编码音频）
+    - byte_ranges 为 True 时每个场景只写一个文件，播放列表用 EXT-X-BYTERANGE 引用
+    """
+    segment_seconds = segment_seconds or settings.VIDEO_HLS_SEGMENT_SECONDS
+    if byte_ranges is None:
+        byte_ranges = settings.VIDEO_HLS_BYTE_RANGES
+
+    cmd = [settings.FFMPEG_PATH, "-y", "-i", str(segment_path)]
+    if audio_path:
+        cmd += ["-ss", f"{audio_start:.3f}", "-t", f"{duration:.3f}", "-i", str(audio_path)]
+        cmd += [
+            "-map",
+            "0:v",
+            "-map",
+            "1:a",
+            "-af",
+            f"apad=whole_dur={duration:.3f}",
+            *(profile or get_profile()).audio_args(),
+        ]
+    else:
+        cmd += ["-map", "0:v", "-map", "0:a", "-c:a", "copy"]
+
+    cmd += [
+        "-c:v",
+        "copy",
+        "-t",
+        f"{duration:.3f}",
+        "-f",
+        "hls",
+        "-hls_time",
+        f"{segment_seconds:g}",
+        "-hls_segment_type",
+        "fmp4",
+        "-hls_playlist_type",
+        "vod",
+    ]
+    if byte_ranges:
+        cmd += [
+            "-hls_flags",
+            "single_file",
+            "-hls_segment_filename",
+            str(hls_dir / f"{prefix}.m4s"),
+        ]
+    else:
+        cmd += [
+            "-hls_fmp4_init_filename",
+            f"{prefix}_init.mp4",
+            "-hls_segment_filename",
+            str(hls_dir / f"{prefix}_%03d.m4s"),
+        ]
+    cmd.append(str(hls_dir / f"{prefix}.m3u8"))
+    return cmd
+
+
+def read_scene_entries(playlist_path: Path) -> List[str]:
+    """读取场景播放列表中的分片条目（EXT-X-MAP / EXTINF / BYTERANGE 及分片地址）"""
+    entries = []
+    for line in playlist_path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(_SEGMENT_TAGS) or not line.startswith("#"):
+            entries.append(line)
+    return entries
+
+
+class HLSPlaylist:
+    """
+    不断增长的 EVENT 播放列表
+
+    每个场景以 EXT-X-DISCONTINUITY 分隔（时间戳从零开始，且各场景有自己的初始化分片）；
+    每次更新都先写临时文件再替换，客户端不会读到写了一半的播放列表
+    """
+
+    def __init__(self, path: Path, target_duration: float):
+        self.path = path
+        self.target_duration = max(1, int(target_duration + 0.999))
+        self._scenes: List[List[str]] = []
+        self._ended = False
+
+    def _render(self) -> str:
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:7",
+            f"#EXT-X-TARGETDURATION:{self.target_duration}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+            "#EXT-X-INDEPENDENT-SEGMENTS",
+        ]
+        for index, entries in enumerate(self._scenes):
+            if index:
+                lines.append("#EXT-X-DISCONTINUITY")
+            lines += entries
+        if self._ended:
+            lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """写出当前播放列表"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        tmp_path.write_text(self._render(), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def append_scene(self, entries: List[str]):
+        """追加一个场景的分片"""
+        self._scenes.append(entries)
+        self.write()
+
+    def end(self):
+        """全部场景已追加，写入 EXT-X-ENDLIST"""
+        self._ended = True
+        self.write()
+
+    @property
+    def scene_count(self) -> int:
+        return len(self._scenes)
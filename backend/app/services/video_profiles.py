@@ -0,0 +1,246 @@
+"""
+视频编码配置
+命名的编码档位（快速预览、各平台成片、存档），统一 preset、CRF、GOP 和线程数，
+以及从一次解码同时输出多个分辨率的码率阶梯
+"""
+
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.ffmpeg_capabilities import ffmpeg_capabilities
+
+# 片段统一的音频参数（concat demuxer 流复制要求所有片段参数一致）
+AUDIO_SAMPLE_RATE = 44100
+AUDIO_CHANNELS = 2
+
+
+@dataclass(frozen=True)
+class EncodingProfile:
+    """
+    编码档位
+
+    画面是静态场景卡片，x264 的主要开销在分辨率和 preset 上；
+    GOP 固定为 gop_seconds 秒，便于平台转码和拖动定位；
+    编码器由 get_profile() 按本机 FFmpeg 的实际能力替换
+    """
+
+    name: str
+    resolution: Tuple[int, int]
+    fps: int
+    preset: str
+    crf: int
+    gop_seconds: float = 2.0
+    maxrate: Optional[str] = None
+    bufsize: Optional[str] = None
+    audio_bitrate: str = "128k"
+    threads: Optional[int] = None  # None 表示使用 FFMPEG_THREADS_PER_JOB
+    video_codec: str = "libx264"
+    audio_codec: str = "aac"
+
+    def _quality_args(self, still: bool) -> List[str]:
+        """编码器相关的质量参数（preset / CRF 只对 x264 有效）"""
+        if self.video_codec == "libx264":
+            args = ["-preset", self.preset, "-crf", str(self.crf)]
+            if still:
+                args += ["-tune", "stillimage"]
+            return args
+        if self.video_codec == "libopenh264":
+            # OpenH264 没有 CRF，按码率控制
+            return ["-b:v", self.maxrate or "4M"]
+        # MPEG-4 Part 2：按 CRF 折算固定量化参数
+        return ["-q:v", str(min(31, max(2, round(self.crf / 7))))]
+
+    def video_args(self, still: bool = True) -> List[str]:
+        """视频编码参数（still 为 False 时不使用静态画面调优，用于带运动效果的画面）"""
+        gop = max(1, round(self.fps * self.gop_seconds))
+        args = ["-c:v", self.video_codec, *self._quality_args(still)]
+        args += [
+            "-pix_fmt",
+            "yuv420p",
+            "-g",
+            str(gop),
+            "-keyint_min",
+            str(gop),
+            "-sc_threshold",
+            "0",
+        ]
+        if self.maxrate:
+            args += ["-maxrate", self.maxrate, "-bufsize", self.bufsize or self.maxrate]
+        return args
+
+    def audio_args(self) -> List[str]:
+        """音频编码参数"""
+        return [
+            "-c:a",
+            self.audio_codec,
+            "-b:a",
+            self.audio_bitrate,
+            "-ar",
+            str(AUDIO_SAMPLE_RATE),
+            "-ac",
+            str(AUDIO_CHANNELS),
+        ]
+
+    def thread_args(self, default: Optional[int] = None) -> List[str]:
+        """编码线程数（调度器按每任务线程数计算并发，两者保持一致）"""
+        threads = self.threads or default or settings.FFMPEG_THREADS_PER_JOB
+        return ["-threads", str(threads)]
+
+
+PROFILES: Dict[str, EncodingProfile] = {
+    # 快速预览：低分辨率、低帧率、最快 preset，用于确认脚本和画面
+    "preview": EncodingProfile(
+        name="preview",
+        resolution=(854, 480),
+        fps=15,
+        preset="ultrafast",
+        crf=30,
+        audio_bitrate="64k",
+        threads=1,
+    ),
+    # 抖音：竖屏 9:16
+    "douyin": EncodingProfile(
+        name="douyin",
+        resolution=(1080, 1920),
+        fps=30,
+        preset="veryfast",
+        crf=23,
+        maxrate="6M",
+        bufsize="12M",
+    ),
+    # 小红书：竖屏 3:4
+    "xiaohongshu": EncodingProfile(
+        name="xiaohongshu",
+        resolution=(1080, 1440),
+        fps=30,
+        preset="veryfast",
+        crf=23,
+        maxrate="5M",
+        bufsize="10M",
+    ),
+    "bilibili": EncodingProfile(
+        name="bilibili",
+        resolution=(1920, 1080),
+        fps=30,
+        preset="veryfast",
+        crf=21,
+        maxrate="6M",
+        bufsize="12M",
+        audio_bitrate="192k",
+    ),
+    "youtube": EncodingProfile(
+        name="youtube",
+        resolution=(1920, 1080),
+        fps=30,
+        preset="veryfast",
+        crf=21,
+        maxrate="8M",
+        bufsize="16M",
+        audio_bitrate="192k",
+    ),
+    # 存档：高质量、慢 preset，不限码率
+    "archival": EncodingProfile(
+        name="archival",
+        resolution=(1920, 1080),
+        fps=30,
+        preset="slow",
+        crf=16,
+        audio_bitrate="256k",
+    ),
+}
+
+# 码率阶梯：短边像素 -> (maxrate, bufsize)
+LADDER_RUNGS: Dict[str, Tuple[int, str, str]] = {
+    "1080p": (1080, "5M", "10M"),
+    "720p": (720, "2800k", "5600k"),
+    "480p": (480, "1200k", "2400k"),
+    "360p": (360, "700k", "1400k"),
+}
+
+
+def get_profile(name: Optional[str] = None) -> EncodingProfile:
+    """
+    按名称获取编码档位，未指定时使用 VIDEO_DEFAULT_PROFILE
+
+    FFmpeg 能力检测完成后，编码器换成本机可用的编码器（检测前返回默认的 libx264 / aac）
+
+    Raises:
+        ValueError: 未知档位
+    """
+    name = name or settings.VIDEO_DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown encoding profile '{name}', expected one of {sorted(PROFILES)}")
+    return ffmpeg_capabilities.adapt(PROFILES[name])
+
+
+def profile_for(quality: str = "final", platform: Optional[str] = None) -> EncodingProfile:
+    """
+    按质量和目标平台选择档位
+
+    preview / archival 直接对应同名档位；final 使用平台档位，未知平台使用默认档位
+    """
+    if quality in ("preview", "archival"):
+        return get_profile(quality)
+    if quality != "final":
+        raise ValueError(f"Unknown quality '{quality}', expected preview, final or archival")
+    return get_profile(platform) if platform in PROFILES else get_profile()
+
+
+def rung_size(resolution: Tuple[int, int], short_side: int) -> Tuple[int, int]:
+    """按短边缩放，保持宽高比，宽高取偶数"""
+    width, height = resolution
+    scale = short_side / min(width, height)
+    return (round(width * scale / 2) * 2, round(height * scale / 2) * 2)
+
+
+def ladder_command(
+    source: Path,
+    profile: EncodingProfile,
+    outputs: Dict[str, Path],
+    threads: Optional[int] = None,
+) -> List[str]:
+    """
+    码率阶梯命令：解码一次，split 后按各档分辨率缩放并分别编码
+
+    音频直接复制；outputs 为 档位名称 -> 输出路径，档位必须在 LADDER_RUNGS 中
+    """
+    rungs = [(name, LADDER_RUNGS[name], path) for name, path in outputs.items()]
+    labels = "".join(f"[s{i}]" for i in range(len(rungs)))
+    graph = [f"[0:v]split={len(rungs)}{labels}"]
+    for i, (_, (short_side, _, _), _) in enumerate(rungs):
+        width, height = rung_size(profile.resolution, short_side)
+        graph.append(f"[s{i}]scale={width}:{height}[v{i}]")
+
+    cmd = [settings.FFMPEG_PATH, "-y", "-i", str(source), "-filter_complex", ";".join(graph)]
+    for i, (_, (_, maxrate, bufsize), path) in enumerate(rungs):
+        rung_profile = replace(profile, maxrate=maxrate, bufsize=bufsize)
+        cmd += [
+            "-map",
+            f"[v{i}]",
+            "-map",
+            "0:a?",
+            *rung_profile.video_args(),
+            "-c:a",
+            "copy",
+            *rung_profile.thread_args(threads),
+            "-movflags",
+            "+faststart",
+            str(path),
+        ]
+    return cmd
+
+
+def ladder_rungs(profile: EncodingProfile, names: List[str]) -> List[str]:
+    """
+    过滤码率阶梯档位：去掉未知档位和高于成片分辨率的档位（不放大）
+
+    Raises:
+        ValueError: 未知档位
+    """
+    unknown = [name for name in names if name not in LADDER_RUNGS]
+    if unknown:
+        raise ValueError(f"Unknown renditions {unknown}, expected some of {sorted(LADDER_RUNGS)}")
+    short_side = min(profile.resolution)
+    return [name for name in dict.fromkeys(names) if LADDER_RUNGS[name][0] <= short_side]
@@ -0,0 +1,328 @@
+"""
+视频场景图
+脚本中的每个场景是一个独立片段（背景、字幕、旁白），片段按内容哈希命名，
+各片段并发编码后用 concat demuxer 无重编码拼接；修改某个场景只需重新编码该片段
+"""
+
+import hashlib
+import json
+import math
+import os
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from app.core.config import settings
+from app.services.poster_fonts import font_manager
+from app.services.poster_gradient import gradient_engine, hex_to_rgb
+from app.services.poster_renderer import PosterRenderer
+from app.services.video_profiles import (
+    AUDIO_SAMPLE_RATE,
+    EncodingProfile,
+    get_profile,
+)
+
+# 场景图的格式变化时递增，使已编码的片段全部失效
+SCENE_GRAPH_VERSION = 3
+
+RESOLUTIONS: Dict[str, Tuple[int, int]] = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+
+# 场景背景轮流使用海报模板的配色
+SCENE_BACKGROUNDS: List[Tuple[str, ...]] = [
+    tuple(colors)
+    for scheme in PosterRenderer.COLOR_SCHEMES.values()
+    for colors in scheme["bg_colors"]
+]
+
+
+@dataclass(frozen=True)
+class SceneSpec:
+    """单个场景片段的完整描述（决定片段内容的所有输入）"""
+
+    index: int
+    duration: float
+    title: str
+    subtitle: str
+    background: Tuple[str, ...]
+    resolution: Tuple[int, int] = (1280, 720)
+    fps: int = 30
+    audio_path: Optional[str] = None
+    show_title: bool = False
+    watermark: str = ""
+    profile: str = "youtube"
+
+    def key(self) -> str:
+        """片段内容哈希：画面、时长、分辨率、编码参数（旁白音频按文件大小和修改时间区分）"""
+        payload = asdict(self)
+        # 场景序号不影响画面内容，相同内容的场景可以复用同一片段
+        payload.pop("index")
+        if self.audio_path:
+            try:
+                stat = os.stat(self.audio_path)
+                payload["audio"] = [stat.st_size, int(stat.st_mtime)]
+            except OSError:
+                payload["audio"] = None
+        # 编码参数参与哈希（不含线程数），档位定义修改后旧片段自动失效
+        encoding = get_profile(self.profile)
+        payload["codec"] = encoding.video_args() + encoding.audio_args()
+        payload["v"] = SCENE_GRAPH_VERSION
+        raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def build_scene_specs(
+    title: str,
+    scenes: List[Dict[str, Any]],
+    duration: float,
+    resolution: Optional[str] = None,
+    fps: Optional[int] = None,
+    watermark: str = "",
+    profile: Optional[str] = None,
+) -> List[SceneSpec]:
+    """
+    把脚本场景转换为片段描述
+
+    场景未指定时长时平分总时长；第一个场景显示视频标题；
+    水印直接绘制在每个场景画面上，成片阶段不必为叠加水印重新编码；
+    分辨率和帧率默认取编码档位的设置
+    """
+    encoding = get_profile(profile)
+    size = RESOLUTIONS.get(resolution, encoding.resolution) if resolution else encoding.resolution
+    fps = fps or encoding.fps
+    if not scenes:
+        scenes = [{"subtitle": ""}]
+    default_duration = max(1.0, duration / len(scenes))
+
+    specs = []
+    for index, scene in enumerate(scenes):
+        specs.append(
+            SceneSpec(
+                index=index,
+                duration=float(scene.get("duration") or default_duration),
+                title=title,
+                subtitle=(scene.get("subtitle") or scene.get("narration") or "")[:100],
+                background=SCENE_BACKGROUNDS[index % len(SCENE_BACKGROUNDS)],
+                resolution=size,
+                fps=fps,
+                audio_path=scene.get("audio_path"),
+                show_title=index == 0,
+                watermark=watermark,
+                profile=encoding.name,
+            )
+        )
+    return specs
+
+
+def fit_to_narration(specs: List[SceneSpec], narration_seconds: Optional[float]) -> List[SceneSpec]:
+    """
+    旁白实测时长超过场景总时长时按比例拉长各场景，避免旁白被截断
+
+    旁白较短时保持原时长（剩余部分为静音）
+    """
+    total = sum(spec.duration for spec in specs)
+    if not narration_seconds or not total or narration_seconds <= total:
+        return specs
+    scale = narration_seconds / total
+    return [
+        replace(spec, duration=math.ceil(spec.duration * scale * 1000) / 1000) for spec in specs
+    ]
+
+
+def brand_card_spec(
+    text: str,
+    index: int,
+    duration: Optional[float] = None,
+    watermark: str = "",
+    profile: Optional[str] = None,
+) -> SceneSpec:
+    """
+    品牌片头 / 片尾卡片
+
+    内容只取决于品牌文字和画面参数，与具体产品无关，所有视频共用同一个缓存片段
+    """
+    encoding = get_profile(profile)
+    return SceneSpec(
+        index=index,
+        duration=float(duration or settings.VIDEO_BRAND_CARD_SECONDS),
+        title=text,
+        subtitle="",
+        background=SCENE_BACKGROUNDS[0],
+        resolution=encoding.resolution,
+        fps=encoding.fps,
+        show_title=True,
+        watermark=watermark,
+        profile=encoding.name,
+    )
+
+
+def scene_layers(spec: SceneSpec) -> Tuple[Image.Image, Image.Image]:
+    """
+    场景画面的两个图层：背景渐变（RGB）和文字层（RGBA：标题、字幕底条、字幕、水印）
+
+    分开返回以便逐帧动画时只移动背景、淡入文字
+    """
+    width, height = spec.resolution
+    # 按短边缩放，横屏和竖屏的文字大小一致
+    scale = min(width, height) / 720
+    background = gradient_engine.render((width, height), spec.background)
+    # 透明部分用白色，抗锯齿边缘与白字混合时不会出现暗边
+    overlay = Image.new("RGBA", (width, height), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(overlay)
+    white = hex_to_rgb("#ffffff")
+    max_width = int(width * 0.8)
+
+    if spec.show_title and spec.title:
+        font = font_manager.get(round(72 * scale))
+        lines = font_manager.wrap(spec.title, font, max_width)[:2]
+        line_height = round(90 * scale)
+        y = (height - line_height * len(lines)) // 2 - round(60 * scale)
+        for line in lines:
+            x = (width - font_manager.text_width(line, font)) // 2
+            font_manager.draw_text(draw, (x, y), line, font, white)
+            y += line_height
+
+    if spec.subtitle:
+        font = font_manager.get(round(40 * scale))
+        lines = font_manager.wrap(spec.subtitle, font, max_width)[:2]
+        line_height = round(56 * scale)
+        y = height - round(80 * scale) - line_height * len(lines)
+
+        # 字幕底条：半透明黑色，提高可读性
+        band_top = y - round(20 * scale)
+        band_height = line_height * len(lines) + round(40 * scale)
+        draw.rectangle([0, band_top, width, band_top + band_height - 1], fill=(0, 0, 0, 110))
+        for line in lines:
+            x = (width - font_manager.text_width(line, font)) // 2
+            font_manager.draw_text(draw, (x, y), line, font, white)
+            y += line_height
+
+    if spec.watermark:
+        # 左下角半透明水印
+        font = font_manager.get(max(12, round(24 * scale)))
+        margin = round(20 * scale)
+        font_manager.draw_text(
+            draw,
+            (margin, height - margin - font.size),
+            spec.watermark,
+            font,
+            (255, 255, 255, 128),
+        )
+
+    return background, overlay
+
+
+def render_scene_card(spec: SceneSpec, path: Path):
+    """用 PIL 绘制场景画面（背景渐变 + 标题 + 字幕）并保存为 PNG"""
+    background, overlay = scene_layers(spec)
+    image = Image.alpha_composite(background.convert("RGBA"), overlay).convert("RGB")
+    image.save(path, "PNG", compress_level=1)
+
+
+def segment_command(
+    spec: SceneSpec, card_path: Path, output_path: Path, threads: Optional[int] = None
+) -> List[str]:
+    """单个片段的 FFmpeg 命令：静态画面 + 旁白（无旁白时为静音轨）"""
+    cmd = [
+        settings.FFMPEG_PATH,
+        "-y",
+        "-loop",
+        "1",
+        "-framerate",
+        str(spec.fps),
+        "-i",
+        str(card_path),
+    ]
+    if spec.audio_path:
+        cmd += ["-i", spec.audio_path]
+    else:
+        cmd += [
+            "-f",
+            "lavfi",
+            "-i",
+            f"anullsrc=r={AUDIO_SAMPLE_RATE}:cl=stereo",
+        ]
+    cmd += [
+        "-map",
+        "0:v",
+        "-map",
+        "1:a",
+        # 旁白比场景短时补静音，比场景长时截断，保证音视频时长一致
+        "-af",
+        "apad",
+        "-t",
+        f"{spec.duration:.3f}",
+        "-r",
+        str(spec.fps),
+    ]
+    encoding = get_profile(spec.profile)
+    cmd += [*encoding.video_args(), *encoding.audio_args(), *encoding.thread_args(threads)]
+    cmd.append(str(output_path))
+    return cmd
+
+
+def write_concat_list(segments: List[Path], list_path: Path):
+    """生成 concat demuxer 的输入列表"""
+    lines = []
+    for segment in segments:
+        escaped = str(segment.resolve()).replace("'", "'\\''")
+        lines.append(f"file '{escaped}'\n")
+    list_path.write_text("".join(lines), encoding="utf-8")
+
+
+def finish_command(
+    list_path: Path,
+    output_path: Path,
+    thumbnail_path: Path,
+    duration: float,
+    audio_path: Optional[str] = None,
+    thumbnail_at: float = 1.0,
+    audio_offset: float = 0.0,
+    profile: Optional[EncodingProfile] = None,
+) -> List[str]:
+    """
+    成片命令：一次调用完成拼接、旁白混流和缩略图
+
+    - 视频流直接复制（水印已绘制在场景画面中），只在缩略图分支解码开头几帧
+    - 有旁白时替换片段中的静音轨，旁白较短时补静音、较长时截断；
+      有片头时旁白延后 audio_offset 秒开始
+    - 缩略图作为第二路输出，不再重新读取成片
+    """
+    cmd = [settings.FFMPEG_PATH, "-y", "-f", "concat", "-safe", "0", "-i", str(list_path)]
+    if audio_path:
+        cmd += ["-i", str(audio_path)]
+
+    cmd += [
+        "-filter_complex",
+        f"[0:v]trim=start={thumbnail_at:.3f},setpts=PTS-STARTPTS,scale=320:-2[thumb]",
+        "-map",
+        "0:v",
+        "-c:v",
+        "copy",
+    ]
+
+    if audio_path:
+        # 补静音到视频长度（视频流复制时 -shortest 无法结束 apad）
+        audio_filter = f"apad=whole_dur={duration:.3f}"
+        if audio_offset > 0:
+            audio_filter = f"adelay=delays={round(audio_offset * 1000)}:all=1,{audio_filter}"
+        cmd += [
+            "-map",
+            "1:a",
+            "-af",
+            audio_filter,
+            *(profile or get_profile()).audio_args(),
+        ]
+    else:
+        cmd += ["-map", "0:a", "-c:a", "copy"]
+
+    cmd += ["-t", f"{duration:.3f}", "-movflags", "+faststart", str(output_path)]
+
+    # 第二路输出：缩略图
+    cmd += ["-map", "[thumb]", "-frames:v", "1", str(thumbnail_path)]
+    return cmd
@@ -0,0 +1,208 @@
+"""
+视频片段缓存
+已编码的场景片段（品牌片头片尾、标题卡、静态场景）按内容哈希存放在磁盘上，
+不同视频之间直接复用，拼接时用 concat demuxer 流复制；总大小超过配额时按 LRU 淘汰
+"""
+
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.ffmpeg_pool import FFmpegCancelledError
+
+SEGMENT_SUFFIX = ".mp4"
+
+
+class _EncodeAborted(Exception):
+    """负责编码的调用方被取消（等待者应接手编码）"""
+
+
+class SegmentCache:
+    """
+    视频片段缓存
+
+    - 文件名为内容哈希，重启后扫描目录恢复索引（按修改时间排序作为 LRU 顺序）
+    - 命中时更新文件修改时间，LRU 顺序在重启后仍然有效
+    - 正在拼接的片段被 pin 住，淘汰时跳过
+    """
+
+    def __init__(self, directory: str = "generated/videos/segments", max_bytes: Optional[int] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = (
+            settings.VIDEO_SEGMENT_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        )
+
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._pins: Dict[str, int] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def path_for(self, key: str) -> Path:
+        """片段文件路径"""
+        return self.directory / f"{key[:32]}{SEGMENT_SUFFIX}"
+
+    # ---------- 索引 ----------
+
+    def _load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            files = [
+                path
+                for path in self.directory.glob(f"*{SEGMENT_SUFFIX}")
+                if not path.name.endswith(f".tmp{SEGMENT_SUFFIX}")
+            ]
+            for path in sorted(files, key=os.path.getmtime):
+                self._add(path.stem, path.stat().st_size)
+            self._loaded = True
+
+    def _add(self, name: str, size: int):
+        old = self._index.pop(name, None)
+        if old is not None:
+            self._total_bytes -= old
+        self._index[name] = size
+        self._total_bytes += size
+
+    def _evict(self):
+        """淘汰最久未使用且未被 pin 的片段，直到总大小不超过配额"""
+        for name in list(self._index):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if self._pins.get(name):
+                continue
+            self._total_bytes -= self._index.pop(name)
+            self._evictions += 1
+            try:
+                (self.directory / f"{name}{SEGMENT_SUFFIX}").unlink()
+            except FileNotFoundError:
+                pass
+            logger.info(f"Evicted cached video segment {name}")
+
+    # ---------- 读写 ----------
+
+    def get(self, key: str) -> Optional[Path]:
+        """查询片段，文件已被删除的条目视为未命中"""
+        self._load()
+        path = self.path_for(key)
+        with self._lock:
+            if path.stem in self._index:
+                if path.exists():
+                    self._index.move_to_end(path.stem)
+                    self._hits += 1
+                    try:
+                        os.utime(path)
+                    except OSError:
+                        pass
+                    return path
+                self._total_bytes -= self._index.pop(path.stem)
+            self._misses += 1
+        return None
+
+    def put(self, key: str, source: Path) -> Path:
+        """把编码完成的临时文件移入缓存"""
+        self._load()
+        path = self.path_for(key)
+        os.replace(source, path)
+        with self._lock:
+            self._add(path.stem, path.stat().st_size)
+            self._evict()
+        return path
+
+    async def get_or_encode(
+        self, key: str, encode: Callable[[Path], Awaitable[Any]]
+    ) -> Tuple[Path, bool]:
+        """
+        命中则直接返回，否则调用 encode(临时路径) 编码后写入缓存
+
+        同一片段的并发请求只编码一次；编码中断时不会留下不完整的片段。
+        负责编码的调用方被取消（其视频被取消）时，等待中的调用方接手重新编码，
+        取消不会传给其他视频
+
+        Returns:
+            (片段路径, 是否命中缓存)
+        """
+        while True:
+            cached = self.get(key)
+            if cached is not None:
+                return cached, True
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            try:
+                return await asyncio.shield(pending), True
+            except _EncodeAborted:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        tmp_path = self.path_for(key).with_name(f"{key[:32]}.tmp{SEGMENT_SUFFIX}")
+        try:
+            await encode(tmp_path)
+            path = self.put(key, tmp_path)
+            future.set_result(path)
+            return path, False
+        except (asyncio.CancelledError, FFmpegCancelledError):
+            self._fail(future, _EncodeAborted())
+            raise
+        except Exception as e:
+            self._fail(future, e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            tmp_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _fail(future: asyncio.Future, error: BaseException):
+        future.set_exception(error)
+        # 没有等待者时也标记为已读取，避免 "exception was never retrieved"
+        future.exception()
+
+    @contextmanager
+    def pinned(self, keys: Iterable[str]) -> Iterator[None]:
+        """在上下文中保护片段不被淘汰（拼接期间使用）"""
+        names = [self.path_for(key).stem for key in keys]
+        with self._lock:
+            for name in names:
+                self._pins[name] = self._pins.get(name, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                for name in names:
+                    self._pins[name] -= 1
+                    if not self._pins[name]:
+                        del self._pins[name]
+                self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        self._load()
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "pinned": len(self._pins),
+            }
+
+
+# 全局视频片段缓存
+segment_cache = SegmentCache()
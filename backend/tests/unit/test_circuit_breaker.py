@@ -0,0 +1,223 @@
+"""Unit tests for provider circuit breakers and failover."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.ai_service_manager import ai_service_manager
+from app.services.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    circuit_breakers,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def fail():
+    raise httpx.ConnectError("provider down")
+
+
+def http_error(status):
+    request = httpx.Request("POST", "https://provider.test/v1")
+    response = httpx.Response(status, request=request)
+    return httpx.HTTPStatusError(f"API error: {status}", request=request, response=response)
+
+
+async def succeed():
+    return "ok"
+
+
+def make_breaker(clock, **kwargs):
+    options = dict(failure_threshold=3, recovery_timeout=30, half_open_max_calls=1, clock=clock)
+    options.update(kwargs)
+    return CircuitBreaker("minimax", **options)
+
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(httpx.ConnectError):
+            asyncio.run(breaker.call(fail))
+
+
+class TestCircuitBreaker:
+    """Test cases for the closed/open/half-open state machine."""
+
+    def test_opens_after_consecutive_failures(self):
+        """The breaker opens at the threshold and then fails fast."""
+        breaker = make_breaker(FakeClock())
+        trip(breaker)
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.available()
+        with pytest.raises(CircuitOpenError) as exc:
+            asyncio.run(breaker.call(succeed))
+        assert exc.value.retry_after == 30
+        assert breaker.stats()["rejected"] == 1
+
+    def test_success_resets_failure_count(self):
+        """Only consecutive failures count toward the threshold."""
+        breaker = make_breaker(FakeClock())
+        for _ in range(5):
+            with pytest.raises(httpx.ConnectError):
+                asyncio.run(breaker.call(fail))
+            asyncio.run(breaker.call(succeed))
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_probe_closes_on_success(self):
+        """After the cooldown one probe is allowed and success closes the circuit."""
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        trip(breaker)
+        clock.now = 31
+        assert breaker.state == CircuitState.HALF_OPEN
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_probe_failure_reopens(self):
+        """A failed probe starts a new cooldown."""
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        trip(breaker)
+        clock.now = 31
+        with pytest.raises(httpx.ConnectError):
+            asyncio.run(breaker.call(fail))
+        assert breaker.state == CircuitState.OPEN
+        clock.now = 50
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.stats()["trips"] == 2
+
+    def test_client_errors_do_not_trip(self):
+        """4xx responses and caller-side errors never open the circuit."""
+        breaker = make_breaker(FakeClock())
+
+        async def bad_request():
+            raise http_error(400)
+
+        async def invalid_argument():
+            raise ValueError("Text cannot be empty")
+
+        for factory in (bad_request, invalid_argument) * breaker.failure_threshold:
+            with pytest.raises(Exception):
+                asyncio.run(breaker.call(factory))
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.stats()["failures"] == 0
+
+    def test_server_errors_and_throttling_trip(self):
+        """5xx and 429 responses count as provider failures."""
+        breaker = make_breaker(FakeClock())
+
+        async def server_error():
+            raise http_error(503)
+
+        async def throttled():
+            raise http_error(429)
+
+        for factory in (server_error, throttled, server_error):
+            with pytest.raises(httpx.HTTPStatusError):
+                asyncio.run(breaker.call(factory))
+        assert breaker.state == CircuitState.OPEN
+
+    def test_cancelled_probe_is_released(self):
+        """A cancelled probe does not use up the half-open slot."""
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        trip(breaker)
+        clock.now = 31
+
+        async def run():
+            task = asyncio.ensure_future(breaker.call(asyncio.Event().wait))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        assert breaker.available()
+
+
+class TestFailover:
+    """Test cases for AIServiceManager failover."""
+
+    def setup_method(self):
+        circuit_breakers.reset()
+        self.saved = dict(vars(ai_service_manager.status))
+        ai_service_manager.status.openai = True
+        ai_service_manager.status.stepfun = True
+        ai_service_manager.status.minimax = False
+
+    def teardown_method(self):
+        vars(ai_service_manager.status).update(self.saved)
+        circuit_breakers.reset()
+
+    def test_falls_back_to_recommended_provider(self):
+        """A failing auto call is retried on recommend_service's fallback."""
+        calls = []
+
+        async def factory(provider):
+            calls.append(provider)
+            if provider == "openai":
+                raise RuntimeError("openai down")
+            return provider
+
+        result = asyncio.run(ai_service_manager.call_with_failover("copywriting", "openai", factory))
+        assert result == "stepfun"
+        assert calls == ["openai", "stepfun"]
+
+    def test_explicit_provider_does_not_fail_over(self):
+        """Failover is only used when the caller asked for auto."""
+
+        async def factory(provider):
+            raise RuntimeError(f"{provider} down")
+
+        with pytest.raises(RuntimeError, match="openai"):
+            asyncio.run(
+                ai_service_manager.call_with_failover(
+                    "copywriting", "openai", factory, failover=False
+                )
+            )
+
+    def test_open_circuit_is_excluded_from_routing(self):
+        """Routing skips providers whose circuit is open."""
+        breaker = circuit_breakers.get("stepfun")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        assert ai_service_manager.rank_providers("copywriting", ["stepfun", "openai"]) == ["openai"]
+
+    def test_auto_text_reports_answering_provider(self, monkeypatch):
+        """Auto text generation fails over and reports who actually answered."""
+
+        async def chat(provider, messages, **kwargs):
+            if provider == "stepfun":
+                raise RuntimeError("stepfun down")
+            return f"{provider}: {messages[0]['content']}"
+
+        monkeypatch.setattr(ai_service_manager, "_chat", chat)
+        result = asyncio.run(
+            ai_service_manager.generate_text_with_provider("hi", "auto", hedge=False)
+        )
+        assert result == ("openai", "openai: hi")
+
+    def test_failover_stays_within_candidates(self, monkeypatch):
+        """Providers outside the caller's candidates are never used as fallback."""
+
+        async def chat(provider, messages, **kwargs):
+            raise RuntimeError(f"{provider} down")
+
+        monkeypatch.setattr(ai_service_manager, "_chat", chat)
+        with pytest.raises(RuntimeError, match="stepfun"):
+            asyncio.run(
+                ai_service_manager.generate_text_with_provider(
+                    "hi", "auto", candidates=("minimax", "stepfun"), hedge=False
+                )
+            )
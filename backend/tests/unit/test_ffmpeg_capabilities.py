@@ -0,0 +1,121 @@
+"""Unit tests for lazy FFmpeg capability detection."""
+
+import asyncio
+import os
+import sys
+
+from app.services import ffmpeg_capabilities as capabilities_module
+from app.services.ffmpeg_capabilities import (
+    CapabilityRegistry,
+    FFmpegCapabilities,
+    cpu_flags,
+    detect_capabilities,
+    parse_encoders,
+    parse_filters,
+)
+from app.services.video_profiles import PROFILES
+
+ENCODERS = """Encoders:
+ V..... = Video
+ A..... = Audio
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC (codec h264)
+ V.S... mpeg4                MPEG-4 part 2
+ A....D aac                  AAC (Advanced Audio Coding)
+"""
+
+FILTERS = """Filters:
+  T.. = Timeline support
+  A = Audio input/output
+  | = Source or sink filter
+ TSC drawtext          V->V       Draw text on top of video frames.
+ ... anullsrc          |->A       Null audio source, return empty audio frames.
+ ... split             V->N       Pass on the input to N video outputs.
+"""
+
+
+def fake_ffmpeg(tmp_path):
+    """Write an ffmpeg stand-in that answers the detection commands and counts calls."""
+    script = tmp_path / "fake_ffmpeg"
+    calls = tmp_path / "calls"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"open({str(calls)!r}, 'a').write('x')\n"
+        "arg = sys.argv[-1]\n"
+        "if arg == '-version':\n"
+        "    print('ffmpeg version 7.0-test')\n"
+        "elif arg == '-encoders':\n"
+        f"    print({ENCODERS!r})\n"
+        "else:\n"
+        f"    print({FILTERS!r})\n"
+    )
+    os.chmod(script, 0o755)
+    return script, calls
+
+
+class TestParsing:
+    """Test cases for parsing FFmpeg listings."""
+
+    def test_encoders(self):
+        """Only entries after the separator are encoders."""
+        assert parse_encoders(ENCODERS) == {"libx264", "mpeg4", "aac"}
+
+    def test_filters(self):
+        """Legend lines are skipped and source filters are included."""
+        assert parse_filters(FILTERS) == {"drawtext", "anullsrc", "split"}
+
+    def test_cpu_flags(self, tmp_path):
+        """Only SIMD flags relevant to software encoding are kept."""
+        cpuinfo = tmp_path / "cpuinfo"
+        cpuinfo.write_text("processor\t: 0\nflags\t\t: fpu sse2 ssse3 avx2 aes\n")
+        assert cpu_flags(str(cpuinfo)) == {"sse2", "ssse3", "avx2"}
+        assert cpu_flags(str(tmp_path / "missing")) == frozenset()
+
+
+class TestRegistry:
+    """Test cases for the lazily initialized registry."""
+
+    def test_detects_once_in_background(self, tmp_path, monkeypatch):
+        """Concurrent loads share one detection and nothing runs before first use."""
+        script, calls = fake_ffmpeg(tmp_path)
+        monkeypatch.setattr(capabilities_module.settings, "FFMPEG_PATH", str(script))
+        registry = CapabilityRegistry()
+        assert registry.peek() is None and not calls.exists()
+
+        async def run():
+            return await asyncio.gather(registry.load(), registry.load())
+
+        first, second = asyncio.run(run())
+        assert first is second and first.available
+        assert first.version == "ffmpeg version 7.0-test"
+        assert first.has_filter("drawtext") and first.has_encoder("libx264")
+        assert calls.read_text() == "xxx"
+        assert registry.detect() is first
+
+    def test_missing_ffmpeg_is_unavailable(self, tmp_path):
+        """A missing binary is reported as unavailable instead of raising."""
+        capabilities = detect_capabilities(str(tmp_path / "missing"))
+        assert not capabilities.available and not capabilities.encoders
+
+    def test_adapt_picks_available_encoder(self, monkeypatch):
+        """Profiles fall back to the fastest encoder this FFmpeg build has."""
+        registry = CapabilityRegistry()
+        profile = PROFILES["youtube"]
+        assert registry.adapt(profile) is profile
+
+        detected = FFmpegCapabilities(available=True, encoders=frozenset({"mpeg4", "aac"}))
+        monkeypatch.setattr(capabilities_module, "detect_capabilities", lambda: detected)
+        registry.detect()
+        adapted = registry.adapt(profile)
+        assert adapted.video_codec == "mpeg4" and adapted.audio_codec == "aac"
+        assert "-preset" not in adapted.video_args()
+
+    def test_adapt_keeps_profile_when_unavailable(self, monkeypatch):
+        """Without FFmpeg the default codecs are left untouched."""
+        monkeypatch.setattr(
+            capabilities_module, "detect_capabilities", lambda: FFmpegCapabilities(available=False)
+        )
+        registry = CapabilityRegistry()
+        registry.detect()
+        assert registry.adapt(PROFILES["preview"]) is PROFILES["preview"]
@@ -0,0 +1,98 @@
+"""Unit tests for the FFmpeg job scheduler."""
+
+import asyncio
+import sys
+
+import pytest
+
+from app.services.ffmpeg_pool import FFmpegCancelledError, FFmpegError, FFmpegScheduler
+
+
+def sleep_cmd(seconds: float, exit_code: int = 0):
+    """A stand-in for an FFmpeg command line."""
+    return [sys.executable, "-c", f"import time, sys; time.sleep({seconds}); sys.exit({exit_code})"]
+
+
+class TestFFmpegScheduler:
+    """Test cases for FFmpegScheduler."""
+
+    def test_concurrency_is_bounded(self):
+        """No more than max_jobs processes run at once."""
+        scheduler = FFmpegScheduler(max_jobs=2, threads_per_job=1, job_timeout=10)
+        peak = 0
+
+        async def watch():
+            nonlocal peak
+            for _ in range(40):
+                peak = max(peak, scheduler.stats()["running"])
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await asyncio.gather(watch(), *(scheduler.run(sleep_cmd(0.1)) for _ in range(5)))
+
+        asyncio.run(run())
+        assert peak == 2
+        assert scheduler.stats()["completed"] == 5
+
+    def test_preview_jumps_the_queue(self):
+        """Queued preview jobs start before queued final jobs."""
+        scheduler = FFmpegScheduler(max_jobs=1, threads_per_job=1, job_timeout=10)
+        order = []
+
+        async def job(name, priority):
+            await scheduler.run(sleep_cmd(0.05), priority=priority)
+            order.append(name)
+
+        async def run():
+            first = asyncio.create_task(job("first", "final"))
+            await asyncio.sleep(0.01)
+            await asyncio.gather(first, job("final", "final"), job("preview", "preview"))
+
+        asyncio.run(run())
+        assert order == ["first", "preview", "final"]
+
+    def test_failure_raises(self):
+        """A non-zero exit status raises FFmpegError."""
+        scheduler = FFmpegScheduler(max_jobs=1, threads_per_job=1, job_timeout=10)
+        with pytest.raises(FFmpegError):
+            asyncio.run(scheduler.run(sleep_cmd(0, exit_code=1)))
+        assert scheduler.stats()["failed"] == 1
+
+    def test_cancel_by_tag_kills_running_and_queued(self):
+        """Cancelling a tag kills its running process and drops its queued jobs."""
+        scheduler = FFmpegScheduler(max_jobs=1, threads_per_job=1, job_timeout=10)
+
+        async def run():
+            jobs = [
+                asyncio.create_task(scheduler.run(sleep_cmd(5), tag="task-1")),
+                asyncio.create_task(scheduler.run(sleep_cmd(5), tag="task-1")),
+            ]
+            await asyncio.sleep(0.2)
+            assert scheduler.cancel("task-1") == 2
+            return await asyncio.gather(*jobs, return_exceptions=True)
+
+        results = asyncio.run(asyncio.wait_for(run(), timeout=3))
+        assert all(isinstance(result, FFmpegCancelledError) for result in results)
+        stats = scheduler.stats()
+        assert (stats["running"], stats["queued"], stats["cancelled"]) == (0, 0, 2)
+
+    def test_timeout_kills_process(self):
+        """Jobs running past the timeout are killed and reported as failures."""
+        scheduler = FFmpegScheduler(max_jobs=1, threads_per_job=1, job_timeout=0.2)
+        with pytest.raises(FFmpegError):
+            asyncio.run(asyncio.wait_for(scheduler.run(sleep_cmd(5)), timeout=3))
+
+    def test_cancel_is_sticky_until_finish(self):
+        """Jobs submitted after cancel(tag) fail until the tag is finished."""
+        scheduler = FFmpegScheduler(max_jobs=2, threads_per_job=1, job_timeout=10)
+
+        async def run():
+            scheduler.cancel("video-1")
+            with pytest.raises(FFmpegCancelledError):
+                await scheduler.run(sleep_cmd(0), tag="video-1")
+            await scheduler.run(sleep_cmd(0), tag="video-2")
+            scheduler.finish("video-1")
+            await scheduler.run(sleep_cmd(0), tag="video-1")
+
+        asyncio.run(run())
+        assert scheduler.stats()["completed"] == 2
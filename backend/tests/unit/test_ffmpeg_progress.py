@@ -0,0 +1,145 @@
+"""Unit tests for FFmpeg progress parsing and video task progress."""
+
+import asyncio
+import os
+import sys
+
+from app.services.ffmpeg_pool import FFmpegScheduler
+from app.services.ffmpeg_progress import ProgressParser, VideoProgress
+
+PROGRESS_OUTPUT = """frame=150
+fps=75.00
+stream_0_0_q=28.0
+bitrate= 120.5kbits/s
+total_size=75000
+out_time_us=5000000
+out_time_ms=5000000
+out_time=00:00:05.000000
+dup_frames=0
+drop_frames=0
+speed=2.5x
+progress=continue
+frame=300
+fps=75.00
+out_time_us=10000000
+out_time=00:00:10.000000
+speed=2.48x
+progress=end
+"""
+
+
+class TestProgressParser:
+    """Test cases for ProgressParser."""
+
+    def test_emits_one_block_per_progress_line(self):
+        """Each progress= line closes a block."""
+        parser = ProgressParser()
+        blocks = [block for line in PROGRESS_OUTPUT.splitlines() if (block := parser.feed(line))]
+
+        assert len(blocks) == 2
+        assert blocks[0] == {
+            "frame": 150,
+            "fps": 75.0,
+            "speed": 2.5,
+            "out_seconds": 5.0,
+            "done": False,
+        }
+        assert blocks[1]["out_seconds"] == 10.0
+        assert blocks[1]["done"] is True
+
+    def test_unknown_values(self):
+        """N/A values before the first frame do not break parsing."""
+        parser = ProgressParser()
+        for line in ["frame=0", "fps=0.00", "out_time_us=N/A", "out_time=N/A", "speed=N/A"]:
+            assert parser.feed(line) is None
+        block = parser.feed("progress=continue")
+
+        assert block["out_seconds"] == 0.0
+        assert block["speed"] is None
+
+    def test_falls_back_to_out_time(self):
+        """out_time is used when the microsecond fields are missing."""
+        parser = ProgressParser()
+        parser.feed("out_time=00:01:02.500000")
+        assert parser.feed("progress=continue")["out_seconds"] == 62.5
+
+
+class TestVideoProgress:
+    """Test cases for VideoProgress."""
+
+    def test_stage_percent_is_weighted_by_duration(self):
+        """Render progress is media seconds done over total media seconds."""
+        progress = VideoProgress({"render": 1.0})
+        progress.add_job("render", "0", 10)
+        progress.add_job("render", "1", 30)
+        progress.update("render", "1", {"out_seconds": 15.0, "fps": 60.0, "speed": 2.0})
+
+        snapshot = progress.snapshot()
+        assert snapshot["stages"]["render"] == 37.5
+        assert snapshot["fps"] == 60.0
+        assert snapshot["speed"] == 2.0
+
+        progress.complete_job("render", "0")
+        assert progress.snapshot()["percent"] == 62.5
+
+    def test_overall_percent_and_eta(self):
+        """Completed stages count fully and ETA reaches zero at the end."""
+        progress = VideoProgress({"script": 1.0, "render": 3.0})
+        progress.complete("script")
+
+        snapshot = progress.snapshot()
+        assert snapshot["percent"] == 25.0
+        assert snapshot["eta_seconds"] is not None
+        assert 1.0 <= snapshot["poll_after_seconds"] <= 10.0
+
+        progress.complete("render")
+        assert progress.snapshot()["percent"] == 100.0
+        assert progress.snapshot()["eta_seconds"] == 0.0
+
+    def test_reset_clears_only_given_stages(self):
+        """A fallback render restarts its own stages and keeps earlier ones."""
+        progress = VideoProgress({"audio": 1.0, "render": 1.0})
+        progress.complete("audio")
+        progress.add_job("render", "0", 10)
+        progress.add_job("render", "1", 10)
+        progress.complete_job("render", "0")
+
+        progress.reset("render")
+        progress.add_job("render", "frames", 20)
+        snapshot = progress.snapshot()
+        assert snapshot["stages"] == {"audio": 100.0, "render": 0.0}
+
+    def test_progress_is_capped_at_job_duration(self):
+        """Overshooting out_time never exceeds 100 percent."""
+        progress = VideoProgress({"finish": 1.0})
+        progress.add_job("finish", "finish", 5)
+        progress.update("finish", "finish", {"out_seconds": 5.2})
+        assert progress.snapshot()["percent"] == 100.0
+
+
+class TestSchedulerProgress:
+    """Test cases for streaming progress through the scheduler."""
+
+    def test_callback_receives_blocks_while_running(self, tmp_path):
+        """Progress blocks are delivered from stdout before the process exits."""
+        script = tmp_path / "fake_ffmpeg"
+        script.write_text(
+            f"#!{sys.executable}\n"
+            "import sys, time\n"
+            "assert sys.argv[1:3] == ['-progress', 'pipe:1']\n"
+            "for i in range(3):\n"
+            "    print(f'out_time_us={i * 1000000}', flush=True)\n"
+            "    print('progress=continue', flush=True)\n"
+            "    time.sleep(0.05)\n"
+            "sys.stderr.write('done')\n"
+            "print('progress=end', flush=True)\n"
+        )
+        os.chmod(script, 0o755)
+
+        scheduler = FFmpegScheduler(max_jobs=1, threads_per_job=1, job_timeout=10)
+        blocks = []
+        stderr = asyncio.run(scheduler.run([str(script)], on_progress=blocks.append))
+
+        assert [block["out_seconds"] for block in blocks] == [0.0, 1.0, 2.0, 0.0]
+        assert blocks[-1]["done"] is True
+        assert stderr == b"done"
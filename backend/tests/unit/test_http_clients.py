@@ -0,0 +1,60 @@
+"""Unit tests for the shared provider HTTP client registry."""
+
+import asyncio
+
+from app.core.config import settings
+from app.core.http_clients import PROVIDER_LIMITS, HTTPClientRegistry
+
+
+class TestHTTPClientRegistry:
+    """Test cases for pooled provider clients."""
+
+    def test_client_is_shared_per_provider(self):
+        """Calls for the same provider reuse one pooled client."""
+        registry = HTTPClientRegistry()
+
+        async def run():
+            first = registry.get("openai")
+            assert registry.get("openai") is first
+            assert registry.get("stepfun") is not first
+            await registry.close()
+            return first
+
+        client = asyncio.run(run())
+        assert client.is_closed
+        assert registry.stats()["providers"] == []
+
+    def test_new_event_loop_gets_new_client(self):
+        """Clients are not reused across event loops and the old one is closed."""
+        registry = HTTPClientRegistry()
+
+        async def get():
+            client = registry.get("github")
+            await asyncio.sleep(0)
+            return client
+
+        first = asyncio.run(get())
+        second = asyncio.run(get())
+        assert first is not second
+        assert first.is_closed
+        assert not second.is_closed
+
+    def test_timeouts_keep_connect_short(self):
+        """Long read timeouts do not extend how long we wait to connect."""
+        registry = HTTPClientRegistry()
+        timeout = registry.timeout("stability")
+        assert timeout.read == PROVIDER_LIMITS["stability"].read_timeout
+        assert timeout.connect == settings.HTTP_CLIENT_CONNECT_TIMEOUT
+        assert registry.timeout("openai", 15.0).read == 15.0
+
+    def test_open_creates_all_providers(self):
+        """Startup opens one client per known provider."""
+        registry = HTTPClientRegistry()
+
+        async def run():
+            await registry.open()
+            providers = registry.stats()["providers"]
+            await registry.close()
+            return providers
+
+        assert asyncio.run(run()) == sorted(PROVIDER_LIMITS)
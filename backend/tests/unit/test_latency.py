@@ -0,0 +1,96 @@
+"""Unit tests for simulated latency and per-request latency budgets."""
+
+import asyncio
+
+import pytest
+
+from app.core import latency
+from app.core.latency import (
+    LatencyBudgetExceeded,
+    current_budget,
+    latency_budget,
+    simulate_latency,
+    simulated_delay,
+    within_budget,
+    without_budget,
+)
+
+
+class TestSimulatedLatency:
+    """Test cases for simulated latency profiles."""
+
+    def test_off_profile_has_no_delay(self, monkeypatch):
+        """The production profile never sleeps."""
+        monkeypatch.setattr(latency.settings, "SIMULATED_LATENCY_PROFILE", "off")
+        assert simulated_delay("poster.render") == 0
+
+    def test_demo_profile_delays(self, monkeypatch):
+        """The demo profile keeps the historical delays."""
+        monkeypatch.setattr(latency.settings, "SIMULATED_LATENCY_PROFILE", "demo")
+        assert simulated_delay("poster.render") == 1.5
+        assert simulated_delay("unknown.operation") == 0
+
+    def test_delay_skipped_when_budget_too_small(self, monkeypatch):
+        """Simulated delays that do not fit the budget are skipped."""
+        monkeypatch.setattr(latency.settings, "SIMULATED_LATENCY_PROFILE", "slow")
+
+        async def run():
+            with latency_budget(0.2):
+                loop = asyncio.get_running_loop()
+                start = loop.time()
+                await simulate_latency("batch.video")
+                return loop.time() - start
+
+        assert asyncio.run(run()) < 0.1
+
+
+class TestLatencyBudget:
+    """Test cases for latency budgets."""
+
+    def test_no_budget_by_default(self):
+        """Without a budget nothing is limited."""
+        assert current_budget() is None
+        with latency_budget(None) as budget:
+            assert budget is None
+
+    def test_budget_scoped_to_context(self):
+        """The budget is only visible inside its context."""
+        with latency_budget(5) as budget:
+            assert current_budget() is budget
+            assert 0 < budget.remaining() <= 5
+        assert current_budget() is None
+
+    def test_within_budget_passes_fast_calls(self):
+        """Calls finishing inside the budget return normally."""
+
+        async def run():
+            with latency_budget(1):
+                return await within_budget(asyncio.sleep(0, result="ok"))
+
+        assert asyncio.run(run()) == "ok"
+
+    def test_within_budget_times_out(self):
+        """Calls outliving the budget raise LatencyBudgetExceeded."""
+
+        async def run():
+            with latency_budget(0.05):
+                await within_budget(asyncio.sleep(1), "slow call")
+
+        with pytest.raises(LatencyBudgetExceeded):
+            asyncio.run(run())
+
+
+class TestWithoutBudget:
+    """Test cases for detaching background work from the request budget."""
+
+    def test_background_task_does_not_inherit_budget(self):
+        """A decorated job sees no budget even when spawned inside one."""
+        @without_budget
+        async def job():
+            return current_budget()
+
+        async def run():
+            with latency_budget(0.01):
+                return await asyncio.create_task(job())
+
+        assert asyncio.run(run()) is None
@@ -0,0 +1,148 @@
+"""Unit tests for the cached media probe."""
+
+import asyncio
+import json
+import os
+import sys
+
+from app.core.config import settings
+from app.services.media_probe import MediaProbe, ffprobe_path, parse_ffprobe
+
+FFPROBE_OUTPUT = {
+    "streams": [
+        {
+            "codec_type": "video",
+            "codec_name": "h264",
+            "width": 1920,
+            "height": 1080,
+            "avg_frame_rate": "30000/1001",
+            "duration": "12.012000",
+        },
+        {
+            "codec_type": "audio",
+            "codec_name": "aac",
+            "sample_rate": "44100",
+            "channels": 2,
+            "duration": "12.000000",
+        },
+    ],
+    "format": {
+        "format_name": "mov,mp4,m4a,3gp,3g2,mj2",
+        "duration": "12.012000",
+        "size": "2048000",
+        "bit_rate": "1363000",
+    },
+}
+
+
+def fake_ffprobe(tmp_path, output=FFPROBE_OUTPUT):
+    """Write an ffprobe stand-in that counts its calls."""
+    script = tmp_path / "fake_ffprobe"
+    calls = tmp_path / "calls"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"open({str(calls)!r}, 'a').write('x')\n"
+        f"print({json.dumps(output)!r})\n"
+    )
+    os.chmod(script, 0o755)
+    return script, calls
+
+
+class TestParseFFprobe:
+    """Test cases for parsing ffprobe JSON."""
+
+    def test_video_and_audio_fields(self):
+        """Format and stream fields are measured values, not requested ones."""
+        info = parse_ffprobe(FFPROBE_OUTPUT)
+        assert info.duration == 12.012
+        assert info.resolution == "1920x1080"
+        assert info.fps == 29.97
+        assert info.video_codec == "h264" and info.audio_codec == "aac"
+        assert info.sample_rate == 44100 and info.channels == 2
+        assert info.size == 2048000 and info.bit_rate == 1363000
+
+    def test_audio_only_falls_back_to_stream_duration(self):
+        """Audio files without a format duration use the longest stream."""
+        data = {"streams": [{"codec_type": "audio", "codec_name": "mp3", "duration": "7.5"}]}
+        info = parse_ffprobe(data, size=100)
+        assert info.duration == 7.5
+        assert info.resolution is None and info.fps is None
+        assert info.size == 100
+
+    def test_cover_art_is_not_the_video_stream(self):
+        """Attached pictures are skipped when picking the video stream."""
+        data = {
+            "streams": [
+                {"codec_type": "video", "codec_name": "mjpeg", "disposition": {"attached_pic": 1}},
+                {"codec_type": "audio", "codec_name": "mp3"},
+            ]
+        }
+        assert parse_ffprobe(data).video_codec is None
+
+
+class TestMediaProbe:
+    """Test cases for probing with caching."""
+
+    def test_probes_each_file_once(self, tmp_path, monkeypatch):
+        """Repeated and concurrent probes of the same file run ffprobe once."""
+        script, calls = fake_ffprobe(tmp_path)
+        monkeypatch.setattr(settings, "FFPROBE_PATH", str(script))
+        media = tmp_path / "video.mp4"
+        media.write_bytes(b"data")
+        probe = MediaProbe(max_entries=4)
+
+        async def run():
+            first = await asyncio.gather(probe.probe(media), probe.probe(media))
+            return first + [await probe.probe(media)]
+
+        results = asyncio.run(run())
+        assert all(info.duration == 12.012 for info in results)
+        assert calls.read_text() == "x"
+        assert probe.stats()["hits"] == 1
+
+    def test_cancelled_caller_does_not_fail_other_waiters(self, tmp_path, monkeypatch):
+        """Cancelling one caller leaves the shared probe running for the others."""
+        script, calls = fake_ffprobe(tmp_path)
+        monkeypatch.setattr(settings, "FFPROBE_PATH", str(script))
+        media = tmp_path / "video.mp4"
+        media.write_bytes(b"data")
+        probe = MediaProbe()
+
+        async def run():
+            first = asyncio.ensure_future(probe.probe(media))
+            second = asyncio.ensure_future(probe.probe(media))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(run()).duration == 12.012
+        assert calls.read_text() == "x"
+
+    def test_rewritten_file_is_probed_again(self, tmp_path, monkeypatch):
+        """A changed size or mtime invalidates the cached entry."""
+        script, calls = fake_ffprobe(tmp_path)
+        monkeypatch.setattr(settings, "FFPROBE_PATH", str(script))
+        media = tmp_path / "video.mp4"
+        media.write_bytes(b"data")
+        probe = MediaProbe()
+
+        asyncio.run(probe.probe(media))
+        media.write_bytes(b"longer data")
+        asyncio.run(probe.probe(media))
+        assert calls.read_text() == "xx"
+
+    def test_missing_ffprobe_or_file_returns_none(self, tmp_path, monkeypatch):
+        """Callers fall back to planned values when probing is impossible."""
+        monkeypatch.setattr(settings, "FFPROBE_PATH", str(tmp_path / "missing"))
+        media = tmp_path / "video.mp4"
+        media.write_bytes(b"data")
+        probe = MediaProbe()
+        assert asyncio.run(probe.duration(media)) is None
+        assert asyncio.run(probe.probe(tmp_path / "absent.mp4")) is None
+
+    def test_ffprobe_path_follows_ffmpeg(self, monkeypatch):
+        """ffprobe is looked up next to the configured ffmpeg binary."""
+        monkeypatch.setattr(settings, "FFPROBE_PATH", "")
+        monkeypatch.setattr(settings, "FFMPEG_PATH", "/opt/ffmpeg/bin/ffmpeg")
+        assert ffprobe_path() == "/opt/ffmpeg/bin/ffprobe"
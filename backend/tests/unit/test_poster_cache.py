@@ -0,0 +1,150 @@
+"""Unit tests for the content-addressed poster render cache."""
+
+import asyncio
+
+import pytest
+
+from app.core.latency import LatencyBudgetExceeded, latency_budget, within_budget
+from app.services.poster_cache import PosterRenderCache, poster_cache_key
+
+
+def make_result(output_dir, name, size=10):
+    """Write fake poster files and return a renderer-style result."""
+    for ext in ("png", "jpg"):
+        (output_dir / f"{name}.{ext}").write_bytes(b"x" * size)
+    return {
+        "id": name,
+        "preview_url": f"/download/{name}.png",
+        "download_urls": {"png": f"/download/{name}.png", "jpg": f"/download/{name}.jpg"},
+    }
+
+
+class TestPosterCacheKey:
+    """Test cases for poster_cache_key."""
+
+    def test_key_is_stable(self):
+        """Identical inputs hash to the same key regardless of order."""
+        a = poster_cache_key(product_name="A", features=["x", "y"], template_id="t")
+        b = poster_cache_key(template_id="t", features=["x", "y"], product_name="A")
+        assert a == b
+
+    def test_key_changes_with_inputs(self):
+        """Any input change produces a different key."""
+        a = poster_cache_key(product_name="A", template_id="tech-modern")
+        b = poster_cache_key(product_name="A", template_id="minimal")
+        assert a != b
+
+
+class TestPosterRenderCache:
+    """Test cases for PosterRenderCache."""
+
+    def test_render_once_then_hit(self, tmp_path):
+        """The second request for the same key reuses the first render."""
+        cache = PosterRenderCache(str(tmp_path), max_entries=10, max_bytes=10**6, use_redis=False)
+        calls = []
+
+        async def render():
+            calls.append(1)
+            return make_result(tmp_path, "poster_a")
+
+        async def run():
+            first = await cache.get_or_render("a", render)
+            second = await cache.get_or_render("a", render)
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert len(calls) == 1
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["download_urls"] == first["download_urls"]
+
+    def test_concurrent_requests_render_once(self, tmp_path):
+        """Concurrent requests for the same key share one render."""
+        cache = PosterRenderCache(str(tmp_path), max_entries=10, max_bytes=10**6, use_redis=False)
+        calls = []
+
+        async def render():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return make_result(tmp_path, "poster_b")
+
+        async def run():
+            return await asyncio.gather(*[cache.get_or_render("b", render) for _ in range(3)])
+
+        results = asyncio.run(run())
+        assert len(calls) == 1
+        assert len({r["id"] for r in results}) == 1
+
+    def test_abandoned_waiter_does_not_cancel_shared_render(self, tmp_path):
+        """A caller running out of budget leaves the render running for the others."""
+        cache = PosterRenderCache(str(tmp_path), max_entries=10, max_bytes=10**6, use_redis=False)
+
+        async def render():
+            await asyncio.sleep(0.1)
+            return make_result(tmp_path, "poster_c")
+
+        async def impatient():
+            with latency_budget(0.02):
+                await within_budget(cache.get_or_render("c", render), "poster render")
+
+        async def run():
+            first = asyncio.ensure_future(impatient())
+            await asyncio.sleep(0.01)
+            second = await cache.get_or_render("c", render)
+            with pytest.raises(LatencyBudgetExceeded):
+                await first
+            return second, await cache.get("c")
+
+        second, cached = asyncio.run(run())
+        assert second["id"] == "poster_c"
+        assert cached["id"] == "poster_c"
+
+    def test_render_finishes_after_all_callers_leave(self, tmp_path):
+        """The render is still published to the cache when nobody waits for it."""
+        cache = PosterRenderCache(str(tmp_path), max_entries=10, max_bytes=10**6, use_redis=False)
+
+        async def render():
+            await asyncio.sleep(0.05)
+            return make_result(tmp_path, "poster_d")
+
+        async def run():
+            caller = asyncio.ensure_future(cache.get_or_render("d", render))
+            await asyncio.sleep(0.01)
+            caller.cancel()
+            await asyncio.sleep(0.1)
+            return await cache.get("d")
+
+        assert asyncio.run(run())["id"] == "poster_d"
+
+    def test_lru_eviction_removes_files(self, tmp_path):
+        """Entries beyond max_entries are evicted together with their files."""
+        cache = PosterRenderCache(str(tmp_path), max_entries=2, max_bytes=10**6, use_redis=False)
+
+        async def run():
+            for name in ("p1", "p2", "p3"):
+                await cache.put(name, make_result(tmp_path, f"poster_{name}"))
+
+        asyncio.run(run())
+        assert cache.stats()["entries"] == 2
+        assert not (tmp_path / "poster_p1.png").exists()
+        assert (tmp_path / "poster_p3.png").exists()
+
+    def test_size_eviction(self, tmp_path):
+        """Entries are evicted once the byte quota is exceeded."""
+        cache = PosterRenderCache(str(tmp_path), max_entries=10, max_bytes=50, use_redis=False)
+
+        async def run():
+            await cache.put("s1", make_result(tmp_path, "poster_s1", size=20))
+            await cache.put("s2", make_result(tmp_path, "poster_s2", size=20))
+
+        asyncio.run(run())
+        assert cache.stats()["entries"] == 1
+        assert cache.stats()["bytes"] <= 50
+
+    def test_index_restored_from_disk(self, tmp_path):
+        """A new cache instance picks up entries written by a previous one."""
+        first = PosterRenderCache(str(tmp_path), max_entries=10, max_bytes=10**6, use_redis=False)
+        asyncio.run(first.put("d", make_result(tmp_path, "poster_d")))
+
+        second = PosterRenderCache(str(tmp_path), max_entries=10, max_bytes=10**6, use_redis=False)
+        assert asyncio.run(second.get("d"))["id"] == "poster_d"
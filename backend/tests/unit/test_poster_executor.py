@@ -0,0 +1,88 @@
+"""Unit tests for the poster render executor."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.poster_executor import RenderExecutor, RenderPoolSaturatedError
+
+
+class TestRenderExecutor:
+    """Test cases for RenderExecutor."""
+
+    def test_thread_mode_runs_function(self):
+        """workers=0 renders in a thread pool."""
+        executor = RenderExecutor(workers=0, max_pending=2, queue_timeout=1)
+        try:
+            result = asyncio.run(executor.submit(pow, 2, 10))
+            assert result == 1024
+            assert executor.stats()["mode"] == "thread"
+            assert executor.stats()["completed"] == 1
+        finally:
+            executor.shutdown()
+
+    def test_process_mode_runs_function(self):
+        """workers>0 renders in a process pool."""
+        executor = RenderExecutor(workers=1, max_pending=2, queue_timeout=5, initializer=None)
+        try:
+            assert asyncio.run(executor.submit(pow, 3, 3)) == 27
+        finally:
+            executor.shutdown()
+
+    def test_saturated_pool_rejects(self):
+        """Jobs beyond max_pending wait, then fail once queue_timeout expires."""
+        executor = RenderExecutor(workers=0, max_pending=1, queue_timeout=0.05)
+
+        async def run():
+            slow = asyncio.ensure_future(executor.submit(time.sleep, 0.5))
+            await asyncio.sleep(0.01)
+            with pytest.raises(RenderPoolSaturatedError):
+                await executor.submit(pow, 2, 2)
+            await slow
+
+        try:
+            asyncio.run(run())
+            assert executor.stats()["rejected"] == 1
+        finally:
+            executor.shutdown()
+
+    def test_cancelled_job_keeps_slot_until_finished(self):
+        """A cancelled caller does not free the slot while the worker still runs."""
+        executor = RenderExecutor(workers=0, max_pending=1, queue_timeout=0.05)
+
+        async def run():
+            slow = asyncio.ensure_future(executor.submit(time.sleep, 0.3))
+            await asyncio.sleep(0.02)
+            slow.cancel()
+            await asyncio.sleep(0)
+            assert executor.stats()["in_flight"] == 1
+            with pytest.raises(RenderPoolSaturatedError):
+                await executor.submit(pow, 2, 2)
+            await asyncio.sleep(0.35)
+            return await executor.submit(pow, 2, 3)
+
+        try:
+            assert asyncio.run(run()) == 8
+            assert executor.stats()["in_flight"] == 0
+        finally:
+            executor.shutdown()
+
+    def test_cancelled_waiter_does_not_take_a_slot(self):
+        """A caller cancelled while queued leaves no slot behind."""
+        executor = RenderExecutor(workers=0, max_pending=1, queue_timeout=5)
+
+        async def run():
+            slow = asyncio.ensure_future(executor.submit(time.sleep, 0.05))
+            await asyncio.sleep(0.01)
+            queued = asyncio.ensure_future(executor.submit(pow, 2, 2))
+            await asyncio.sleep(0.01)
+            queued.cancel()
+            await slow
+            return await asyncio.wait_for(executor.submit(pow, 2, 3), timeout=1)
+
+        try:
+            assert asyncio.run(run()) == 8
+            assert executor.stats()["in_flight"] == 0
+        finally:
+            executor.shutdown()
@@ -0,0 +1,85 @@
+"""Unit tests for the poster export pipeline."""
+
+from PIL import Image
+
+from app.services.poster_export import PosterExporter, fit_to_size, supported_formats
+
+
+class TestFitToSize:
+    """Test cases for fit_to_size."""
+
+    def test_same_aspect_resizes(self):
+        """Posters with the target aspect ratio are simply scaled."""
+        image = Image.new("RGB", (1200, 1600), "#ff0000")
+        assert fit_to_size(image, (300, 400)).size == (300, 400)
+
+    def test_other_aspect_keeps_content(self):
+        """Other aspect ratios keep the whole poster centered on a filled canvas."""
+        image = Image.new("RGB", (1200, 1600), "#ff0000")
+        story = fit_to_size(image, (1080, 1920))
+        assert story.size == (1080, 1920)
+        assert story.getpixel((540, 960)) == (255, 0, 0)
+
+
+class TestPosterExporter:
+    """Test cases for PosterExporter."""
+
+    def test_exports_formats_and_sizes(self, tmp_path):
+        """One render produces every requested format and size."""
+        exporter = PosterExporter(max_threads=2)
+        image = Image.new("RGB", (120, 160), "#0ea5e9")
+        try:
+            result = exporter.export(
+                image,
+                str(tmp_path),
+                "poster_x",
+                formats=["png", "jpg", "webp"],
+                sizes=["square", "thumbnail"],
+            )
+        finally:
+            exporter.shutdown()
+
+        assert set(result["download_urls"]) == {"png", "jpg", "webp"}
+        assert (tmp_path / "poster_x.webp").exists()
+        assert result["sizes"]["square"]["width"] == 1080
+        with Image.open(tmp_path / "poster_x_thumbnail.jpg") as thumb:
+            assert thumb.size == (300, 400)
+
+    def test_unknown_formats_and_sizes_skipped(self, tmp_path):
+        """Unsupported formats and unknown sizes are skipped instead of failing."""
+        exporter = PosterExporter(max_threads=1)
+        image = Image.new("RGB", (12, 16))
+        try:
+            result = exporter.export(
+                image, str(tmp_path), "poster_y", formats=["png", "bmp"], sizes=["banner"]
+            )
+        finally:
+            exporter.shutdown()
+
+        assert list(result["download_urls"]) == ["png"]
+        assert result["sizes"] == {}
+
+    def test_png_and_jpg_always_supported(self):
+        """The default formats are available in every Pillow build."""
+        assert {"png", "jpg"} <= set(supported_formats())
+
+
+class TestContactSheet:
+    """Test cases for the variant contact sheet."""
+
+    def test_grid_layout(self, tmp_path):
+        """Posters are laid out on a grid with the requested column count."""
+        exporter = PosterExporter(max_threads=2)
+        sources = []
+        for index in range(5):
+            path = tmp_path / f"poster_{index}.jpg"
+            Image.new("RGB", (1200, 1600), (index * 40, 0, 0)).save(path, "JPEG")
+            sources.append(path)
+
+        output = tmp_path / "sheet.jpg"
+        size = exporter.contact_sheet(sources, output, columns=3, thumb_size=(150, 200), gap=10)
+        exporter.shutdown()
+
+        assert size == (3 * 150 + 4 * 10, 2 * 200 + 3 * 10)
+        with Image.open(output) as sheet:
+            assert sheet.size == size
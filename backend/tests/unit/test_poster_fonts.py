@@ -0,0 +1,68 @@
+"""Unit tests for the poster font manager."""
+
+import os
+
+import pytest
+
+from app.services.poster_fonts import FontManager
+
+DEJAVU = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+requires_dejavu = pytest.mark.skipif(not os.path.exists(DEJAVU), reason="DejaVu font not installed")
+
+
+class TestFontChain:
+    """Test cases for font resolution."""
+
+    def test_extra_paths_come_first(self, tmp_path):
+        """Configured fonts take priority and missing files are dropped."""
+        font = tmp_path / "custom.ttf"
+        font.write_bytes(b"")
+        manager = FontManager(font_dir=str(tmp_path / "none"), extra_paths=[str(font), "/missing.ttf"])
+        assert manager.chain[0] == str(font)
+        assert "/missing.ttf" not in manager.chain
+
+    def test_font_dir_is_scanned(self, tmp_path):
+        """Font files dropped into the font directory join the chain."""
+        (tmp_path / "b.otf").write_bytes(b"")
+        (tmp_path / "a.ttf").write_bytes(b"")
+        (tmp_path / "readme.txt").write_text("x")
+        manager = FontManager(font_dir=str(tmp_path), extra_paths=[])
+        assert manager.chain[:2] == [str(tmp_path / "a.ttf"), str(tmp_path / "b.otf")]
+
+    def test_unloadable_font_falls_through(self, tmp_path):
+        """A broken font file is skipped instead of failing the render."""
+        broken = tmp_path / "broken.ttf"
+        broken.write_bytes(b"not a font")
+        manager = FontManager(font_dir=str(tmp_path / "none"), extra_paths=[str(broken)])
+        assert manager.get(24) is not None
+
+
+@requires_dejavu
+class TestFontCache:
+    """Test cases for font memoization and fallback."""
+
+    def make_manager(self, tmp_path):
+        manager = FontManager(font_dir=str(tmp_path), extra_paths=[DEJAVU])
+        manager._chain = [DEJAVU]
+        return manager
+
+    def test_fonts_are_memoized(self, tmp_path):
+        """The same size returns the same FreeTypeFont object."""
+        manager = self.make_manager(tmp_path)
+        assert manager.get(32) is manager.get(32)
+        assert manager.get(32) is not manager.get(36)
+
+    def test_coverage_detection(self, tmp_path):
+        """Latin glyphs are found and unassigned code points are not."""
+        manager = self.make_manager(tmp_path)
+        assert manager.covers(DEJAVU, "A")
+        assert manager.covers(DEJAVU, " ")
+        assert not manager.covers(DEJAVU, "\U000E0100")
+
+    def test_runs_merge_same_font(self, tmp_path):
+        """Consecutive characters with the same font form a single run."""
+        manager = self.make_manager(tmp_path)
+        font = manager.get(32)
+        assert manager.runs("Pitch Cube", font) == [("Pitch Cube", font)]
+        assert manager.text_width("Pitch Cube", font) > 0
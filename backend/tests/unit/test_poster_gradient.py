@@ -0,0 +1,82 @@
+"""Unit tests for the poster gradient engine."""
+
+import pytest
+
+from app.services.poster_gradient import (
+    GRADIENT_LINEAR,
+    GRADIENT_RADIAL,
+    GradientEngine,
+    build_channel_luts,
+    normalize_stops,
+)
+
+
+class TestGradientStops:
+    """Test cases for color stop handling."""
+
+    def test_even_stops(self):
+        """Plain colors are spread evenly between 0 and 1."""
+        stops = normalize_stops(["#000000", "#808080", "#ffffff"])
+        assert [offset for offset, _ in stops] == [0.0, 0.5, 1.0]
+        assert stops[1][1] == (128, 128, 128)
+
+    def test_explicit_stops_are_sorted(self):
+        """Explicit (offset, color) stops are sorted by offset."""
+        stops = normalize_stops([(1.0, "#ffffff"), (0.0, "#000000")])
+        assert stops[0] == (0.0, (0, 0, 0))
+
+    def test_luts_interpolate_between_stops(self):
+        """Lookup tables run from the first stop to the last."""
+        red, green, blue = build_channel_luts(normalize_stops(["#ff0000", "#0000ff"]))
+        assert len(red) == 256
+        assert (red[0], blue[0]) == (255, 0)
+        assert (red[255], blue[255]) == (0, 255)
+
+    def test_empty_colors_rejected(self):
+        """A gradient needs at least one color."""
+        with pytest.raises(ValueError):
+            normalize_stops([])
+
+
+class TestGradientEngine:
+    """Test cases for GradientEngine."""
+
+    def test_linear_gradient_endpoints(self):
+        """Linear gradients run top to bottom."""
+        engine = GradientEngine()
+        image = engine.render((120, 160), ("#000000", "#ffffff"), GRADIENT_LINEAR)
+        assert image.size == (120, 160)
+        assert image.getpixel((60, 0))[0] < 10
+        assert image.getpixel((60, 159))[0] > 245
+        assert image.getpixel((0, 80)) == image.getpixel((119, 80))
+
+    def test_multi_stop_gradient(self):
+        """The middle stop of a three-color gradient shows up mid-canvas."""
+        engine = GradientEngine()
+        image = engine.render((10, 256), ("#000000", "#ff0000", "#000000"))
+        assert image.getpixel((5, 128))[0] > 240
+        assert image.getpixel((5, 0))[0] < 10
+
+    def test_radial_gradient_center(self):
+        """Radial gradients start from the canvas center."""
+        engine = GradientEngine()
+        image = engine.render((200, 200), ("#ffffff", "#000000"), GRADIENT_RADIAL)
+        assert image.getpixel((100, 100))[0] > 240
+        assert image.getpixel((0, 0))[0] < 10
+
+    def test_unknown_type_rejected(self):
+        """Unknown gradient types raise ValueError."""
+        with pytest.raises(ValueError):
+            GradientEngine().render((10, 10), ("#000000", "#ffffff"), "conic")
+
+    def test_cache_returns_copies(self):
+        """Cached backgrounds are returned as independent copies."""
+        engine = GradientEngine(max_cache_size=1)
+        first = engine.render((20, 20), ("#000000", "#ffffff"))
+        first.putpixel((0, 0), (1, 2, 3))
+        second = engine.render((20, 20), ("#000000", "#ffffff"))
+        assert second.getpixel((0, 0)) != (1, 2, 3)
+        assert engine.cache_info()["hits"] == 1
+
+        engine.render((30, 30), ("#000000", "#ffffff"))
+        assert engine.cache_info()["size"] == 1
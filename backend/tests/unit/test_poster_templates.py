@@ -0,0 +1,141 @@
+"""Unit tests for compiled poster templates."""
+
+import asyncio
+
+import pytest
+from PIL import Image
+
+from app.services.poster_renderer import PosterRenderer
+from app.services.poster_templates import (
+    DEFAULT_LAYOUT,
+    TemplateCache,
+    compose_decorations,
+    decoration_sprite,
+    resolve_layout,
+)
+
+
+class TestResolveLayout:
+    """Test cases for layout overrides."""
+
+    def test_nested_override_keeps_siblings(self):
+        """Overriding one field leaves the rest of the section intact."""
+        layout = resolve_layout({"title": {"top": 200}})
+        assert layout["title"]["top"] == 200
+        assert layout["title"]["font_size"] == DEFAULT_LAYOUT["title"]["font_size"]
+
+    def test_default_layout_not_mutated(self):
+        """Resolving a layout never changes the shared defaults."""
+        resolve_layout({"footer": {"text": ""}})
+        assert DEFAULT_LAYOUT["footer"]["text"] == "Generated by PitchCube"
+
+
+class TestTemplateCache:
+    """Test cases for the template cache."""
+
+    def test_compile_once_per_key(self):
+        """A key is compiled only on the first lookup."""
+        cache = TemplateCache()
+        calls = []
+        cache.get_or_compile("a", lambda: calls.append(1) or "compiled")
+        assert cache.get_or_compile("a", lambda: calls.append(1) or "other") == "compiled"
+        assert len(calls) == 1
+
+    def test_lru_eviction(self):
+        """The least recently used template is dropped first."""
+        cache = TemplateCache(max_size=2)
+        cache.get_or_compile("a", lambda: "a")
+        cache.get_or_compile("b", lambda: "b")
+        cache.get_or_compile("a", lambda: "a")
+        cache.get_or_compile("c", lambda: "c")
+        assert len(cache) == 2
+        assert cache.get_or_compile("b", lambda: "new") == "new"
+
+    def test_renderer_reuses_compiled_template(self):
+        """Renders with the same template and size share one compiled base."""
+        renderer = PosterRenderer()
+        first = renderer.compile_template("tech-modern", ("#1e3a8a", "#3b82f6"), (600, 800))
+        second = renderer.compile_template("tech-modern", ("#1e3a8a", "#3b82f6"), (600, 800))
+        assert first is second
+        assert first.base.size == (600, 800)
+
+
+class TestContentLayout:
+    """Test cases for shared content layout."""
+
+    def test_variants_share_layout(self):
+        """Different color schemes with the same layout reuse one text layout."""
+        renderer = PosterRenderer()
+        first = renderer.compile_template("tech-modern", ("#000000", "#ffffff"), (600, 800))
+        second = renderer.compile_template("startup-bold", ("#ffffff", "#000000"), (600, 800))
+        layout = renderer.layout_content(first, "PitchCube", "Pitch decks on autopilot", ["a"])
+        assert renderer.layout_content(second, "PitchCube", "Pitch decks on autopilot", ["a"]) is layout
+        assert {name for name, *_ in layout.texts} == {"title", "body", "tag"}
+
+    def test_expand_variants_rotates_templates(self):
+        """Auto-selected variants cycle through templates before reusing one."""
+        renderer = PosterRenderer()
+        variants = renderer.expand_variants(len(renderer.COLOR_SCHEMES))
+        assert [template_id for template_id, _ in variants] == list(renderer.COLOR_SCHEMES)
+
+    def test_variants_reject_missing_or_unsupported_formats(self):
+        """Variant batches need at least one format this Pillow build can write."""
+        renderer = PosterRenderer()
+        for formats in ([], ["tiff"]):
+            with pytest.raises(ValueError):
+                asyncio.run(renderer.generate_variants("P", "D", [], count=1, formats=formats))
+
+    def test_generate_rejects_unsupported_formats_and_sizes(self):
+        """Single renders validate formats and sizes the same way as variant batches."""
+        renderer = PosterRenderer()
+        for options in ({"formats": ["gif"]}, {"formats": []}, {"sizes": ["banner"]}):
+            with pytest.raises(ValueError):
+                asyncio.run(renderer.generate("P", "D", [], **options))
+
+    def test_primary_color_does_not_split_cache(self, monkeypatch):
+        """primary_color is not rendered, so it must not change the cache key."""
+        renderer = PosterRenderer()
+        keys = []
+
+        def build_spec(*args, cache_key=None, **kwargs):
+            keys.append(cache_key)
+            raise RuntimeError("stop before rendering")
+
+        monkeypatch.setattr(renderer, "build_spec", build_spec)
+        for color in (None, "#0ea5e9"):
+            with pytest.raises(RuntimeError):
+                asyncio.run(
+                    renderer.generate("P", "D", [], primary_color=color, deterministic=True)
+                )
+        assert keys[0] is not None and keys[0] == keys[1]
+
+
+class TestDecorations:
+    """Test cases for the decoration layer."""
+
+    def test_sprites_are_cached(self):
+        """A sprite is drawn and blurred once per radius, color and blur."""
+        first = decoration_sprite(40, (255, 0, 0, 25), 4)
+        assert decoration_sprite(40, (255, 0, 0, 25), 4) is first
+        assert first.mode == "RGBA"
+
+    def test_composite_tints_background(self):
+        """Decorations are blended into the background, not discarded."""
+        base = Image.new("RGB", (600, 800), (0, 0, 0))
+        decorations = {"opacity": 128, "blur": 0, "circles": [[0.5, 0.5, 100]]}
+        result = compose_decorations(base, decorations, (255, 255, 255))
+        assert result.mode == "RGB"
+        assert result.getpixel((300, 400))[0] > 100
+        assert result.getpixel((0, 0)) == (0, 0, 0)
+
+    def test_circles_clipped_at_edges(self):
+        """Circles that hang off the canvas are clipped instead of failing."""
+        base = Image.new("RGB", (300, 400), (0, 0, 0))
+        decorations = {"opacity": 128, "blur": 2, "circles": [[0.0, 0.0, 200], [1.0, 1.0, 200]]}
+        result = compose_decorations(base, decorations, (255, 255, 255))
+        assert result.getpixel((0, 0))[0] > 0
+
+    def test_zero_opacity_is_noop(self):
+        """Disabled decorations return the background untouched."""
+        base = Image.new("RGB", (30, 40))
+        assert compose_decorations(base, {"opacity": 0, "circles": [[0.5, 0.5, 10]]}, (1, 2, 3)) is base
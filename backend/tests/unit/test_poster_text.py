@@ -0,0 +1,64 @@
+"""Unit tests for poster text measurement and wrapping."""
+
+from PIL import ImageFont
+
+from app.services.poster_text import FallbackMetrics, TextMeasurer, is_cjk
+
+FONT = ImageFont.load_default(size=32)
+WIDE_FONT = ImageFont.load_default(size=64)
+
+
+class TestTextMeasurer:
+    """Test cases for TextMeasurer."""
+
+    def test_width_matches_font_length(self):
+        """Cached glyph widths add up to the font's own measurement."""
+        measurer = TextMeasurer()
+        assert abs(measurer.width("PitchCube AVA", FONT) - FONT.getlength("PitchCube AVA")) <= 1
+
+    def test_glyphs_measured_once(self):
+        """Repeated characters reuse the cached advance."""
+        measurer = TextMeasurer()
+        metrics = measurer.metrics(FONT)
+        measurer.width("aaaa", FONT)
+        assert list(metrics._advances) == ["a"]
+
+    def test_latin_wraps_at_spaces(self):
+        """Latin text only breaks between words."""
+        measurer = TextMeasurer()
+        text = "The quick brown fox jumps over the lazy dog"
+        lines = measurer.wrap(text, FONT, 250)
+        assert len(lines) > 1
+        assert " ".join(lines) == text
+        assert all(measurer.width(line, FONT) <= 250 for line in lines)
+
+    def test_long_word_is_split(self):
+        """Words wider than a line are broken by character."""
+        measurer = TextMeasurer()
+        lines = measurer.wrap("Supercalifragilisticexpialidocious", FONT, 120)
+        assert len(lines) > 1
+        assert "".join(lines) == "Supercalifragilisticexpialidocious"
+
+    def test_short_text_single_line(self):
+        """Text that fits stays on one line."""
+        assert TextMeasurer().wrap("PitchCube", FONT, 1000) == ["PitchCube"]
+
+    def test_wrap_measures_fallback_glyphs(self):
+        """Characters drawn with a fallback font are measured with that font."""
+        measurer = TextMeasurer()
+
+        def font_for(char):
+            return WIDE_FONT if char.isupper() else FONT
+
+        text = "Wide LETTERS Come From Another Font"
+        lines = measurer.wrap(text, FONT, 300, font_for=font_for)
+        metrics = FallbackMetrics(measurer, font_for)
+        assert " ".join(lines) == text
+        assert all(metrics.width(line) <= 300 for line in lines)
+        assert len(lines) > len(measurer.wrap(text, FONT, 300))
+
+    def test_cjk_detection(self):
+        """CJK characters are recognized as free break points."""
+        assert is_cjk("路")
+        assert is_cjk("，")
+        assert not is_cjk("a")
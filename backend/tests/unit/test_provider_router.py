@@ -0,0 +1,120 @@
+"""Unit tests for latency-aware provider routing."""
+
+import asyncio
+import random
+
+import pytest
+
+from app.services.provider_router import LatencyWindow, ProviderRouter, percentile
+
+
+def make_router(**kwargs):
+    options = dict(
+        window_size=50,
+        window_seconds=600,
+        min_samples=3,
+        max_error_rate=0.5,
+        exploration=0.0,
+        rng=random.Random(7),
+    )
+    options.update(kwargs)
+    return ProviderRouter(**options)
+
+
+def feed(router, provider, latency, count=5, ok=True, operation="text"):
+    for _ in range(count):
+        router.record(operation, provider, latency, ok=ok)
+
+
+class TestLatencyWindow:
+    """Test cases for the rolling latency window."""
+
+    def test_percentile(self):
+        """Nearest-rank percentile over unsorted samples."""
+        values = [5.0, 1.0, 3.0, 2.0, 4.0]
+        assert percentile(values, 0.5) == 3.0
+        assert percentile(values, 0.9) == 5.0
+        assert percentile([], 0.9) is None
+
+    def test_old_samples_are_pruned(self):
+        """Samples older than the window age are dropped."""
+        window = LatencyWindow(max_samples=10, max_age=60)
+        window.add(9.0, True, now=0)
+        window.add(1.0, True, now=100)
+        window.add(2.0, False, now=100)
+        summary = window.summary(now=120)
+        assert window.latencies(now=120) == [1.0]
+        assert summary["samples"] == 2
+        assert summary["error_rate"] == 0.5
+
+
+class TestProviderRouter:
+    """Test cases for provider ranking."""
+
+    def test_cold_providers_are_tried_first(self):
+        """Providers without enough samples get traffic to build a distribution."""
+        router = make_router()
+        feed(router, "minimax", 0.2)
+        assert router.choose("text", ["minimax", "stepfun"]) == "stepfun"
+        assert router.latency("text", "stepfun") is None
+
+    def test_fastest_healthy_provider_wins(self):
+        """The provider with the lowest p90 is chosen."""
+        router = make_router()
+        feed(router, "minimax", 2.0)
+        feed(router, "stepfun", 0.5)
+        assert router.rank("text", ["minimax", "stepfun"]) == ["stepfun", "minimax"]
+        assert router.latency("text", "stepfun") == 0.5
+
+    def test_unhealthy_provider_is_demoted(self):
+        """A fast provider that mostly fails ranks behind healthy ones."""
+        router = make_router()
+        feed(router, "minimax", 2.0)
+        feed(router, "stepfun", 0.1, count=2)
+        feed(router, "stepfun", 0.1, count=4, ok=False)
+        assert router.rank("text", ["stepfun", "minimax"]) == ["minimax", "stepfun"]
+
+    def test_operations_are_tracked_separately(self):
+        """Latency for one operation does not affect another."""
+        router = make_router()
+        feed(router, "openai", 0.2, operation="image")
+        assert router.latency("text", "openai") is None
+        assert set(router.stats()) == {"image"}
+
+    def test_exploration_sends_some_traffic_to_slower_provider(self):
+        """With exploration enabled the slower provider is occasionally picked."""
+        router = make_router(exploration=0.5)
+        feed(router, "minimax", 1.0)
+        feed(router, "stepfun", 0.5)
+        picks = [router.choose("text", ["minimax", "stepfun"]) for _ in range(200)]
+        assert 0 < picks.count("minimax") < picks.count("stepfun")
+
+    def test_choose_without_candidates(self):
+        """An empty candidate list is an error."""
+        with pytest.raises(ValueError):
+            make_router().choose("text", [])
+
+    def test_call_records_outcome(self):
+        """Successful and failed calls are recorded; cancelled calls are not."""
+        router = make_router()
+
+        async def ok():
+            return "done"
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        async def run():
+            assert await router.call("text", "minimax", ok) == "done"
+            with pytest.raises(RuntimeError):
+                await router.call("text", "minimax", fail)
+            task = asyncio.ensure_future(router.call("text", "minimax", asyncio.Event().wait))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        summary = router.summary("text", "minimax")
+        assert summary["samples"] == 2
+        assert summary["error_rate"] == 0.5
@@ -0,0 +1,212 @@
+"""Unit tests for the provider rate limiter."""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.latency import LatencyBudgetExceeded, latency_budget
+from app.db.redis import redis_client
+from app.services.rate_limiter import (
+    ProviderLimiter,
+    RateLimitExceeded,
+    RateLimits,
+    TokenBucket,
+    estimate_tokens,
+    parse_rate_limits,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """Token buckets keyed like the Redis scripts (no refill; eval(..., rate, capacity, amount))."""
+
+    def __init__(self, fail_on=None):
+        self.tokens = {}
+        self.fail_on = fail_on
+
+    async def eval(self, script, numkeys, key, *args):
+        if self.fail_on and key.endswith(self.fail_on):
+            raise ConnectionError("redis down")
+        if len(args) == 2:  # refund
+            capacity, amount = args
+            if key in self.tokens:
+                self.tokens[key] = min(capacity, self.tokens[key] + amount)
+            return 0
+        rate, capacity, amount = args
+        tokens = self.tokens.setdefault(key, capacity)
+        if tokens >= amount:
+            self.tokens[key] = tokens - amount
+            return 0
+        return int((amount - tokens) / rate * 60000) + 1
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    def install(**kwargs):
+        client = FakeRedis(**kwargs)
+        monkeypatch.setattr(redis_client, "client", client)
+        return client
+
+    return install
+
+
+class TestConfiguration:
+    """Test cases for limit parsing and token estimates."""
+
+    def test_parse_rate_limits(self):
+        """Overrides use rpm/tpm/in-flight with 0 meaning unlimited."""
+        limits = parse_rate_limits("openai=500/150000/16, stability=150/0/4,runway=30")
+        assert limits["openai"] == RateLimits(rpm=500, tpm=150000, max_in_flight=16)
+        assert limits["stability"] == RateLimits(rpm=150, tpm=None, max_in_flight=4)
+        assert limits["runway"] == RateLimits(rpm=30)
+        assert parse_rate_limits("") == {}
+
+    def test_estimate_tokens(self):
+        """CJK characters count as one token each, other text about four chars per token."""
+        assert estimate_tokens("产品文案") == 4
+        assert estimate_tokens("abcdefgh") == 2
+
+
+class TestTokenBucket:
+    """Test cases for the in-process token bucket."""
+
+    def test_burst_then_wait(self):
+        """A full bucket admits a burst, then callers queue behind each other."""
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock)  # 1/s, burst of 10
+        assert [bucket.reserve(1, 60) for _ in range(10)] == [0.0] * 10
+        assert bucket.reserve(1, 60) == pytest.approx(1.0)
+        assert bucket.reserve(1, 60) == pytest.approx(2.0)
+        clock.now = 2.0
+        assert bucket.reserve(1, 60) == pytest.approx(1.0)
+
+    def test_reservation_beyond_deadline_is_not_taken(self):
+        """A reservation that cannot be met in time leaves the bucket unchanged."""
+        bucket = TokenBucket(60, FakeClock())
+        bucket.reserve(10, 60)
+        assert bucket.reserve(5, 1.0) is None
+        assert bucket.reserve(1, 1.0) == pytest.approx(1.0)
+
+
+class TestProviderLimiter:
+    """Test cases for provider admission."""
+
+    def test_concurrency_is_capped(self):
+        """No more than max_in_flight calls run at once; the rest queue."""
+        limiter = ProviderLimiter("stability", RateLimits(max_in_flight=2))
+        active = []
+        peak = []
+
+        async def call():
+            async with limiter.slot():
+                active.append(1)
+                peak.append(len(active))
+                await asyncio.sleep(0.02)
+                active.pop()
+
+        async def run():
+            await asyncio.gather(*(call() for _ in range(6)))
+
+        asyncio.run(run())
+        assert max(peak) == 2
+        stats = limiter.stats()
+        assert stats["admitted"] == 6
+        assert stats["in_flight"] == 0
+        assert stats["queued"] == 4
+
+    def test_queue_timeout_raises_rate_limit(self, monkeypatch):
+        """Waiting longer than the queue timeout fails with RateLimitExceeded."""
+        monkeypatch.setattr(settings, "AI_RATE_LIMIT_QUEUE_TIMEOUT", 0.5)
+        limiter = ProviderLimiter("runway", RateLimits(rpm=6))  # burst 1, then 10s apart
+
+        async def run():
+            await limiter.acquire()
+            with pytest.raises(RateLimitExceeded) as exc:
+                await limiter.acquire()
+            return exc.value
+
+        error = asyncio.run(run())
+        assert error.retry_after > 5
+        assert limiter.stats()["rejected"] == 1
+
+    def test_latency_budget_bounds_the_wait(self, monkeypatch):
+        """A tighter request budget wins over the queue timeout."""
+        monkeypatch.setattr(settings, "AI_RATE_LIMIT_QUEUE_TIMEOUT", 30.0)
+        limiter = ProviderLimiter("minimax", RateLimits(max_in_flight=1))
+
+        async def run():
+            await limiter.acquire()
+            with latency_budget(0.05):
+                with pytest.raises(LatencyBudgetExceeded):
+                    await limiter.acquire()
+            limiter.release()
+
+        asyncio.run(run())
+        assert limiter.stats()["in_flight"] == 0
+
+    def test_cluster_mode_without_redis_limits_locally(self, monkeypatch):
+        """Cluster mode falls back to per-process buckets when Redis is down."""
+        monkeypatch.setattr(settings, "AI_RATE_LIMIT_QUEUE_TIMEOUT", 0.5)
+        limiter = ProviderLimiter("openai", RateLimits(rpm=6, tpm=1000), cluster=True)
+
+        async def run():
+            await limiter.acquire(tokens=100)
+            with pytest.raises(RateLimitExceeded):
+                await limiter.acquire(tokens=100)
+
+        asyncio.run(run())
+
+    def test_expired_budget_still_admits_free_quota(self, monkeypatch):
+        """Quota that needs no wait is granted even after the budget ran out."""
+        limiter = ProviderLimiter("openai", RateLimits(rpm=60, tpm=1000, max_in_flight=2))
+
+        async def run():
+            with latency_budget(0.01):
+                await asyncio.sleep(0.02)
+                await limiter.acquire(tokens=10)
+            limiter.release()
+
+        asyncio.run(run())
+        assert limiter.stats()["admitted"] == 1
+
+    def test_cluster_rejection_refunds_redis_quota(self, monkeypatch, fake_redis):
+        """A tpm or concurrency rejection returns the rpm token already taken in Redis."""
+        monkeypatch.setattr(settings, "AI_RATE_LIMIT_QUEUE_TIMEOUT", 0.05)
+        redis = fake_redis()
+        limits = RateLimits(rpm=60, tpm=60, max_in_flight=1)
+        limiter = ProviderLimiter("openai", limits, cluster=True)
+        rpm_key = "pitchcube:ratelimit:openai:rpm"
+
+        async def run():
+            await limiter.acquire(tokens=10)
+            assert redis.tokens[rpm_key] == 9
+            # tpm bucket (capacity 10) is empty: the rpm token goes back
+            with pytest.raises(RateLimitExceeded):
+                await limiter.acquire(tokens=10)
+            assert redis.tokens[rpm_key] == 9
+            # concurrency gate is full: both reservations go back
+            with pytest.raises(RateLimitExceeded):
+                await limiter.acquire()
+            assert redis.tokens[rpm_key] == 9
+            limiter.release()
+
+        asyncio.run(run())
+        assert limiter.stats()["rejected"] == 2
+
+    def test_redis_failure_does_not_charge_twice(self, monkeypatch, fake_redis):
+        """Only the buckets Redis did not reserve fall back to the local limiter."""
+        redis = fake_redis(fail_on=":tpm")
+        limiter = ProviderLimiter("stepfun", RateLimits(rpm=6, tpm=1000), cluster=True)
+
+        asyncio.run(limiter.acquire(tokens=100))
+        assert redis.tokens["pitchcube:ratelimit:stepfun:rpm"] == 0
+        assert limiter._requests.available == limiter._requests.capacity
+        assert limiter._tokens.available < limiter._tokens.capacity
@@ -0,0 +1,165 @@
+"""Unit tests for hedged provider requests."""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services import ai_service_manager as manager_module
+from app.services.ai_service_manager import ai_service_manager
+from app.services.circuit_breaker import circuit_breakers
+from app.services.provider_router import ProviderRouter
+from app.services.request_hedging import HedgeBudget, hedged
+
+
+def rich_budget():
+    budget = HedgeBudget(ratio=1.0, burst=10)
+    for _ in range(5):
+        budget.deposit()
+    return budget
+
+
+def respond(value, after=0.0, error=None, log=None):
+    async def call():
+        try:
+            await asyncio.sleep(after)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append(f"{value} cancelled")
+            raise
+        if error is not None:
+            raise error
+        return value
+
+    return call
+
+
+class TestHedgeBudget:
+    """Test cases for the hedge credit bucket."""
+
+    def test_hedges_never_exceed_primaries(self):
+        """The ratio is capped at 1.0 so spend can at most double."""
+        budget = HedgeBudget(ratio=3.0, burst=100)
+        assert budget.ratio == 1.0
+        granted = 0
+        for _ in range(10):
+            budget.deposit()
+            granted += budget.try_spend()
+            granted += budget.try_spend()
+        assert granted == 10
+
+    def test_low_ratio_limits_hedges(self):
+        """With ratio 0.1 one hedge is allowed per ten requests."""
+        budget = HedgeBudget(ratio=0.1, burst=5)
+        for _ in range(9):
+            budget.deposit()
+        assert not budget.try_spend()
+        budget.deposit()
+        assert budget.try_spend()
+        assert budget.stats()["denied"] == 1
+
+
+class TestHedged:
+    """Test cases for racing a backup provider."""
+
+    def test_fast_primary_is_not_hedged(self):
+        """A primary answering before the delay never starts the backup."""
+        budget = rich_budget()
+        calls = []
+
+        async def backup():
+            calls.append("backup")
+            return "backup"
+
+        result = asyncio.run(hedged(respond("primary"), backup, 0.2, budget))
+        assert result == "primary"
+        assert calls == []
+        assert budget.stats()["hedges"] == 0
+
+    def test_slow_primary_loses_and_is_cancelled(self):
+        """The backup wins when the primary stalls, and the primary is cancelled."""
+        budget = rich_budget()
+        log = []
+        result = asyncio.run(
+            hedged(respond("primary", after=5, log=log), respond("backup", after=0.01), 0.05, budget)
+        )
+        assert result == "backup"
+        assert log == ["primary cancelled"]
+        assert budget.stats()["hedge_wins"] == 1
+
+    def test_no_budget_waits_for_primary(self):
+        """Without credits the request simply waits for the primary."""
+        budget = HedgeBudget(ratio=0.0)
+        log = []
+        result = asyncio.run(
+            hedged(respond("primary", after=0.1), respond("backup", log=log), 0.01, budget)
+        )
+        assert result == "primary"
+        assert budget.stats()["denied"] == 1
+
+    def test_failed_primary_falls_through_to_backup(self):
+        """A primary failing after the hedge started does not fail the request."""
+        result = asyncio.run(
+            hedged(
+                respond("primary", after=0.05, error=RuntimeError("boom")),
+                respond("backup", after=0.1),
+                0.01,
+                rich_budget(),
+            )
+        )
+        assert result == "backup"
+
+    def test_both_failing_raises_primary_error(self):
+        """When both providers fail the primary's error is raised."""
+        with pytest.raises(RuntimeError, match="primary"):
+            asyncio.run(
+                hedged(
+                    respond("p", after=0.05, error=RuntimeError("primary")),
+                    respond("b", error=ValueError("backup")),
+                    0.01,
+                    rich_budget(),
+                )
+            )
+
+    def test_unknown_delay_disables_hedging(self):
+        """Without a latency estimate the primary runs alone."""
+        budget = rich_budget()
+        result = asyncio.run(hedged(respond("primary", after=0.02), respond("backup"), None, budget))
+        assert result == "primary"
+        assert budget.stats()["hedges"] == 0
+
+
+class TestAutoTextHedging:
+    """Test cases for hedging in auto text generation (used by /chinese-ai/chat)."""
+
+    def setup_method(self):
+        circuit_breakers.reset()
+        self.saved = dict(vars(ai_service_manager.status))
+        ai_service_manager.status.minimax = True
+        ai_service_manager.status.stepfun = True
+
+    def teardown_method(self):
+        vars(ai_service_manager.status).update(self.saved)
+        circuit_breakers.reset()
+
+    def test_slow_provider_is_hedged_to_backup(self, monkeypatch):
+        """A slow primary is hedged to the second-ranked Chinese provider."""
+        router = ProviderRouter(min_samples=1, exploration=0)
+        router.record("text", "minimax", 0.01)
+        router.record("text", "stepfun", 0.02)
+        monkeypatch.setattr(manager_module, "provider_router", router)
+        monkeypatch.setattr(manager_module, "hedge_budget", rich_budget())
+        monkeypatch.setattr(settings, "AI_HEDGING_MIN_DELAY", 0.01)
+
+        async def chat(provider, messages, **kwargs):
+            if provider == "minimax":
+                await asyncio.sleep(1)
+            return provider
+
+        monkeypatch.setattr(ai_service_manager, "_chat", chat)
+        result = asyncio.run(
+            ai_service_manager.generate_text_with_provider(
+                "hi", "auto", candidates=("minimax", "stepfun"), hedge=True
+            )
+        )
+        assert result == ("stepfun", "stepfun")
@@ -0,0 +1,115 @@
+"""Unit tests for frame-streamed video rendering."""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageChops
+
+from app.services.ffmpeg_pool import FFmpegScheduler
+from app.services.video_frames import frame_pipe_command, stream_frames, timeline_frames
+from app.services.video_scenes import build_scene_specs, scene_layers
+
+SCENES = [{"duration": 1, "subtitle": "One"}, {"duration": 1, "subtitle": "Two"}]
+
+
+def small_specs():
+    """Two tiny scenes so frames are cheap to render."""
+    return build_scene_specs("Demo", SCENES, 2, resolution="720p", fps=10, profile="preview")
+
+
+class TestTimeline:
+    """Test cases for timeline_frames."""
+
+    def test_frame_count_and_size(self):
+        """Transitions overlap scene boundaries without changing the total length."""
+        frames = list(timeline_frames(small_specs(), 10, transition=0.4))
+        assert len(frames) == 20
+        assert all(frame.size == (1280, 720) for frame in frames)
+
+    def test_background_moves_and_text_fades_in(self):
+        """Frames change over time and the first frame is the bare background."""
+        specs = small_specs()
+        frames = list(timeline_frames(specs, 10, transition=0))
+        assert frames[0].tobytes() != frames[5].tobytes()
+
+        background, _ = scene_layers(specs[0])
+        diff = ImageChops.difference(frames[0], background)
+        assert max(high for _, high in diff.getextrema()) <= 2
+
+    def test_on_frame_sees_every_frame(self):
+        """The frame hook can capture a thumbnail without re-rendering."""
+        seen = []
+        list(timeline_frames(small_specs(), 10, on_frame=lambda n, image: seen.append(n)))
+        assert seen == list(range(20))
+
+
+class TestStreamFrames:
+    """Test cases for the bounded frame queue."""
+
+    def test_producer_is_bounded(self):
+        """The producer never runs more than the queue size ahead of the consumer."""
+        produced = 0
+
+        def frames():
+            nonlocal produced
+            for _ in range(20):
+                produced += 1
+                yield Image.new("RGB", (4, 4))
+
+        async def run():
+            ahead = []
+            async for chunk in stream_frames(frames(), queue_size=3):
+                assert len(chunk) == 4 * 4 * 3
+                await asyncio.sleep(0.01)
+                ahead.append(produced)
+            return ahead
+
+        ahead = asyncio.run(run())
+        assert len(ahead) == 20
+        assert max(count - index - 1 for index, count in enumerate(ahead)) <= 4
+
+    def test_producer_errors_propagate(self):
+        """Exceptions raised while rendering frames reach the consumer."""
+
+        def frames():
+            yield Image.new("RGB", (4, 4))
+            raise RuntimeError("render failed")
+
+        async def run():
+            return [chunk async for chunk in stream_frames(frames(), queue_size=2)]
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(run())
+
+
+class TestFramePipe:
+    """Test cases for feeding frames into FFmpeg."""
+
+    def test_command_reads_raw_frames_from_stdin(self):
+        """Frames arrive as raw RGB on stdin with motion-friendly encoder settings."""
+        cmd = frame_pipe_command((1280, 720), 30, 5, Path("out.mp4"))
+        assert cmd[cmd.index("-f") + 1] == "rawvideo"
+        assert cmd[cmd.index("-s") + 1] == "1280x720"
+        assert "pipe:0" in cmd
+        assert "stillimage" not in cmd
+
+    def test_scheduler_feeds_stdin(self, tmp_path):
+        """The scheduler writes the stream to the process and closes stdin at the end."""
+        script = tmp_path / "count_stdin"
+        script.write_text(
+            f"#!{sys.executable}\n"
+            "import sys\n"
+            "sys.stderr.write(str(len(sys.stdin.buffer.read())))\n"
+        )
+        os.chmod(script, 0o755)
+
+        async def chunks():
+            for _ in range(50):
+                yield b"\0" * 1000
+
+        scheduler = FFmpegScheduler(max_jobs=1, threads_per_job=1, job_timeout=10)
+        stderr = asyncio.run(scheduler.run([str(script)], stdin=chunks()))
+        assert stderr == b"50000"
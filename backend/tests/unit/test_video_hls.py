@@ -0,0 +1,99 @@
+"""Unit tests for progressive HLS output."""
+
+import asyncio
+from pathlib import Path
+
+from app.services.video_composer import VideoComposer
+from app.services.video_hls import HLSPlaylist, read_scene_entries, scene_hls_command
+
+SCENE_PLAYLIST = """#EXTM3U
+#EXT-X-VERSION:7
+#EXT-X-TARGETDURATION:2
+#EXT-X-MEDIA-SEQUENCE:0
+#EXT-X-PLAYLIST-TYPE:VOD
+#EXT-X-MAP:URI="s001_init.mp4"
+#EXTINF:2.000000,
+s001_000.m4s
+#EXTINF:1.000000,
+s001_001.m4s
+#EXT-X-ENDLIST
+"""
+
+
+class TestHLSPlaylist:
+    """Test cases for the growing HLS playlist."""
+
+    def test_playlist_grows_and_ends(self, tmp_path):
+        """Scenes are appended with discontinuities and ENDLIST comes last."""
+        playlist = HLSPlaylist(tmp_path / "index.m3u8", 2.0)
+        playlist.write()
+        text = playlist.path.read_text()
+        assert "#EXT-X-PLAYLIST-TYPE:EVENT" in text
+        assert "#EXTINF" not in text and "#EXT-X-ENDLIST" not in text
+
+        playlist.append_scene(['#EXT-X-MAP:URI="s000_init.mp4"', "#EXTINF:2.0,", "s000_000.m4s"])
+        playlist.append_scene(['#EXT-X-MAP:URI="s001_init.mp4"', "#EXTINF:1.0,", "s001_000.m4s"])
+        text = playlist.path.read_text()
+        assert text.count("#EXT-X-DISCONTINUITY") == 1
+        assert text.index("s000_000.m4s") < text.index("#EXT-X-DISCONTINUITY") < text.index("s001_init")
+
+        playlist.end()
+        assert playlist.path.read_text().rstrip().endswith("#EXT-X-ENDLIST")
+        assert not list(tmp_path.glob(".*.tmp"))
+
+    def test_failed_render_ends_playlist(self, tmp_path, monkeypatch):
+        """A failed or cancelled scene still leaves a finished playlist."""
+        composer = VideoComposer()
+        monkeypatch.setattr(composer, "output_dir", tmp_path)
+
+        async def render_segment(*args, **kwargs):
+            raise RuntimeError("scene failed")
+
+        async def fallback(*args, **kwargs):
+            return {}
+
+        monkeypatch.setattr(composer, "render_segment", render_segment)
+        monkeypatch.setattr(composer, "_create_video_fallback", fallback)
+        scenes = [{"subtitle": "PitchCube", "duration": 2}]
+        asyncio.run(composer._create_video_with_ffmpeg("hls_fail", "Title", scenes, 2, hls=True))
+
+        playlist = composer.hls_dir("hls_fail") / "index.m3u8"
+        assert playlist.read_text().rstrip().endswith("#EXT-X-ENDLIST")
+
+    def test_read_scene_entries(self, tmp_path):
+        """Only segment entries are copied from a scene playlist."""
+        path = tmp_path / "s001.m3u8"
+        path.write_text(SCENE_PLAYLIST)
+        assert read_scene_entries(path) == [
+            '#EXT-X-MAP:URI="s001_init.mp4"',
+            "#EXTINF:2.000000,",
+            "s001_000.m4s",
+            "#EXTINF:1.000000,",
+            "s001_001.m4s",
+        ]
+
+
+class TestSceneHLSCommand:
+    """Test cases for the per-scene HLS remux command."""
+
+    def test_video_is_copied_into_fmp4(self):
+        """Scenes are remuxed to fMP4 fragments without re-encoding video."""
+        cmd = scene_hls_command(Path("seg.mp4"), Path("hls"), "s000", 3, byte_ranges=False)
+        assert cmd[cmd.index("-c:v") + 1] == "copy"
+        assert cmd[cmd.index("-hls_segment_type") + 1] == "fmp4"
+        assert cmd[cmd.index("-hls_fmp4_init_filename") + 1] == "s000_init.mp4"
+        assert cmd[cmd.index("-c:a") + 1] == "copy"
+
+    def test_narration_slice(self):
+        """Whole-video narration is cut to the scene's time window."""
+        cmd = scene_hls_command(
+            Path("seg.mp4"), Path("hls"), "s002", 4, audio_path="voice.mp3", audio_start=6
+        )
+        assert cmd[cmd.index("-ss") + 1] == "6.000"
+        assert "1:a" in cmd and "apad=whole_dur=4.000" in cmd
+
+    def test_byte_range_mode(self):
+        """Byte-range mode writes one file per scene."""
+        cmd = scene_hls_command(Path("seg.mp4"), Path("hls"), "s000", 3, byte_ranges=True)
+        assert cmd[cmd.index("-hls_flags") + 1] == "single_file"
+        assert cmd[cmd.index("-hls_segment_filename") + 1].endswith("s000.m4s")
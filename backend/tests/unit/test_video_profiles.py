@@ -0,0 +1,81 @@
+"""Unit tests for video encoding profiles and the rendition ladder."""
+
+from pathlib import Path
+
+import pytest
+
+from app.services.video_profiles import (
+    PROFILES,
+    get_profile,
+    ladder_command,
+    ladder_rungs,
+    profile_for,
+    rung_size,
+)
+from app.services.video_scenes import build_scene_specs, segment_command
+
+
+class TestProfiles:
+    """Test cases for encoding profiles."""
+
+    def test_video_args(self):
+        """Profiles set preset, CRF and a fixed GOP."""
+        args = PROFILES["youtube"].video_args()
+        assert args[args.index("-preset") + 1] == "veryfast"
+        assert args[args.index("-crf") + 1] == "21"
+        assert args[args.index("-g") + 1] == "60"
+        assert args[args.index("-maxrate") + 1] == "8M"
+
+    def test_preview_is_cheaper_than_final(self):
+        """Preview renders fewer, smaller frames with a faster preset."""
+        preview, final = PROFILES["preview"], PROFILES["youtube"]
+        assert preview.fps < final.fps
+        assert preview.resolution[0] * preview.resolution[1] < final.resolution[0] * final.resolution[1]
+        assert preview.thread_args(4) == ["-threads", "1"]
+
+    def test_profile_selection(self):
+        """Quality picks preview/archival directly and final follows the platform."""
+        assert profile_for("preview", "douyin").name == "preview"
+        assert profile_for("final", "douyin").resolution == (1080, 1920)
+        assert profile_for("final", "unknown").name == get_profile().name
+        with pytest.raises(ValueError):
+            profile_for("ultra")
+        with pytest.raises(ValueError):
+            get_profile("missing")
+
+    def test_profile_changes_segment_key_and_command(self):
+        """Segments encoded with different profiles never share a cache entry."""
+        scenes = [{"duration": 3, "subtitle": "Hello"}]
+        preview = build_scene_specs("Demo", scenes, 3, profile="preview")[0]
+        final = build_scene_specs("Demo", scenes, 3, profile="bilibili")[0]
+
+        assert preview.resolution == (854, 480) and preview.fps == 15
+        assert preview.key() != final.key()
+        cmd = segment_command(preview, Path("card.png"), Path("out.mp4"))
+        assert cmd[cmd.index("-preset") + 1] == "ultrafast"
+
+
+class TestLadder:
+    """Test cases for the multi-rendition ladder."""
+
+    def test_rungs_skip_upscaling(self):
+        """Rungs above the source resolution are dropped."""
+        assert ladder_rungs(PROFILES["preview"], ["1080p", "480p", "360p"]) == ["480p", "360p"]
+        with pytest.raises(ValueError):
+            ladder_rungs(PROFILES["youtube"], ["8k"])
+
+    def test_rung_size_keeps_aspect_ratio(self):
+        """Vertical video scales by its short side."""
+        assert rung_size((1920, 1080), 720) == (1280, 720)
+        assert rung_size((1080, 1920), 720) == (720, 1280)
+
+    def test_single_decode(self):
+        """All renditions come from one input and one split filter."""
+        outputs = {"720p": Path("a_720p.mp4"), "480p": Path("a_480p.mp4")}
+        cmd = ladder_command(Path("a.mp4"), PROFILES["youtube"], outputs)
+
+        assert cmd.count("-i") == 1
+        graph = cmd[cmd.index("-filter_complex") + 1]
+        assert graph.startswith("[0:v]split=2[s0][s1]")
+        assert "scale=1280:720" in graph and "scale=854:480" in graph
+        assert cmd[-1] == "a_480p.mp4"
@@ -0,0 +1,96 @@
+"""Unit tests for the video scene graph."""
+
+from pathlib import Path
+
+from app.services.video_scenes import (
+    RESOLUTIONS,
+    build_scene_specs,
+    finish_command,
+    fit_to_narration,
+    segment_command,
+    write_concat_list,
+)
+
+SCENES = [
+    {"duration": 4, "subtitle": "First"},
+    {"duration": 6, "narration": "Second narration"},
+]
+
+
+class TestSceneSpecs:
+    """Test cases for building scene specs."""
+
+    def test_scene_fields(self):
+        """Scenes keep their duration and fall back to narration for subtitles."""
+        specs = build_scene_specs("Demo", SCENES, 10, resolution="1080p")
+        assert [spec.duration for spec in specs] == [4.0, 6.0]
+        assert specs[1].subtitle == "Second narration"
+        assert specs[0].show_title and not specs[1].show_title
+        assert specs[0].resolution == RESOLUTIONS["1080p"]
+
+    def test_missing_durations_split_total(self):
+        """Scenes without a duration share the total evenly."""
+        specs = build_scene_specs("Demo", [{}, {}, {}, {}], 60)
+        assert all(spec.duration == 15.0 for spec in specs)
+
+    def test_editing_one_scene_changes_only_its_key(self):
+        """Only the edited scene gets a new segment key."""
+        before = [spec.key() for spec in build_scene_specs("Demo", SCENES, 10)]
+        edited = [dict(SCENES[0]), {**SCENES[1], "narration": "Changed"}]
+        after = [spec.key() for spec in build_scene_specs("Demo", edited, 10)]
+        assert before[0] == after[0]
+        assert before[1] != after[1]
+
+    def test_long_narration_stretches_scenes(self):
+        """Scenes are stretched proportionally to cover measured narration."""
+        specs = build_scene_specs("Demo", SCENES, 10)
+        stretched = fit_to_narration(specs, 15.0)
+        assert [spec.duration for spec in stretched] == [6.0, 9.0]
+        assert fit_to_narration(specs, 8.0) == specs
+        assert fit_to_narration(specs, None) == specs
+
+
+class TestCommands:
+    """Test cases for FFmpeg command construction."""
+
+    def test_silent_segment_gets_null_audio(self):
+        """Segments without narration get a silent track so concat can stream copy."""
+        spec = build_scene_specs("Demo", SCENES, 10)[0]
+        cmd = segment_command(spec, Path("card.png"), Path("out.mp4"))
+        assert any(arg.startswith("anullsrc") for arg in cmd)
+        assert cmd[cmd.index("-t") + 1] == "4.000"
+
+    def test_narration_is_used(self):
+        """Narration audio replaces the silent track."""
+        spec = build_scene_specs("Demo", [{"duration": 3, "audio_path": "voice.mp3"}], 3)[0]
+        cmd = segment_command(spec, Path("card.png"), Path("out.mp4"))
+        assert "voice.mp3" in cmd
+        assert not any(arg.startswith("anullsrc") for arg in cmd)
+
+    def test_concat_list_escaping(self, tmp_path):
+        """Segment paths are quoted for the concat demuxer."""
+        list_path = tmp_path / "list.txt"
+        write_concat_list([tmp_path / "a.mp4", tmp_path / "it's.mp4"], list_path)
+        content = list_path.read_text()
+        assert content.count("file '") == 2
+        assert "it'\\''s.mp4" in content
+
+    def test_finish_is_single_pass(self, tmp_path):
+        """Concat, narration mux and thumbnail come from one invocation without re-encoding video."""
+        cmd = finish_command(
+            tmp_path / "list.txt", tmp_path / "out.mp4", tmp_path / "thumb.jpg", 12, "voice.mp3"
+        )
+        assert cmd[cmd.index("-c:v") + 1] == "copy"
+        assert "1:a" in cmd and "apad=whole_dur=12.000" in cmd
+        assert cmd[-1].endswith("thumb.jpg") and "[thumb]" in cmd
+
+    def test_finish_without_narration_copies_audio(self, tmp_path):
+        """Without narration the segments' audio is stream copied."""
+        cmd = finish_command(tmp_path / "list.txt", tmp_path / "out.mp4", tmp_path / "thumb.jpg", 12)
+        assert cmd[cmd.index("-c:a") + 1] == "copy"
+
+    def test_watermark_changes_segments(self):
+        """The watermark is part of the scene, so it invalidates cached segments."""
+        plain = build_scene_specs("Demo", SCENES, 10)[0]
+        marked = build_scene_specs("Demo", SCENES, 10, watermark="PitchCube")[0]
+        assert plain.key() != marked.key()
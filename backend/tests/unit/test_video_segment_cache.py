@@ -0,0 +1,153 @@
+"""Unit tests for the encoded video segment cache."""
+
+import asyncio
+
+import pytest
+
+from app.services.ffmpeg_pool import FFmpegCancelledError
+from app.services.video_segment_cache import SegmentCache
+
+
+def write_segment(path, size):
+    """Create a fake encoded segment."""
+    path.write_bytes(b"\0" * size)
+
+
+class TestSegmentCache:
+    """Test cases for SegmentCache."""
+
+    def test_encodes_once_then_hits(self, tmp_path):
+        """A second lookup reuses the encoded file without encoding again."""
+        cache = SegmentCache(str(tmp_path), max_bytes=10_000)
+        calls = []
+
+        async def encode(path):
+            calls.append(path)
+            write_segment(path, 100)
+
+        async def run():
+            first = await cache.get_or_encode("a" * 64, encode)
+            second = await cache.get_or_encode("a" * 64, encode)
+            return first, second
+
+        (path, cached), (again, cached_again) = asyncio.run(run())
+        assert len(calls) == 1
+        assert path == again and path.exists()
+        assert (cached, cached_again) == (False, True)
+        assert not list(tmp_path.glob("*.tmp.mp4"))
+
+    def test_concurrent_requests_share_one_encode(self, tmp_path):
+        """Concurrent lookups for the same key encode a single time."""
+        cache = SegmentCache(str(tmp_path), max_bytes=10_000)
+        calls = 0
+
+        async def encode(path):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            write_segment(path, 100)
+
+        async def run():
+            return await asyncio.gather(*(cache.get_or_encode("b" * 64, encode) for _ in range(4)))
+
+        results = asyncio.run(run())
+        assert calls == 1
+        assert len({path for path, _ in results}) == 1
+
+    def test_failed_encode_leaves_no_entry(self, tmp_path):
+        """A failed encode does not leave a partial segment behind."""
+        cache = SegmentCache(str(tmp_path), max_bytes=10_000)
+
+        async def encode(path):
+            write_segment(path, 50)
+            raise RuntimeError("ffmpeg failed")
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(cache.get_or_encode("c" * 64, encode))
+        assert cache.get("c" * 64) is None
+        assert not list(tmp_path.iterdir())
+
+    def put(self, cache, tmp_path, name, size=100):
+        source = tmp_path / f"{name}.src"
+        write_segment(source, size)
+        return cache.put(name * 64, source)
+
+    def test_lru_eviction(self, tmp_path):
+        """The least recently used segment is evicted when over quota."""
+        cache = SegmentCache(str(tmp_path), max_bytes=250)
+        self.put(cache, tmp_path, "a")
+        self.put(cache, tmp_path, "b")
+        cache.get("a" * 64)
+        self.put(cache, tmp_path, "c")
+
+        assert cache.get("b" * 64) is None
+        assert cache.get("a" * 64) is not None
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] == 200
+
+    def test_pinned_segments_are_not_evicted(self, tmp_path):
+        """Segments referenced by an in-progress concat survive eviction."""
+        cache = SegmentCache(str(tmp_path), max_bytes=250)
+        self.put(cache, tmp_path, "a")
+        self.put(cache, tmp_path, "b")
+        with cache.pinned(["a" * 64]):
+            self.put(cache, tmp_path, "c")
+
+        assert cache.get("a" * 64) is not None
+        assert cache.get("b" * 64) is None
+
+    def test_index_is_restored_from_disk(self, tmp_path):
+        """A new cache instance finds segments written by a previous one."""
+        first = SegmentCache(str(tmp_path), max_bytes=10_000)
+        source = tmp_path / "d.src"
+        write_segment(source, 100)
+        first.put("d" * 64, source)
+
+        second = SegmentCache(str(tmp_path), max_bytes=10_000)
+        assert second.get("d" * 64) == first.path_for("d" * 64)
+        assert second.stats()["entries"] == 1
+
+
+class TestSharedEncodeCancellation:
+    """Cancelling one video must not cancel others waiting on the same segment."""
+
+    def run_case(self, tmp_path, cancel_ffmpeg_job):
+        cache = SegmentCache(str(tmp_path), max_bytes=10_000)
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+        calls = []
+
+        async def encode_a(path):
+            calls.append("a")
+            started.set()
+            await cancelled.wait()
+            raise FFmpegCancelledError("job for video A cancelled")
+
+        async def encode_b(path):
+            calls.append("b")
+            write_segment(path, 100)
+
+        async def run():
+            task_a = asyncio.ensure_future(cache.get_or_encode("d" * 64, encode_a))
+            await started.wait()
+            task_b = asyncio.ensure_future(cache.get_or_encode("d" * 64, encode_b))
+            await asyncio.sleep(0)
+            if cancel_ffmpeg_job:
+                cancelled.set()
+            else:
+                task_a.cancel()
+            with pytest.raises((asyncio.CancelledError, FFmpegCancelledError)):
+                await task_a
+            return await task_b
+
+        path, _ = asyncio.run(run())
+        assert calls == ["a", "b"]
+        assert path.exists()
+
+    def test_cancelled_task_hands_over_encode(self, tmp_path):
+        """A waiter takes over when the encoding video's task is cancelled."""
+        self.run_case(tmp_path, cancel_ffmpeg_job=False)
+
+    def test_cancelled_ffmpeg_job_hands_over_encode(self, tmp_path):
+        """A waiter takes over when the encoding video's FFmpeg job is cancelled."""
+        self.run_case(tmp_path, cancel_ffmpeg_job=True)
@@ -106,7 +106,8 @@ class StepFunTTS:
         default_speed: float = 1.0,
         cache_dir: Optional[str] = None,
         model: Optional[str] = None,
-        timeout: float = 30.0
+        timeout: float = 30.0,
+        client: Optional[httpx.AsyncClient] = None
     ):
         """
         初始化 StepFun TTS 服务
@@ -119,6 +120,7 @@ class StepFunTTS:
             cache_dir: 缓存目录，None 表示不缓存
             model: 使用的模型，默认 step-tts-mini
             timeout: API 调用超时时间
+            client: 共享的 httpx.AsyncClient（复用连接池），None 表示每次调用新建客户端
         """
         self.api_key = api_key or os.getenv("STEPFUN_API_KEY")
         if not self.api_key:
@@ -129,6 +131,7 @@ class StepFunTTS:
         self.default_speed = max(0.5, min(2.0, default_speed))
         self.model = model or os.getenv("STEPFUN_TTS_MODEL", self.DEFAULT_MODEL)
         self.timeout = timeout
+        self.client = client
         
         # 设置缓存
         self.cache_dir = None
@@ -221,32 +224,40 @@ class StepFunTTS:
     
     async def _call_api(self, text: str, voice: str, speed: float) -> bytes:
         """调用阶跃星辰 API"""
+        if self.client is not None:
+            return await self._post_speech(self.client, text, voice, speed)
         async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/audio/speech",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model,
-                    "input": text.strip(),
-                    "voice": voice,
-                    "speed": speed
-                },
-                timeout=self.timeout
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"API error: {response.status_code}"
-                try:
-                    error_data = response.json()
-                    error_msg = f"{error_msg} - {error_data.get('error', {}).get('message', 'Unknown error')}"
-                except:
-                    pass
-                raise APIError(error_msg, response.status_code)
-            
-            return response.content
+            return await self._post_speech(client, text, voice, speed)
+
+    async def _post_speech(
+        self, client: httpx.AsyncClient, text: str, voice: str, speed: float
+    ) -> bytes:
+        """发送语音合成请求"""
+        response = await client.post(
+            f"{self.base_url}/audio/speech",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": self.model,
+                "input": text.strip(),
+                "voice": voice,
+                "speed": speed
+            },
+            timeout=self.timeout
+        )
+        
+        if response.status_code != 200:
+            error_msg = f"API error: {response.status_code}"
+            try:
+                error_data = response.json()
+                error_msg = f"{error_msg} - {error_data.get('error', {}).get('message', 'Unknown error')}"
+            except:
+                pass
+            raise APIError(error_msg, response.status_code)
+        
+        return response.content
     
     def get_voices(
         self,